@@ -0,0 +1,359 @@
+"""Offline benchmarks for conversion, lexicon I/O and alignment.
+
+Usage::
+
+    python benchmarks/run_benchmarks.py --backend stub --output results.json
+    python benchmarks/run_benchmarks.py --backend real --sizes 1000,10000
+
+Every run is seeded and needs no network access. ``--backend stub`` replaces
+the pronunciation backends with deterministic functions, as the test suite
+does, so only this package's code is measured; ``--backend real`` uses
+``eng_to_ipa`` and ``dragonmapper``. The JSON output lists, for every case,
+its throughput, p50/p99 latency and the peak RSS of the process so far, so
+two runs can be compared case by case.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import resource
+import sys
+import tempfile
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(ROOT / "src"))
+
+import numpy as np
+
+from asr_error_correction import (
+    IPAConverter,
+    IPALexicon,
+    LocalAlignment,
+    local_align_sentence,
+)
+import asr_error_correction.conversion as conversion
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+DEFAULT_SENTENCES = 200
+DEFAULT_QUERIES = 1_000
+DEFAULT_REPEAT = 3
+
+_HANZI = (
+    "的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动"
+    "同工也能下过子说产种面而方后多定行学法所民得经十三之进着等部度家电力里如水化高自二"
+    "理起小物现实加量都两体制机当使点从业本去把性好应开它合还因由其些然前外天政四日那社"
+    "义事平形相全表间样与关各重新线内数正心反你明看原又么利比或但质气第向道命此变条只没"
+)
+_WORDS = (
+    "hello world order ticket train flight hotel please want book cancel change "
+    "meeting today tomorrow morning evening play music call message open close "
+    "weather time price search map route station airport coffee water phone email "
+    "photo video start stop next previous volume light door window help"
+).split()
+_PUNCTUATION = ("", "", "", ",", "!", "?", "，", "。")
+
+# Stub syllables for Chinese characters, chosen by code point.
+_STUB_INITIALS = (
+    "p", "pʰ", "m", "f", "t", "tʰ", "n", "l", "k", "kʰ", "x", "tɕ", "ɕ", "ʂ", "ts"
+)
+_STUB_FINALS = (
+    "a", "o", "ɤ", "i", "u", "y", "ai", "ei", "au", "ou", "an", "ən", "aŋ", "əŋ"
+)
+_STUB_TONES = ("˥", "˧˥", "˨˩˦", "˥˩")
+
+
+def _stub_hanzi(text: str) -> str:
+    syllables = []
+    for character in text:
+        code = ord(character)
+        syllables.append(
+            _STUB_INITIALS[code % len(_STUB_INITIALS)]
+            + _STUB_FINALS[code // 7 % len(_STUB_FINALS)]
+            + _STUB_TONES[code // 11 % len(_STUB_TONES)]
+        )
+    return " ".join(syllables)
+
+
+def _stub_english(word: str) -> str:
+    return "ˈ" + word.lower()
+
+
+@contextmanager
+def stubbed_backends() -> Iterator[None]:
+    """Replace the pronunciation backends with deterministic stubs."""
+
+    saved = (
+        conversion.eng_to_ipa_convert,
+        conversion.eng_to_ipa_list,
+        conversion.hanzi_to_ipa,
+    )
+    conversion.eng_to_ipa_convert = _stub_english
+    conversion.eng_to_ipa_list = lambda words: [[_stub_english(w)] for w in words]
+    conversion.hanzi_to_ipa = _stub_hanzi
+    try:
+        yield
+    finally:
+        (
+            conversion.eng_to_ipa_convert,
+            conversion.eng_to_ipa_list,
+            conversion.hanzi_to_ipa,
+        ) = saved
+
+
+class CorpusGenerator:
+    """Seeded generator of mixed Chinese, English and acronym text."""
+
+    def __init__(self, seed: int = 0) -> None:
+        self._random = random.Random(seed)
+
+    def _token(self) -> str:
+        kind = self._random.random()
+        if kind < 0.55:
+            length = self._random.randint(1, 4)
+            return "".join(self._random.choice(_HANZI) for _ in range(length))
+        if kind < 0.9:
+            return self._random.choice(_WORDS)
+        length = self._random.randint(2, 4)
+        return "".join(
+            chr(ord("A") + self._random.randrange(26)) for _ in range(length)
+        )
+
+    def phrase(self) -> str:
+        return " ".join(self._token() for _ in range(self._random.randint(1, 3)))
+
+    def phrases(self, count: int) -> List[str]:
+        """Return ``count`` distinct phrases."""
+
+        seen: Dict[str, None] = {}
+        while len(seen) < count:
+            seen[self.phrase()] = None
+        return list(seen)
+
+    def sentence(self) -> str:
+        tokens = [self._token() for _ in range(self._random.randint(5, 15))]
+        return " ".join(tokens) + self._random.choice(_PUNCTUATION)
+
+    def sentences(self, count: int) -> List[str]:
+        return [self.sentence() for _ in range(count)]
+
+
+def _peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _measure(
+    name: str,
+    calls: Sequence[Callable[[], object]],
+    items_per_call: int = 1,
+    **params: object,
+) -> Dict[str, object]:
+    latencies = np.empty(len(calls))
+    started = time.perf_counter()
+    for position, call in enumerate(calls):
+        call_started = time.perf_counter()
+        call()
+        latencies[position] = time.perf_counter() - call_started
+    total = time.perf_counter() - started
+    items = len(calls) * items_per_call
+    return {
+        "name": name,
+        "params": params,
+        "items": items,
+        "seconds": total,
+        "throughput": items / total if total else None,
+        "p50_latency": float(np.percentile(latencies, 50)),
+        "p99_latency": float(np.percentile(latencies, 99)),
+        "peak_rss_bytes": _peak_rss_bytes(),
+    }
+
+
+def _bench_conversion(sentences: Sequence[str]) -> List[Dict[str, object]]:
+    results = []
+    for method in ("convert", "convert_to_grapheme_phoneme"):
+        converter = IPAConverter()
+        convert = getattr(converter, method)
+        results.append(
+            _measure(
+                f"IPAConverter.{method}",
+                [lambda text=text: convert(text) for text in sentences],
+            )
+        )
+    return results
+
+
+def _bench_lexicon(
+    phrases: Sequence[str], directory: Path, repeat: int
+) -> Tuple[List[Dict[str, object]], IPALexicon]:
+    """Time whole-lexicon operations ``repeat`` times each.
+
+    Every ``add_phrases`` run starts from a new converter, so its token
+    cache is cold. Binary lexicons are memory-mapped, so their load time
+    excludes materialising the entries.
+    """
+
+    size = len(phrases)
+    built: List[IPALexicon] = []
+
+    def build() -> None:
+        lexicon = IPALexicon(IPAConverter())
+        lexicon.add_phrases(phrases)
+        built[:] = [lexicon]
+
+    results = [
+        _measure(
+            "IPALexicon.add_phrases",
+            [build] * repeat,
+            items_per_call=size,
+            size=size,
+        )
+    ]
+    lexicon = built[0]
+    for binary in (False, True):
+        path = directory / f"lexicon-{size}.{'bin' if binary else 'json'}"
+        results.append(
+            _measure(
+                "IPALexicon.save_to",
+                [lambda: lexicon.save_to(path, binary=binary)] * repeat,
+                items_per_call=size,
+                size=size,
+                binary=binary,
+            )
+        )
+        loaded = IPALexicon(lexicon.converter)
+        results.append(
+            _measure(
+                "IPALexicon.load_from",
+                [lambda: loaded.load_from(path)] * repeat,
+                items_per_call=size,
+                size=size,
+                binary=binary,
+            )
+        )
+    return results, lexicon
+
+
+def _bench_alignment(
+    lexicon: IPALexicon,
+    sentences: Sequence[str],
+    query_count: int,
+    engines: Sequence[str],
+) -> List[Dict[str, object]]:
+    converted = lexicon.converter.convert_to_grapheme_phoneme_many(sentences)
+    entries = list(lexicon.entries.values())
+    queries = random.Random(len(entries)).sample(entries, min(query_count, len(entries)))
+    results = []
+    for engine in engines:
+        aligner = LocalAlignment(engine=engine)
+        results.append(
+            _measure(
+                "local_align_sentence",
+                [
+                    lambda sentence=sentence: local_align_sentence(
+                        sentence, queries, aligner
+                    )
+                    for sentence in converted
+                ],
+                size=len(entries),
+                queries=len(queries),
+                engine=engine,
+            )
+        )
+    return results
+
+
+def run(
+    sizes: Sequence[int] = DEFAULT_SIZES,
+    *,
+    backend: str = "stub",
+    sentences: int = DEFAULT_SENTENCES,
+    queries: int = DEFAULT_QUERIES,
+    engines: Sequence[str] = ("numpy", "lingpy"),
+    repeat: int = DEFAULT_REPEAT,
+    seed: int = 0,
+) -> Dict[str, object]:
+    """Run every benchmark and return the JSON-serialisable report."""
+
+    if backend not in ("stub", "real"):
+        raise ValueError(f"Unknown backend: {backend!r}")
+    corpus = CorpusGenerator(seed)
+    texts = corpus.sentences(sentences)
+    results: List[Dict[str, object]] = []
+    with stubbed_backends() if backend == "stub" else nullcontext():
+        results.extend(_bench_conversion(texts))
+        with tempfile.TemporaryDirectory() as directory:
+            for size in sizes:
+                lexicon_results, lexicon = _bench_lexicon(
+                    corpus.phrases(size), Path(directory), repeat
+                )
+                results.extend(lexicon_results)
+                results.extend(_bench_alignment(lexicon, texts, queries, engines))
+    return {
+        "metadata": {
+            "backend": backend,
+            "seed": seed,
+            "sizes": list(sizes),
+            "sentences": sentences,
+            "queries": queries,
+            "repeat": repeat,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": results,
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=("stub", "real"), default="stub")
+    parser.add_argument(
+        "--sizes",
+        default=",".join(map(str, DEFAULT_SIZES)),
+        help="comma-separated lexicon sizes",
+    )
+    parser.add_argument("--sentences", type=int, default=DEFAULT_SENTENCES)
+    parser.add_argument(
+        "--queries",
+        type=int,
+        default=DEFAULT_QUERIES,
+        help="lexicon entries aligned against every sentence",
+    )
+    parser.add_argument("--engines", default="numpy,lingpy")
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        help="runs of every whole-lexicon operation",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="JSON file; stdout if omitted")
+    args = parser.parse_args(argv)
+
+    report = run(
+        [int(size) for size in args.sizes.split(",")],
+        backend=args.backend,
+        sentences=args.sentences,
+        queries=args.queries,
+        engines=args.engines.split(","),
+        repeat=args.repeat,
+        seed=args.seed,
+    )
+    text = json.dumps(report, indent=2)
+    if args.output is None:
+        print(text)
+    else:
+        args.output.write_text(text + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -19,11 +19,17 @@ setup(
         "pypinyin",
         "panphon",
         "lingpy",
+        "numpy",
         "eng_to_ipa",
         "dragonmapper",
         "sktime",
         "openai",
         "abydos @ git+https://github.com/denizberkin/abydos.git",
     ],
+    entry_points={
+        "console_scripts": [
+            "asr-correction-server=asr_error_correction.server:main",
+        ],
+    },
     python_requires=">=3.8",
 )
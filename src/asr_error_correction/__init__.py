@@ -1,15 +1,39 @@
 """ASR error correction helpers."""
 from __future__ import annotations
 
+from .aio import AsyncAligner
 from .alignment import LocalAlignment, local_align_sentence
+from .approximate import ThresholdedAlignment, approximate_search
+from .client import CorrectionClient
 from .conversion import GraphemePhoneme, IPAConverter, TokenizedSegment
+from .correction import correct
+from .corpus import align_corpus
 from .lexicon import IPALexicon
+from .live import LiveLexicon
+from .memo import CachedAlignment
+from .phonemes import SymbolTable, segment_phonemes
+from .pronunciations import FrozenPronunciations
+from .server import CorrectionServer
+from .streaming import StreamingSession
 
 __all__ = [
+    "AsyncAligner",
+    "CachedAlignment",
+    "CorrectionClient",
+    "CorrectionServer",
+    "FrozenPronunciations",
     "GraphemePhoneme",
     "IPAConverter",
     "IPALexicon",
+    "LiveLexicon",
     "LocalAlignment",
+    "StreamingSession",
+    "SymbolTable",
+    "ThresholdedAlignment",
     "TokenizedSegment",
+    "align_corpus",
+    "approximate_search",
+    "correct",
     "local_align_sentence",
+    "segment_phonemes",
 ]
@@ -0,0 +1,160 @@
+"""Asyncio front end for converting and aligning transcripts."""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing.context import BaseContext
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Deque,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from .alignment import LocalAlignment, local_align_sentence
+from .conversion import GraphemePhoneme, IPAConverter
+from .lexicon import IPALexicon
+
+__all__ = ["AsyncAligner"]
+
+
+DEFAULT_MAX_IN_FLIGHT = 8
+
+_EXECUTORS = ("thread", "process")
+
+SentenceResult = Tuple[
+    GraphemePhoneme, List[Tuple[GraphemePhoneme, List[Tuple[float, GraphemePhoneme]]]]
+]
+
+
+class _AlignmentJob:
+    """Picklable unit of work: convert one transcript and align it."""
+
+    def __init__(
+        self,
+        converter: IPAConverter,
+        queries: Sequence[GraphemePhoneme],
+        aligner: Optional[LocalAlignment],
+    ) -> None:
+        self.converter = converter
+        self.queries = queries
+        self.aligner = aligner
+
+    def __call__(self, text: str) -> SentenceResult:
+        sentence = self.converter.convert_to_grapheme_phoneme(text)
+        return sentence, local_align_sentence(sentence, self.queries, self.aligner)
+
+
+_worker_job: Optional[_AlignmentJob] = None
+
+
+def _init_worker(job: _AlignmentJob) -> None:
+    global _worker_job
+    _worker_job = job
+
+
+def _run_worker_job(text: str) -> SentenceResult:
+    assert _worker_job is not None
+    return _worker_job(text)
+
+
+class AsyncAligner:
+    """Convert and align transcripts without blocking the event loop.
+
+    Every transcript is converted with the lexicon's converter and aligned
+    against all lexicon entries by :func:`local_align_sentence` on an
+    executor. ``executor`` is ``"thread"``, ``"process"`` (whose workers
+    receive the lexicon once, when they start) or an existing
+    :class:`~concurrent.futures.Executor`, which is then left running by
+    :meth:`aclose`. An existing executor runs in this process, e.g. a
+    thread pool; a :class:`~concurrent.futures.ProcessPoolExecutor` is
+    rejected, since every task would carry the whole lexicon to it.
+
+    At most ``max_in_flight`` transcripts are submitted at a time; while
+    the window is full, :meth:`align_stream` stops reading its source, so a
+    burst of input cannot queue unbounded work.
+    """
+
+    def __init__(
+        self,
+        lexicon: IPALexicon,
+        aligner: Optional[LocalAlignment] = None,
+        *,
+        executor: Union[str, Executor] = "thread",
+        workers: Optional[int] = None,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        mp_context: Optional[BaseContext] = None,
+    ) -> None:
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be positive")
+        if isinstance(executor, str) and executor not in _EXECUTORS:
+            raise ValueError(f"Unknown executor: {executor!r}")
+        if isinstance(executor, ProcessPoolExecutor):
+            # Its workers were started without the lexicon, which would then
+            # be pickled into every transcript's task.
+            raise ValueError(
+                "Process pools cannot be passed in; use executor='process'"
+            )
+        self.max_in_flight = max_in_flight
+        self._job = _AlignmentJob(
+            lexicon.converter, list(lexicon.entries.values()), aligner
+        )
+        self._owns_executor = isinstance(executor, str)
+        if executor == "thread":
+            self._executor: Executor = ThreadPoolExecutor(max_workers=workers)
+        elif executor == "process":
+            self._executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=mp_context,
+                initializer=_init_worker,
+                initargs=(self._job,),
+            )
+        else:
+            self._executor = executor
+        self._in_workers = executor == "process"
+
+    async def __aenter__(self) -> "AsyncAligner":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Shut down the executor if it was created by this object."""
+
+        if self._owns_executor:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._executor.shutdown)
+
+    def _submit(self, text: str) -> "asyncio.Future[SentenceResult]":
+        loop = asyncio.get_running_loop()
+        if self._in_workers:
+            return loop.run_in_executor(self._executor, _run_worker_job, text)
+        return loop.run_in_executor(self._executor, self._job, text)
+
+    async def align(self, text: str) -> SentenceResult:
+        """Convert and align one transcript."""
+
+        return await self._submit(text)
+
+    async def align_stream(
+        self, transcripts: AsyncIterable[str]
+    ) -> AsyncIterator[SentenceResult]:
+        """Yield ``(sentence, alignments)`` for every transcript, in order."""
+
+        pending: Deque["asyncio.Future[SentenceResult]"] = deque()
+        try:
+            async for text in transcripts:
+                pending.append(self._submit(text))
+                if len(pending) >= self.max_in_flight:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for future in pending:
+                future.cancel()
@@ -2,11 +2,16 @@
 from __future__ import annotations
 
 import logging
-from typing import List, Sequence, Tuple
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
 
-from lingpy.align import pw_align
+import numpy as np
 
 from .conversion import GraphemePhoneme
+from .instrumentation import INSTRUMENTATION
+from .overlap import OverlapHit, overlap_align_many, overlap_hits_many
+from .phonemes import SYMBOLS
+from .scoring import DEFAULT_CACHE_DIR, table_matrix
 
 logging.getLogger("lingpy").setLevel(logging.WARNING)
 
@@ -16,6 +21,14 @@ __all__ = [
 ]
 
 
+def pw_align(*args: object, **kwargs: object):
+    """``lingpy.align.pw_align``; lingpy is imported on first use."""
+
+    from lingpy.align import pw_align as lingpy_pw_align
+
+    return lingpy_pw_align(*args, **kwargs)
+
+
 def _is_alignment_marker(token: str) -> bool:
     """Return ``True`` if *token* represents an insertion/deletion marker."""
 
@@ -25,6 +38,7 @@ def _is_alignment_marker(token: str) -> bool:
     return stripped in {"", "-", "‖"}
 
 
+@INSTRUMENTATION.timed("alignment.extract_span")
 def _extract_matched_span(
     sentence_tokens: Sequence[str], query_tokens: Sequence[str]
 ) -> Tuple[str, int, int] | None:
@@ -53,15 +67,103 @@ def _extract_matched_span(
     return matched_str, start_index, end_index
 
 
+_ENGINES = ("lingpy", "numpy")
+_SCORINGS = ("identity", "features")
+
+
 class LocalAlignment:
-    """Local alignment between a sentence IPA string and a query IPA string."""
+    """Local alignment between a sentence IPA string and a query IPA string.
+
+    ``engine`` selects the dynamic programming backend: ``"lingpy"`` (the
+    default) delegates to ``lingpy.align.pw_align`` while ``"numpy"`` runs the
+    same overlap alignment with the vectorised implementation in
+    :mod:`asr_error_correction.overlap`.
+
+    By default the IPA strings are compared character by character. With
+    ``segmented`` they are compared as phoneme segments (see
+    :func:`~asr_error_correction.phonemes.segment_phonemes`), so ``pʰ`` or
+    ``tɕ`` count as one unit; the ``"numpy"`` engine then works on the
+    integer :attr:`GraphemePhoneme.phoneme_codes`.
+
+    ``scoring="features"`` replaces the +1/-1 identity scores by the panphon
+    feature similarity of :func:`~asr_error_correction.scoring.substitution_matrix`,
+    so that e.g. ``ʂ`` against ``s`` costs far less than ``ʂ`` against ``a``.
+    It implies ``segmented``; the matrix is cached under ``cache_dir``.
+
+    ``max_hits`` asks for up to that many non-overlapping occurrences of the
+    query, best first, read from the same DP matrix (``"numpy"`` engine
+    only, see :func:`~asr_error_correction.overlap.overlap_hits_many`).
+    Hits scoring below ``min_score`` are dropped.
+    """
+
+    def __init__(
+        self,
+        engine: str = "lingpy",
+        *,
+        segmented: bool = False,
+        scoring: str = "identity",
+        cache_dir: Optional[Path | str] = DEFAULT_CACHE_DIR,
+        max_hits: int = 1,
+        min_score: Optional[float] = None,
+    ) -> None:
+        if engine not in _ENGINES:
+            raise ValueError(f"Unknown alignment engine: {engine!r}")
+        if scoring not in _SCORINGS:
+            raise ValueError(f"Unknown alignment scoring: {scoring!r}")
+        if max_hits < 1:
+            raise ValueError("max_hits must be positive")
+        if max_hits > 1 and engine != "numpy":
+            raise ValueError("max_hits > 1 requires the 'numpy' engine")
+        self.engine = engine
+        self.scoring = scoring
+        self.segmented = segmented or scoring == "features"
+        self.cache_dir = cache_dir
+        self.max_hits = max_hits
+        self.min_score = min_score
+
+    def _scorer(self) -> Optional[np.ndarray]:
+        # Only valid once the aligned sequences have been encoded, so that
+        # every code they use is part of the inventory.
+        if self.scoring != "features":
+            return None
+        return table_matrix(SYMBOLS, self.cache_dir)
 
     def align(
         self, sentence: GraphemePhoneme, query: GraphemePhoneme
     ) -> List[Tuple[float, GraphemePhoneme]]:
-        """Align ``sentence`` against ``query`` using ``lingpy``."""
+        """Align ``sentence`` against ``query`` using the configured engine."""
+
+        return self._project_hits(sentence, self._hits(sentence, query))
+
+    def _config(self) -> Tuple[object, ...]:
+        """Everything besides the two phoneme sequences that affects hits."""
+
+        return (self.engine, self.scoring, self.segmented, self.max_hits, self.min_score)
+
+    def _hits(
+        self, sentence: GraphemePhoneme, query: GraphemePhoneme
+    ) -> List[OverlapHit]:
+        """Return the unprojected hits of ``query`` in ``sentence``."""
 
-        alignment = pw_align(sentence.phoneme_str, query.phoneme_str, mode="overlap")
+        if self.engine == "numpy":
+            return self._overlap_hits(sentence, [query])[0]
+
+        if INSTRUMENTATION.enabled:
+            INSTRUMENTATION.increment("alignment.pairs")
+        if self.segmented:
+            scorer = self._lingpy_scorer(sentence, query)
+            with INSTRUMENTATION.timer("alignment.dp"):
+                alignment = pw_align(
+                    sentence.phoneme_segments,
+                    query.phoneme_segments,
+                    mode="overlap",
+                    scorer=scorer,
+                )
+        else:
+            with INSTRUMENTATION.timer("alignment.dp"):
+                alignment = pw_align(
+                    sentence.phoneme_str, query.phoneme_str, mode="overlap"
+                )
         if not alignment:
             return []
         sentence_tokens, query_tokens, score = alignment
@@ -69,10 +171,101 @@ class LocalAlignment:
         if not span:
             return []
         _, start, end = span
-        matched = sentence.subsequence_covering_span(start, end)
-        if matched is None:
-            return []
-        return [(score, matched)]
+        return [OverlapHit(score, start, end)]
+
+    def _lingpy_scorer(
+        self, sentence: GraphemePhoneme, query: GraphemePhoneme
+    ) -> Dict[Tuple[str, str], float] | bool:
+        sentence_codes = set(sentence.phoneme_codes)
+        query_codes = set(query.phoneme_codes)
+        matrix = self._scorer()
+        if matrix is None:
+            # ``pw_align`` builds its identity scorer itself.
+            return False
+        scorer: Dict[Tuple[str, str], float] = {}
+        for a in sentence_codes:
+            for b in query_codes:
+                score = float(matrix[a, b])
+                scorer[SYMBOLS.symbol(a), SYMBOLS.symbol(b)] = score
+                scorer[SYMBOLS.symbol(b), SYMBOLS.symbol(a)] = score
+        return scorer
+
+    def align_many(
+        self, sentence: GraphemePhoneme, queries: Sequence[GraphemePhoneme]
+    ) -> List[List[Tuple[float, GraphemePhoneme]]]:
+        """Align ``sentence`` against every query, in order.
+
+        The ``"numpy"`` engine aligns all queries in one batched pass;
+        other engines fall back to :meth:`align` for each query.
+        """
+
+        if self.engine != "numpy":
+            return [self.align(sentence, query) for query in queries]
+        return [
+            self._project_hits(sentence, hits)
+            for hits in self._overlap_hits(sentence, queries)
+        ]
+
+    def hits_many(
+        self, sentence: GraphemePhoneme, queries: Sequence[GraphemePhoneme]
+    ) -> List[List[OverlapHit]]:
+        """Return the hits of every query as spans of ``sentence.phoneme_str``.
+
+        Unlike :meth:`align_many` the hits are not projected onto
+        ``sentence`` and may score below ``min_score``; callers map the
+        spans themselves, e.g. with
+        :meth:`GraphemePhoneme.grapheme_span_covering`.
+        """
+
+        if self.engine != "numpy":
+            return [self._hits(sentence, query) for query in queries]
+        return self._overlap_hits(sentence, queries)
+
+    def _overlap_hits(
+        self, sentence: GraphemePhoneme, queries: Sequence[GraphemePhoneme]
+    ) -> List[List[OverlapHit]]:
+        if self.segmented:
+            sentence_units: Sequence = sentence.phoneme_codes
+            query_units: List[Sequence] = [query.phoneme_codes for query in queries]
+            options = {"table": SYMBOLS, "scorer": self._scorer()}
+        else:
+            sentence_units = sentence.phoneme_str
+            query_units = [query.phoneme_str for query in queries]
+            options = {}
+        if INSTRUMENTATION.enabled:
+            INSTRUMENTATION.increment("alignment.pairs", len(queries))
+        with INSTRUMENTATION.timer("alignment.dp"):
+            if self.max_hits > 1:
+                return overlap_hits_many(
+                    sentence_units,
+                    query_units,
+                    max_hits=self.max_hits,
+                    min_score=self.min_score,
+                    **options,
+                )
+            hits = overlap_align_many(sentence_units, query_units, **options)
+        return [[] if hit is None else [hit] for hit in hits]
+
+    def _project_hits(
+        self, sentence: GraphemePhoneme, hits: Sequence[OverlapHit]
+    ) -> List[Tuple[float, GraphemePhoneme]]:
+        projected: List[Tuple[float, GraphemePhoneme]] = []
+        for hit in hits:
+            if self.min_score is None or hit.score >= self.min_score:
+                projected.extend(_project_hit(sentence, hit))
+        return projected
+
+
+def _project_hit(
+    sentence: GraphemePhoneme, hit: OverlapHit | None
+) -> List[Tuple[float, GraphemePhoneme]]:
+    if hit is None:
+        return []
+    with INSTRUMENTATION.timer("alignment.subsequence"):
+        matched = sentence.subsequence_covering_span(hit.start, hit.end)
+    if matched is None:
+        return []
+    return [(hit.score, matched)]
 
 
 def local_align_sentence(
@@ -80,9 +273,18 @@ def local_align_sentence(
     query_graphemes: Sequence[GraphemePhoneme],
     aligner: LocalAlignment | None = None,
 ) -> List[Tuple[GraphemePhoneme, List[Tuple[float, GraphemePhoneme]]]]:
-    """Align ``sentence`` against each query in ``query_graphemes``."""
+    """Align ``sentence`` against each query in ``query_graphemes``.
+
+    Aligners that provide ``align_many`` (such as :class:`LocalAlignment`
+    with the ``"numpy"`` engine) receive every query in a single call.
+    """
 
     local_aligner = aligner or LocalAlignment()
+    align_many = getattr(local_aligner, "align_many", None)
+    if align_many is not None:
+        queries = list(query_graphemes)
+        return list(zip(queries, align_many(sentence, queries)))
+
     results: List[Tuple[GraphemePhoneme, List[Tuple[float, GraphemePhoneme]]]] = []
     for query in query_graphemes:
         results.append((query, local_aligner.align(sentence, query)))
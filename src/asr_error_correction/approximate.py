@@ -0,0 +1,127 @@
+"""Bit-parallel approximate substring search over phoneme sequences."""
+from __future__ import annotations
+
+from typing import Dict, Hashable, Iterator, List, NamedTuple, Sequence, Tuple
+
+from .alignment import LocalAlignment, local_align_sentence
+from .conversion import GraphemePhoneme
+
+__all__ = ["ApproximateMatch", "ThresholdedAlignment", "approximate_search"]
+
+
+class ApproximateMatch(NamedTuple):
+    """An occurrence of the pattern ending at ``end`` with ``distance`` edits."""
+
+    end: int
+    distance: int
+
+
+def approximate_search(
+    text: Sequence[Hashable], pattern: Sequence[Hashable], max_errors: int
+) -> Iterator[ApproximateMatch]:
+    """Yield the ends of ``pattern`` occurrences in ``text`` within ``max_errors``.
+
+    This is Myers' bit-vector algorithm: the edit-distance column for every
+    text position is updated with a constant number of integer operations,
+    so the whole scan is linear in ``len(text)`` for patterns of ordinary
+    length. ``end`` is exclusive, i.e. ``text[:end]`` contains the match.
+    Matches are produced lazily, so callers that only need to know whether
+    the pattern occurs can stop at the first one.
+    """
+
+    if max_errors < 0:
+        raise ValueError("max_errors must be non-negative")
+    m = len(pattern)
+    if m == 0:
+        yield from (ApproximateMatch(end, 0) for end in range(len(text) + 1))
+        return
+    if m - max_errors > len(text):
+        return
+
+    peq: Dict[Hashable, int] = {}
+    for position, symbol in enumerate(pattern):
+        peq[symbol] = peq.get(symbol, 0) | (1 << position)
+
+    mask = (1 << m) - 1
+    high = 1 << (m - 1)
+    pv, mv, score = mask, 0, m
+    for position, symbol in enumerate(text):
+        eq = peq.get(symbol, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        # The first row stays at zero: a match may start anywhere in text.
+        ph = (ph << 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+        if score <= max_errors:
+            yield ApproximateMatch(position + 1, score)
+
+
+class ThresholdedAlignment:
+    """Spot queries occurring in a sentence within ``max_errors`` phoneme edits.
+
+    Pairs are first screened with :func:`approximate_search`; only queries
+    that pass are handed to ``aligner`` to obtain the scored
+    :class:`GraphemePhoneme` span.
+    """
+
+    def __init__(
+        self, max_errors: int, aligner: LocalAlignment | None = None
+    ) -> None:
+        if max_errors < 0:
+            raise ValueError("max_errors must be non-negative")
+        self.max_errors = max_errors
+        self.aligner = aligner or LocalAlignment()
+
+    def search(
+        self, sentence: GraphemePhoneme, query: GraphemePhoneme
+    ) -> List[ApproximateMatch]:
+        """Return every end position of ``query`` within the edit budget."""
+
+        return list(
+            approximate_search(sentence.phoneme_str, query.phoneme_str, self.max_errors)
+        )
+
+    def matches(self, sentence: GraphemePhoneme, query: GraphemePhoneme) -> bool:
+        """Return ``True`` as soon as one occurrence of ``query`` is found."""
+
+        hits = approximate_search(
+            sentence.phoneme_str, query.phoneme_str, self.max_errors
+        )
+        return next(hits, None) is not None
+
+    def align(
+        self, sentence: GraphemePhoneme, query: GraphemePhoneme
+    ) -> List[Tuple[float, GraphemePhoneme]]:
+        """Align ``query`` with the full scorer only if it passes the screen."""
+
+        if not self.matches(sentence, query):
+            return []
+        return self.aligner.align(sentence, query)
+
+    def align_many(
+        self, sentence: GraphemePhoneme, queries: Sequence[GraphemePhoneme]
+    ) -> List[List[Tuple[float, GraphemePhoneme]]]:
+        """Screen every query, then align the survivors in one call."""
+
+        results: List[List[Tuple[float, GraphemePhoneme]]] = [[] for _ in queries]
+        passing = [
+            position
+            for position, query in enumerate(queries)
+            if self.matches(sentence, query)
+        ]
+        if not passing:
+            return results
+        aligned = local_align_sentence(
+            sentence, [queries[position] for position in passing], self.aligner
+        )
+        for position, (_, hits) in zip(passing, aligned):
+            results[position] = hits
+        return results
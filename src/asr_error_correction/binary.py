@@ -0,0 +1,262 @@
+"""Compact, memory-mapped binary storage for lexicon entries.
+
+Layout (little endian)::
+
+    header          magic, entry count, token count, string blob size
+    string_offsets  uint64[3 * entries + 1]  key, grapheme_str, phoneme_str
+    token_offsets   uint64[entries + 1]      first token of every entry
+    grapheme_spans  uint32[2 * tokens]       spans into grapheme_str
+    phoneme_ends    uint32[tokens]           token ends in phoneme_str
+    sorted_ids      uint32[entries]          entries ordered by key bytes
+    blob            UTF-8 strings
+
+The file is opened with :mod:`mmap`, so processes opening the same file share
+its pages, and entries are only turned into :class:`GraphemePhoneme` objects
+when they are accessed.
+"""
+from __future__ import annotations
+
+import mmap
+import struct
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, MutableMapping, Set, Tuple
+
+import numpy as np
+
+from .conversion import GraphemePhoneme
+
+__all__ = ["MappedEntries", "is_binary_lexicon", "write_binary_lexicon"]
+
+
+MAGIC = b"IPALEXB1"
+_HEADER = struct.Struct("<8sQQQ")
+
+
+def is_binary_lexicon(path: Path | str) -> bool:
+    """Return ``True`` if ``path`` starts with the binary lexicon header."""
+
+    with Path(path).open("rb") as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+
+def write_binary_lexicon(
+    path: Path | str, items: Iterable[Tuple[str, GraphemePhoneme]]
+) -> None:
+    """Write the ``(key, entry)`` pairs of ``items`` to ``path``."""
+
+    blob = bytearray()
+    string_offsets = [0]
+    token_offsets = [0]
+    grapheme_spans = []
+    phoneme_ends = []
+    encoded_keys = []
+    for key, value in items:
+        encoded_key = key.encode("utf-8")
+        encoded_keys.append(encoded_key)
+        for encoded in (
+            encoded_key,
+            value.grapheme_str.encode("utf-8"),
+            value.phoneme_str.encode("utf-8"),
+        ):
+            blob += encoded
+            string_offsets.append(len(blob))
+        for start, end in value.grapheme_spans:
+            grapheme_spans.extend((start, end))
+        phoneme_ends.extend(end for _, end in value.phoneme_spans)
+        token_offsets.append(len(phoneme_ends))
+
+    sorted_ids = sorted(range(len(encoded_keys)), key=encoded_keys.__getitem__)
+    sections = (
+        np.asarray(string_offsets, dtype="<u8"),
+        np.asarray(token_offsets, dtype="<u8"),
+        np.asarray(grapheme_spans, dtype="<u4"),
+        np.asarray(phoneme_ends, dtype="<u4"),
+        np.asarray(sorted_ids, dtype="<u4"),
+    )
+    output_path = Path(path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with output_path.open("wb") as file:
+        file.write(_HEADER.pack(MAGIC, len(encoded_keys), len(phoneme_ends), len(blob)))
+        for section in sections:
+            file.write(section.tobytes())
+        file.write(bytes(blob))
+
+
+class MappedEntries(MutableMapping[str, GraphemePhoneme]):
+    """Dictionary-like view over a binary lexicon file.
+
+    Lookups binary-search the sorted key table and build the requested
+    :class:`GraphemePhoneme` on demand. Entries added, replaced or deleted
+    after opening are kept in memory on top of the mapped file, which is
+    never modified. :meth:`close` (or leaving a ``with`` block) releases
+    the mapping; stored entries cannot be read afterwards.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        with self.path.open("rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, entries, tokens, blob_size = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a binary lexicon")
+
+        offset = _HEADER.size
+        sections = []
+        for dtype, count in (
+            ("<u8", 3 * entries + 1),
+            ("<u8", entries + 1),
+            ("<u4", 2 * tokens),
+            ("<u4", tokens),
+            ("<u4", entries),
+        ):
+            sections.append(np.frombuffer(self._map, dtype, count, offset))
+            offset += sections[-1].nbytes
+        (
+            self._string_offsets,
+            self._token_offsets,
+            self._grapheme_spans,
+            self._phoneme_ends,
+            self._sorted_ids,
+        ) = sections
+        self._blob_start = offset
+        self._size = entries
+        self._overlay: Dict[str, GraphemePhoneme] = {}
+        self._removed: Set[str] = set()
+        self._length = entries
+
+    def __reduce__(self):
+        return (_reopen, (str(self.path), self._overlay, self._removed))
+
+    def __enter__(self) -> "MappedEntries":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._map.closed
+
+    def close(self) -> None:
+        """Unmap the file, so it can be replaced or deleted on every platform."""
+
+        if self._map.closed:
+            return
+        # The section arrays export the map's buffer, which blocks closing.
+        empty = np.empty(0, dtype="<u4")
+        self._string_offsets = self._token_offsets = empty
+        self._grapheme_spans = self._phoneme_ends = self._sorted_ids = empty
+        self._map.close()
+
+    def _check_open(self) -> None:
+        if self._map.closed:
+            raise ValueError(f"{self.path} has been closed")
+
+    def _string(self, index: int) -> str:
+        self._check_open()
+        start = self._blob_start + int(self._string_offsets[index])
+        end = self._blob_start + int(self._string_offsets[index + 1])
+        return self._map[start:end].decode("utf-8")
+
+    def _key_bytes(self, entry: int) -> bytes:
+        start = self._blob_start + int(self._string_offsets[3 * entry])
+        end = self._blob_start + int(self._string_offsets[3 * entry + 1])
+        return self._map[start:end]
+
+    def _find(self, key: str) -> int | None:
+        self._check_open()
+        target = key.encode("utf-8")
+        lo, hi = 0, self._size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            candidate = self._key_bytes(int(self._sorted_ids[mid]))
+            if candidate < target:
+                lo = mid + 1
+            elif candidate > target:
+                hi = mid
+            else:
+                return int(self._sorted_ids[mid])
+        return None
+
+    def phoneme_str(self, entry: int) -> str:
+        """Return the phoneme string of stored entry ``entry`` only."""
+
+        return self._string(3 * entry + 2)
+
+    def materialize(self, entry: int) -> GraphemePhoneme:
+        """Build the :class:`GraphemePhoneme` of stored entry ``entry``."""
+
+        self._check_open()
+        first = int(self._token_offsets[entry])
+        last = int(self._token_offsets[entry + 1])
+        return GraphemePhoneme._from_offsets(
+            self._string(3 * entry + 1),
+            self._string(3 * entry + 2),
+            array("I", self._grapheme_spans[2 * first : 2 * last].tolist()),
+            array("I", self._phoneme_ends[first:last].tolist()),
+        )
+
+    def __getitem__(self, key: str) -> GraphemePhoneme:
+        if key in self._overlay:
+            return self._overlay[key]
+        if key in self._removed:
+            raise KeyError(key)
+        entry = self._find(key)
+        if entry is None:
+            raise KeyError(key)
+        return self.materialize(entry)
+
+    def __contains__(self, key: object) -> bool:
+        if not isinstance(key, str):
+            return False
+        if key in self._overlay:
+            return True
+        return key not in self._removed and self._find(key) is not None
+
+    def __setitem__(self, key: str, value: GraphemePhoneme) -> None:
+        if key not in self:
+            self._length += 1
+        self._removed.discard(key)
+        self._overlay[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key not in self:
+            raise KeyError(key)
+        self._overlay.pop(key, None)
+        if self._find(key) is not None:
+            self._removed.add(key)
+        self._length -= 1
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[str]:
+        for entry in range(self._size):
+            key = self._string(3 * entry)
+            if key not in self._removed:
+                yield key
+        for key in self._overlay:
+            if self._find(key) is None:
+                yield key
+
+    def iter_items(self) -> Iterator[Tuple[str, GraphemePhoneme]]:
+        """Yield ``(key, entry)`` pairs in order without per-key lookups."""
+
+        for entry in range(self._size):
+            key = self._string(3 * entry)
+            if key in self._removed:
+                continue
+            value = self._overlay.get(key)
+            yield key, value if value is not None else self.materialize(entry)
+        for key, value in self._overlay.items():
+            if self._find(key) is None:
+                yield key, value
+
+
+def _reopen(path: str, overlay: Dict[str, GraphemePhoneme], removed: Set[str]):
+    entries = MappedEntries(path)
+    for key in removed:
+        del entries[key]
+    entries.update(overlay)
+    return entries
@@ -0,0 +1,97 @@
+"""Bounded caches shared by the conversion and alignment helpers."""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Generic, Hashable, NamedTuple, Optional, TypeVar
+
+__all__ = ["CacheInfo", "LRUCache"]
+
+
+_V = TypeVar("_V")
+
+
+class CacheInfo(NamedTuple):
+    """Usage statistics reported by :class:`LRUCache`."""
+
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int
+    currsize: int
+
+
+class LRUCache(Generic[_V]):
+    """A thread-safe mapping that evicts the least recently used entry.
+
+    A ``maxsize`` of ``0`` disables the cache: lookups always miss and
+    nothing is stored.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        if maxsize < 0:
+            raise ValueError("maxsize must be non-negative")
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, _V]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def get(self, key: Hashable) -> Optional[_V]:
+        """Return the value stored under ``key`` or ``None`` on a miss."""
+
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self._misses += 1
+                return None
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: Hashable, value: _V) -> None:
+        """Store ``value`` under ``key``, evicting old entries when full."""
+
+        if not self.maxsize:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry and reset the statistics."""
+
+        with self._lock:
+            self._data.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def info(self) -> CacheInfo:
+        """Return a snapshot of the cache statistics."""
+
+        with self._lock:
+            return CacheInfo(
+                self._hits,
+                self._misses,
+                self._evictions,
+                self.maxsize,
+                len(self._data),
+            )
+
+    def __getstate__(self) -> dict:
+        # Locks cannot be pickled and cached values are cheap to rebuild, so
+        # copies start out empty.
+        return {"maxsize": self.maxsize}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["maxsize"])
@@ -0,0 +1,202 @@
+"""Blocking client for :mod:`asr_error_correction.server` with pooled connections."""
+from __future__ import annotations
+
+import json
+import socket
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .conversion import GraphemePhoneme
+from .server import _FRAME_HEADER, MAX_FRAME_SIZE, Address, _encode_frame
+
+__all__ = ["CorrectionClient", "ServerError"]
+
+
+DEFAULT_POOL_SIZE = 4
+
+Alignments = List[Tuple[str, List[Tuple[float, GraphemePhoneme]]]]
+
+
+class ServerError(RuntimeError):
+    """The server could not answer a request."""
+
+
+class _Connection:
+    def __init__(self, address: Address, timeout: Optional[float]) -> None:
+        if isinstance(address, str):
+            self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.socket.settimeout(timeout)
+        try:
+            self.socket.connect(address)
+        except OSError:
+            self.socket.close()
+            raise
+        self._file = self.socket.makefile("rb")
+
+    def _read_exactly(self, size: int) -> bytes:
+        data = self._file.read(size)
+        if len(data) != size:
+            raise ConnectionError("Connection closed by the server")
+        return data
+
+    def read_frame(self) -> dict:
+        (size,) = _FRAME_HEADER.unpack(self._read_exactly(_FRAME_HEADER.size))
+        if size > MAX_FRAME_SIZE:
+            raise ConnectionError(f"Frame of {size} bytes exceeds the limit")
+        return json.loads(self._read_exactly(size).decode("utf-8"))
+
+    def close(self) -> None:
+        self._file.close()
+        self.socket.close()
+
+
+class CorrectionClient:
+    """Talk to a :class:`~asr_error_correction.server.CorrectionServer`.
+
+    ``address`` is the server's Unix socket path or ``(host, port)``. The
+    client is thread-safe: every call borrows one of up to ``pool_size``
+    connections, opened on demand and reused afterwards, and waits for one
+    to be returned when all are busy. The ``*_many`` methods send all their
+    requests before reading any response, so the server can answer them in
+    as few batches as possible.
+    """
+
+    def __init__(
+        self,
+        address: Address,
+        *,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: Optional[float] = None,
+    ) -> None:
+        if pool_size < 1:
+            raise ValueError("pool_size must be positive")
+        self.address = address
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._idle: List[_Connection] = []
+        self._opened = 0
+        self._available = threading.Condition()
+        self._closed = False
+
+    def __enter__(self) -> "CorrectionClient":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close every idle connection; busy ones are closed when returned."""
+
+        with self._available:
+            self._closed = True
+            for connection in self._idle:
+                connection.close()
+            self._opened -= len(self._idle)
+            self._idle.clear()
+
+    @contextmanager
+    def _connection(self) -> Iterator[_Connection]:
+        with self._available:
+            while True:
+                if self._closed:
+                    raise ValueError("Client is closed")
+                if self._idle:
+                    connection: Optional[_Connection] = self._idle.pop()
+                    break
+                if self._opened < self.pool_size:
+                    connection = None
+                    self._opened += 1
+                    break
+                self._available.wait()
+        try:
+            if connection is None:
+                connection = _Connection(self.address, self.timeout)
+            yield connection
+        except BaseException:
+            # The connection may have unread responses: never reuse it.
+            if connection is not None:
+                connection.close()
+            with self._available:
+                self._opened -= 1
+                self._available.notify()
+            raise
+        with self._available:
+            if self._closed:
+                connection.close()
+                self._opened -= 1
+            else:
+                self._idle.append(connection)
+            self._available.notify()
+
+    def _call(self, op: str, texts: Sequence[str]) -> List[object]:
+        if not texts:
+            return []
+        with self._connection() as connection:
+            connection.socket.sendall(
+                b"".join(
+                    _encode_frame({"id": request_id, "op": op, "text": text})
+                    for request_id, text in enumerate(texts)
+                )
+            )
+            responses: Dict[int, dict] = {}
+            while len(responses) < len(texts):
+                response = connection.read_frame()
+                responses[response["id"]] = response
+        results = []
+        for request_id in range(len(texts)):
+            response = responses[request_id]
+            if "error" in response:
+                raise ServerError(response["error"])
+            results.append(response["result"])
+        return results
+
+    def convert(self, text: str) -> str:
+        """Return ``IPAConverter.convert(text)`` computed by the server."""
+
+        return self.convert_many([text])[0]
+
+    def convert_many(self, texts: Sequence[str]) -> List[str]:
+        return self._call("convert", list(texts))  # type: ignore[return-value]
+
+    def convert_to_grapheme_phoneme(self, text: str) -> GraphemePhoneme:
+        return self.convert_to_grapheme_phoneme_many([text])[0]
+
+    def convert_to_grapheme_phoneme_many(
+        self, texts: Sequence[str]
+    ) -> List[GraphemePhoneme]:
+        return [
+            GraphemePhoneme.from_dict(payload)  # type: ignore[arg-type]
+            for payload in self._call("grapheme_phoneme", list(texts))
+        ]
+
+    def align(self, text: str) -> Tuple[GraphemePhoneme, Alignments]:
+        """Convert ``text`` and align it against the server's lexicon.
+
+        Returns the converted sentence and ``(key, hits)`` for every lexicon
+        entry with at least one hit, in lexicon order.
+        """
+
+        return self.align_many([text])[0]
+
+    def align_many(
+        self, texts: Sequence[str]
+    ) -> List[Tuple[GraphemePhoneme, Alignments]]:
+        results = []
+        for payload in self._call("align", list(texts)):
+            matches = [
+                (
+                    key,
+                    [
+                        (score, GraphemePhoneme.from_dict(matched))
+                        for score, matched in hits
+                    ],
+                )
+                for key, hits in payload["matches"]  # type: ignore[index]
+            ]
+            sentence = GraphemePhoneme.from_dict(payload["sentence"])  # type: ignore[index]
+            results.append((sentence, matches))
+        return results
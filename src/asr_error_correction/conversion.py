@@ -3,20 +3,38 @@ from __future__ import annotations
 
 import re
 import unicodedata
-from dataclasses import dataclass
-from typing import Iterable, List, Sequence, Tuple
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import FrozenInstanceError, dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
-from dragonmapper.hanzi import to_ipa as hanzi_to_ipa
-from eng_to_ipa import convert as eng_to_ipa_convert
+from .cache import CacheInfo, LRUCache
+from .instrumentation import INSTRUMENTATION
+from .phonemes import SYMBOLS, segment_phonemes
+from .pronunciations import FrozenPronunciations
 
 
 __all__ = ["GraphemePhoneme", "IPAConverter", "TokenizedSegment"]
 
 
-_CHINESE_RE = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff]+")
-_TOKEN_RE = re.compile(
-    r"[\u3400-\u4dbf\u4e00-\u9fff]+|[A-Za-z]+|[^A-Za-z\u3400-\u4dbf\u4e00-\u9fff]+"
-)
+# Code point classes of the tokenizer, compiled into its character sets:
+# Han characters (CJK Unified Ideographs and Extension A), ASCII letters and
+# everything else.
+_HAN_RANGES = ((0x3400, 0x4DBF), (0x4E00, 0x9FFF))
+_HAN = "".join(f"{chr(first)}-{chr(last)}" for first, last in _HAN_RANGES)
+
+_CHINESE_RE = re.compile(f"[{_HAN}]+")
+_TOKEN_RE = re.compile(f"[{_HAN}]+|[A-Za-z]+|[^A-Za-z{_HAN}]+")
+# Same tokens as ``_TOKEN_RE``; the group that matched tells the class.
+_SEGMENT_RE = re.compile(f"([{_HAN}]+)|([A-Za-z]+)|[^A-Za-z{_HAN}]+")
+
+# Segment kinds: Chinese and alphabetic segments have IPA, the rest is kept.
+_OTHER = 0
+_CHINESE_SEGMENT = 1
+_ALPHA_SEGMENT = 2
+
+# ``(kind, start, end)`` of a token of the converted text.
+_Segment = Tuple[int, int, int]
 
 
 @dataclass(frozen=True)
@@ -36,13 +54,113 @@ class TokenizedSegment:
         return self.raw.isalpha()
 
 
-_STRESS_TRANSLATION = str.maketrans("", "", "ˈˌ")
-_TONE_TRANSLATION = str.maketrans("", "", "012345˥˦˧˨˩˩˨˧˦˥")
-_WHITESPACE_RE = re.compile(r"\s+")
+_STRESS_MARKS = "ˈˌ"
+_TONE_MARKS = "012345˥˦˧˨˩"
+_STRESS_TRANSLATION = str.maketrans("", "", _STRESS_MARKS)
+_TONE_TRANSLATION = str.maketrans("", "", _TONE_MARKS)
+
+
+def _is_punctuation(character: str) -> bool:
+    return unicodedata.category(character).startswith("P")
+
+
+class _DeletionTable(dict):
+    """``str.translate`` table deleting every character ``predicate`` accepts.
+
+    Code points are classified the first time they are seen, so the table
+    only ever holds the characters that actually occur.
+    """
+
+    def __init__(self, predicate: Callable[[str], bool]) -> None:
+        super().__init__()
+        self._predicate = predicate
+
+    def __missing__(self, codepoint: int) -> Optional[int]:
+        value = None if self._predicate(chr(codepoint)) else codepoint
+        self[codepoint] = value
+        return value
+
+
+_PUNCTUATION_TABLE = _DeletionTable(_is_punctuation)
+# ``str.isspace`` is exactly what ``\s`` matches in a str pattern.
+_WHITESPACE_TABLE = _DeletionTable(str.isspace)
+_SANITIZE_TABLE = _DeletionTable(
+    lambda character: character in _STRESS_MARKS
+    or character in _TONE_MARKS
+    or character.isspace()
+    or _is_punctuation(character)
+)
+
+_ENGLISH = "en"
+_CHINESE = "zh"
+_LETTER = "letter"
+
+# Typecode of the token offset arrays stored by :class:`GraphemePhoneme`.
+_OFFSET_TYPECODE = "I"
+
+DEFAULT_CACHE_SIZE = 16384
+
+# SQLite caps the number of bound parameters per statement (999 on older builds).
+_ENGLISH_BULK_SIZE = 500
+
+_Lookup = Callable[[str, str], str]
+
+
+# The pronunciation backends take a second or more to import, so they are
+# only loaded by the first lookup that misses every cache.
+def hanzi_to_ipa(text: str) -> str:
+    from dragonmapper.hanzi import to_ipa
+
+    return to_ipa(text)
+
+
+def eng_to_ipa_convert(text: str) -> str:
+    from eng_to_ipa import convert
+
+    return convert(text)
+
+
+def eng_to_ipa_list(words: Sequence[str]) -> List[List[str]]:
+    from eng_to_ipa.transcribe import ipa_list
+
+    return ipa_list(words)
+
+
+def _is_acronym(token: str) -> bool:
+    return token.isupper() and len(token) > 1
+
+
+def _resolved_lookup(resolved: Dict[Tuple[str, str], str]) -> _Lookup:
+    def lookup(language: str, token: str) -> str:
+        return resolved[language, token]
+
+    return lookup
+
+
+def _convert_english_words(words: Sequence[str]) -> List[str]:
+    """Return ``eng_to_ipa.convert(word)`` for each single word in ``words``.
+
+    ``eng_to_ipa.convert`` opens the dictionary and issues one query per call;
+    ``ipa_list`` resolves a whole list with a single query, and its last
+    candidate per word is exactly what ``convert`` would have returned.
+    """
+
+    results: List[str] = []
+    for offset in range(0, len(words), _ENGLISH_BULK_SIZE):
+        chunk = list(words[offset : offset + _ENGLISH_BULK_SIZE])
+        with INSTRUMENTATION.timer("converter.lookup.en"):
+            candidates = eng_to_ipa_list(chunk)
+        results.extend(pronunciations[-1] for pronunciations in candidates)
+    return results
 
 
 class IPAConverter:
-    """Convert English and Chinese text to their IPA representations."""
+    """Convert English and Chinese text to their IPA representations.
+
+    Pronunciations come from ``eng_to_ipa`` and ``dragonmapper``, or from
+    ``pronunciations``, a :class:`FrozenPronunciations` table, in which
+    case neither backend is imported.
+    """
 
     def __init__(
         self,
@@ -51,114 +169,301 @@ class IPAConverter:
         remove_stress_marks: bool = False,
         strip_whitespace: bool = False,
         remove_punctuation: bool = False,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        pronunciations: Optional[FrozenPronunciations] = None,
     ) -> None:
         self.remove_tone_marks = remove_tone_marks
         self.remove_stress_marks = remove_stress_marks
         self.strip_whitespace = strip_whitespace
         self.remove_punctuation = remove_punctuation
+        self.pronunciations = pronunciations
+        self._cache: LRUCache[str] = LRUCache(cache_size)
+
+    def cache_info(self) -> CacheInfo:
+        """Return hit/miss/eviction statistics for the token cache."""
+        return self._cache.info()
+
+    def cache_clear(self) -> None:
+        """Empty the token cache, e.g. after swapping the IPA backends."""
+        self._cache.clear()
 
     def tokenize(self, text: str) -> Iterable[TokenizedSegment]:
         """Yield the detected segments from ``text``."""
         for match in _TOKEN_RE.finditer(text):
             yield TokenizedSegment(match.group(0), match.start(), match.end())
 
+    def _segments(self, text: str, pos: int = 0) -> List[_Segment]:
+        """Return the ``(kind, start, end)`` tokens of ``text[pos:]``.
+
+        Each token is classified once, here: by the tokenizer group that
+        matched it, or for the remaining tokens by ``str.isalpha`` (which
+        also accepts non-ASCII letters).
+        """
+
+        with INSTRUMENTATION.timer("converter.tokenize"):
+            segments: List[_Segment] = []
+            for match in _SEGMENT_RE.finditer(text, pos):
+                kind = match.lastindex
+                if kind is None:
+                    kind = _ALPHA_SEGMENT if match.group().isalpha() else _OTHER
+                segments.append((kind, match.start(), match.end()))
+            return segments
+
     def convert(self, text: str) -> str:
         """Convert a text containing English and Chinese characters to IPA."""
         if not text:
             return ""
+        return self._render(text, self._segments(text), self._lookup, True, None)
 
-        converted: List[Tuple[str, bool]] = []
-        for token in self.tokenize(text):
-            value = self._convert_segment(token)
-            is_ipa_segment = token.is_alpha or token.is_chinese
-            if self.remove_punctuation and not is_ipa_segment:
-                value = self._remove_punctuation(value)
-                if not value:
-                    continue
-            converted.append((value, is_ipa_segment))
+    def convert_many(self, texts: Iterable[str]) -> List[str]:
+        """Convert every text in ``texts``, looking up each distinct token once.
 
-        processed: List[str] = []
-        for value, is_ipa_segment in converted:
-            if is_ipa_segment:
-                value = self._apply_marker_options(value)
-            processed.append(value)
+        The results are identical to calling :meth:`convert` on each text.
+        """
+
+        return [converted for converted, _ in self._convert_batch(texts, True, False)]
+
+    def convert_to_grapheme_phoneme(self, text: str) -> GraphemePhoneme:
+        """Convert *text* into a :class:`GraphemePhoneme` description."""
+
+        pieces: List[Tuple[int, int, str]] = []
+        self._render(text, self._segments(text), self._lookup, False, pieces)
+        return GraphemePhoneme._from_pieces(text, pieces)
+
+    def convert_to_grapheme_phoneme_many(
+        self, texts: Iterable[str]
+    ) -> List[GraphemePhoneme]:
+        """Batch counterpart of :meth:`convert_to_grapheme_phoneme`."""
+
+        return [
+            grapheme_phoneme
+            for _, grapheme_phoneme in self._convert_batch(texts, False, True)
+        ]
+
+    def convert_with_grapheme_phoneme(
+        self, text: str
+    ) -> Tuple[str, GraphemePhoneme]:
+        """Return :meth:`convert` and :meth:`convert_to_grapheme_phoneme` of *text*.
+
+        Both forms come out of one pass over the tokens, which shares the
+        tokenization and the English lookups.
+        """
+
+        pieces: List[Tuple[int, int, str]] = []
+        converted = self._render(text, self._segments(text), self._lookup, True, pieces)
+        return converted, GraphemePhoneme._from_pieces(text, pieces)
+
+    def convert_with_grapheme_phoneme_many(
+        self, texts: Iterable[str]
+    ) -> List[Tuple[str, GraphemePhoneme]]:
+        """Batch counterpart of :meth:`convert_with_grapheme_phoneme`."""
+
+        return self._convert_batch(texts, True, True)  # type: ignore[return-value]
+
+    def _convert_batch(
+        self, texts: Iterable[str], text_form: bool, grapheme_phoneme_form: bool
+    ) -> List[Tuple[str, Optional[GraphemePhoneme]]]:
+        texts = list(texts)
+        segmented = [self._segments(text) for text in texts]
+        keys: List[Tuple[str, str]] = []
+        for text, segments in zip(texts, segmented):
+            for kind, start, end in segments:
+                if kind == _CHINESE_SEGMENT:
+                    raw = text[start:end]
+                    if text_form:
+                        keys.append((_CHINESE, raw))
+                    if grapheme_phoneme_form:
+                        keys.extend((_CHINESE, character) for character in raw)
+                elif kind == _ALPHA_SEGMENT:
+                    keys.append((_ENGLISH, text[start:end]))
+        lookup = _resolved_lookup(self._resolve_tokens(keys))
+
+        results: List[Tuple[str, Optional[GraphemePhoneme]]] = []
+        for text, segments in zip(texts, segmented):
+            if not grapheme_phoneme_form:
+                results.append((self._render(text, segments, lookup, True, None), None))
+                continue
+            pieces: List[Tuple[int, int, str]] = []
+            converted = self._render(text, segments, lookup, text_form, pieces)
+            results.append((converted, GraphemePhoneme._from_pieces(text, pieces)))
+        return results
+
+    def _render(
+        self,
+        text: str,
+        segments: Iterable[_Segment],
+        lookup: _Lookup,
+        text_form: bool,
+        pieces: Optional[List[Tuple[int, int, str]]],
+    ) -> str:
+        """Walk ``segments`` once, rendering the requested forms of ``text``.
+
+        Returns the :meth:`convert` string if ``text_form`` is set (``""``
+        otherwise) and, if ``pieces`` is given, appends to it
+        ``(start, end, phoneme)`` for every grapheme token with IPA.
+        Chinese tokens are converted as a whole for the string but
+        character by character for the pieces, so each piece only depends
+        on its own characters.
+        """
 
+        processed: List[str] = []
+        for kind, start, end in segments:
+            if kind == _CHINESE_SEGMENT:
+                raw = text[start:end]
+                if text_form:
+                    processed.append(lookup(_CHINESE, raw))
+                if pieces is not None:
+                    for position, character in enumerate(raw, start):
+                        phoneme = self._sanitize_phoneme(lookup(_CHINESE, character))
+                        if phoneme:
+                            pieces.append((position, position + 1, phoneme))
+            elif kind == _ALPHA_SEGMENT:
+                value = lookup(_ENGLISH, text[start:end])
+                if text_form:
+                    processed.append(value)
+                if pieces is not None:
+                    phoneme = self._sanitize_phoneme(value)
+                    if phoneme:
+                        pieces.append((start, end, phoneme))
+            elif text_form:
+                value = text[start:end]
+                if self.remove_punctuation:
+                    value = value.translate(_PUNCTUATION_TABLE)
+                processed.append(value)
+
+        if not text_form:
+            return ""
         result = "".join(processed)
         if self.strip_whitespace:
-            result = _WHITESPACE_RE.sub("", result)
+            result = result.translate(_WHITESPACE_TABLE)
         return result
 
-    def convert_to_grapheme_phoneme(self, text: str) -> GraphemePhoneme:
-        """Convert *text* into a :class:`GraphemePhoneme` description."""
+    def _cache_key(self, language: str, token: str) -> Tuple[str, str, bool, bool]:
+        return (language, token, self.remove_tone_marks, self.remove_stress_marks)
 
-        grapheme_list: List[str] = []
-        phoneme_list: List[str] = []
-        grapheme_spans: List[Tuple[int, int]] = []
-        phoneme_spans: List[Tuple[int, int]] = []
-        phoneme_cursor = 0
-
-        for token in self.tokenize(text):
-            if token.is_chinese:
-                for offset, character in enumerate(token.raw):
-                    phoneme = self._convert_chinese(character)
-                    phoneme = self._apply_marker_options(phoneme)
-                    sanitized = self._sanitize_phoneme(phoneme)
-                    if not sanitized:
-                        continue
-                    grapheme_list.append(character)
-                    start = token.start + offset
-                    grapheme_spans.append((start, start + 1))
-                    phoneme_list.append(sanitized)
-                    phoneme_spans.append((phoneme_cursor, phoneme_cursor + len(sanitized)))
-                    phoneme_cursor += len(sanitized)
-            elif token.is_alpha:
-                phoneme = self._convert_english(token.raw)
-                phoneme = self._apply_marker_options(phoneme)
-                sanitized = self._sanitize_phoneme(phoneme)
-                if not sanitized:
-                    continue
-                grapheme_list.append(token.raw)
-                grapheme_spans.append((token.start, token.end))
-                phoneme_list.append(sanitized)
-                phoneme_spans.append((phoneme_cursor, phoneme_cursor + len(sanitized)))
-                phoneme_cursor += len(sanitized)
-
-        return GraphemePhoneme(
-            grapheme_str=text,
-            grapheme_list=tuple(grapheme_list),
-            phoneme_str="".join(phoneme_list),
-            phoneme_list=tuple(phoneme_list),
-            grapheme_spans=tuple(grapheme_spans),
-            phoneme_spans=tuple(phoneme_spans),
-        )
+    def _lookup(self, language: str, token: str) -> str:
+        """Return the marker-adjusted IPA for ``token``, consulting the cache."""
+        key = self._cache_key(language, token)
+        value = self._cache.get(key)
+        if value is None:
+            value = self._apply_marker_options(self._backend_ipa(language, token))
+            self._cache.put(key, value)
+        return value
 
-    @staticmethod
-    def _convert_segment(segment: TokenizedSegment) -> str:
-        if segment.is_chinese:
-            return IPAConverter._convert_chinese(segment.raw)
-        if segment.is_alpha:
-            return IPAConverter._convert_english(segment.raw)
-        return segment.raw
+    def _resolve_tokens(
+        self, keys: Iterable[Tuple[str, str]]
+    ) -> Dict[Tuple[str, str], str]:
+        """Resolve each distinct ``(language, token)`` pair in ``keys`` once.
 
-    @staticmethod
-    def _sanitize_phoneme(value: str) -> str:
-        without_markers = value.translate(_STRESS_TRANSLATION).translate(
-            _TONE_TRANSLATION
-        )
-        without_whitespace = _WHITESPACE_RE.sub("", without_markers)
-        return IPAConverter._remove_punctuation(without_whitespace)
+        Cache misses for English words and acronym letters are fetched from
+        the pronunciation dictionary in bulk rather than word by word.
+        """
+
+        resolved: Dict[Tuple[str, str], str] = {}
+        pending: List[Tuple[str, str]] = []
+        for key in dict.fromkeys(keys):
+            value = self._cache.get(self._cache_key(*key))
+            if value is None:
+                pending.append(key)
+            else:
+                resolved[key] = value
+        if not pending:
+            return resolved
+
+        words = [
+            token
+            for language, token in pending
+            if language == _ENGLISH and not _is_acronym(token)
+        ]
+        pronunciations = dict(zip(words, self._convert_english_words(words)))
+
+        letter_ipa: Dict[str, str] = {}
+        missing_letters: List[str] = []
+        for language, token in pending:
+            if language != _ENGLISH or not _is_acronym(token):
+                continue
+            for letter in token:
+                if letter in letter_ipa:
+                    continue
+                value = self._cache.get((_LETTER, letter))
+                if value is None:
+                    missing_letters.append(letter)
+                    letter_ipa[letter] = ""
+                else:
+                    letter_ipa[letter] = value
+        for letter, value in zip(
+            missing_letters, self._convert_english_words(missing_letters)
+        ):
+            value = value.strip()
+            letter_ipa[letter] = value
+            self._cache.put((_LETTER, letter), value)
+
+        for language, token in pending:
+            if language == _CHINESE:
+                value = self._convert_chinese(token)
+            elif _is_acronym(token):
+                letters = (letter_ipa[letter] for letter in token)
+                value = " ".join(letter for letter in letters if letter)
+            else:
+                value = pronunciations[token]
+            value = self._apply_marker_options(value)
+            self._cache.put(self._cache_key(language, token), value)
+            resolved[language, token] = value
+        return resolved
+
+    def _backend_ipa(self, language: str, token: str) -> str:
+        if language == _CHINESE:
+            return self._convert_chinese(token)
+        if _is_acronym(token):
+            letters = [self._letter_ipa(letter) for letter in token]
+            return " ".join(letter for letter in letters if letter)
+        return self._convert_english(token)
+
+    def _letter_ipa(self, letter: str) -> str:
+        # Acronyms are spelled out letter by letter, so the handful of letter
+        # pronunciations are cached independently of the marker options.
+        key = (_LETTER, letter)
+        value = self._cache.get(key)
+        if value is None:
+            value = self._convert_english(letter).strip()
+            self._cache.put(key, value)
+        return value
 
     @staticmethod
-    def _convert_chinese(text: str) -> str:
-        return hanzi_to_ipa(text)
+    def _sanitize_phoneme(value: str) -> str:
+        if INSTRUMENTATION.enabled:
+            with INSTRUMENTATION.timer("converter.sanitize"):
+                return IPAConverter._sanitized(value)
+        return IPAConverter._sanitized(value)
 
     @staticmethod
-    def _convert_english(token: str) -> str:
-        if token.isupper() and len(token) > 1:
-            letters = [eng_to_ipa_convert(letter).strip() for letter in token]
-            letters = [letter for letter in letters if letter]
-            return " ".join(letters)
-        return eng_to_ipa_convert(token)
+    def _sanitized(value: str) -> str:
+        return value.translate(_SANITIZE_TABLE)
+
+    def _convert_chinese(self, text: str) -> str:
+        with INSTRUMENTATION.timer("converter.lookup.zh"):
+            if self.pronunciations is not None:
+                return self.pronunciations.chinese(text)
+            return hanzi_to_ipa(text)
+
+    def _convert_english(self, token: str) -> str:
+        convert = (
+            eng_to_ipa_convert
+            if self.pronunciations is None
+            else self.pronunciations.english
+        )
+        with INSTRUMENTATION.timer("converter.lookup.en"):
+            if _is_acronym(token):
+                letters = [convert(letter).strip() for letter in token]
+                letters = [letter for letter in letters if letter]
+                return " ".join(letters)
+            return convert(token)
+
+    def _convert_english_words(self, words: Sequence[str]) -> List[str]:
+        if self.pronunciations is None:
+            return _convert_english_words(words)
+        with INSTRUMENTATION.timer("converter.lookup.en"):
+            return self.pronunciations.english_many(words)
 
     def _apply_marker_options(self, value: str) -> str:
         if self.remove_stress_marks:
@@ -167,79 +472,262 @@ class IPAConverter:
             value = value.translate(_TONE_TRANSLATION)
         return value
 
-    @staticmethod
-    def _remove_punctuation(value: str) -> str:
-        return "".join(
-            ch for ch in value if not unicodedata.category(ch).startswith("P")
-        )
-@dataclass(frozen=True)
+
 class GraphemePhoneme:
-    """Container storing aligned grapheme/phoneme data for a phrase."""
+    """Container storing aligned grapheme/phoneme data for a phrase.
+
+    Instances are immutable. Only the two strings and two integer offset
+    arrays are stored: the start and end of every grapheme token, and the
+    end of every phoneme token (phoneme tokens are contiguous). The token
+    lists and span tuples are derived from them on access.
+    """
+
+    __slots__ = (
+        "grapheme_str",
+        "phoneme_str",
+        "_grapheme_offsets",
+        "_phoneme_ends",
+        "_phoneme_codes",
+    )
 
     grapheme_str: str
-    grapheme_list: Tuple[str, ...]
     phoneme_str: str
-    phoneme_list: Tuple[str, ...]
-    grapheme_spans: Tuple[Tuple[int, int], ...]
-    phoneme_spans: Tuple[Tuple[int, int], ...]
 
-    def __post_init__(self) -> None:
-        if len(self.grapheme_list) != len(self.phoneme_list):
+    def __init__(
+        self,
+        grapheme_str: str,
+        grapheme_list: Sequence[str],
+        phoneme_str: str,
+        phoneme_list: Sequence[str],
+        grapheme_spans: Sequence[Tuple[int, int]],
+        phoneme_spans: Sequence[Tuple[int, int]],
+    ) -> None:
+        if len(grapheme_list) != len(phoneme_list):
             raise ValueError("grapheme_list and phoneme_list must be the same length")
-        if len(self.grapheme_spans) != len(self.grapheme_list):
+        if len(grapheme_spans) != len(grapheme_list):
             raise ValueError("grapheme_spans must align with grapheme_list")
-        if len(self.phoneme_spans) != len(self.phoneme_list):
+        if len(phoneme_spans) != len(phoneme_list):
             raise ValueError("phoneme_spans must align with phoneme_list")
-        joined = "".join(self.phoneme_list)
-        if joined != self.phoneme_str:
+        joined = "".join(phoneme_list)
+        if joined != phoneme_str:
             raise ValueError("phoneme_str must be the concatenation of phoneme_list")
+        for grapheme, (start, end) in zip(grapheme_list, grapheme_spans):
+            if grapheme_str[start:end] != grapheme:
+                raise ValueError("grapheme_spans must align with grapheme_list")
+        position = 0
+        for phoneme, (start, end) in zip(phoneme_list, phoneme_spans):
+            if start != position or end != start + len(phoneme):
+                raise ValueError("phoneme_spans must align with phoneme_list")
+            position = end
 
-    def subsequence_covering_span(self, start: int, end: int) -> "GraphemePhoneme" | None:
-        """Return a new object covering ``start``..``end`` in ``phoneme_str``.
+        grapheme_offsets = array(_OFFSET_TYPECODE)
+        for start, end in grapheme_spans:
+            grapheme_offsets.append(start)
+            grapheme_offsets.append(end)
+        phoneme_ends = array(_OFFSET_TYPECODE, [end for _, end in phoneme_spans])
+        self._init(grapheme_str, phoneme_str, grapheme_offsets, phoneme_ends)
 
-        The returned object expands the ``start``/``end`` span to align with the
-        full grapheme/phoneme tokens that overlap with the requested region. If
-        no tokens overlap with the span ``None`` is returned.
+    def _init(
+        self,
+        grapheme_str: str,
+        phoneme_str: str,
+        grapheme_offsets: "array[int]",
+        phoneme_ends: "array[int]",
+    ) -> None:
+        object.__setattr__(self, "grapheme_str", grapheme_str)
+        object.__setattr__(self, "phoneme_str", phoneme_str)
+        object.__setattr__(self, "_grapheme_offsets", grapheme_offsets)
+        object.__setattr__(self, "_phoneme_ends", phoneme_ends)
+        object.__setattr__(self, "_phoneme_codes", None)
+
+    @classmethod
+    def _from_offsets(
+        cls,
+        grapheme_str: str,
+        phoneme_str: str,
+        grapheme_offsets: "array[int]",
+        phoneme_ends: "array[int]",
+    ) -> "GraphemePhoneme":
+        """Build an instance from offset arrays the caller guarantees valid.
+
+        This skips every consistency check and is meant for code that derives
+        the offsets itself, such as :meth:`subsequence_covering_span`.
         """
 
-        if start >= end:
-            return None
+        instance = cls.__new__(cls)
+        instance._init(grapheme_str, phoneme_str, grapheme_offsets, phoneme_ends)
+        return instance
+
+    @classmethod
+    def _from_pieces(
+        cls, grapheme_str: str, pieces: Iterable[Tuple[int, int, str]]
+    ) -> "GraphemePhoneme":
+        """Build an instance from ``(start, end, phoneme)`` token pieces."""
+
+        grapheme_offsets = array(_OFFSET_TYPECODE)
+        phoneme_ends = array(_OFFSET_TYPECODE)
+        phonemes: List[str] = []
+        cursor = 0
+        for start, end, phoneme in pieces:
+            grapheme_offsets.append(start)
+            grapheme_offsets.append(end)
+            phonemes.append(phoneme)
+            cursor += len(phoneme)
+            phoneme_ends.append(cursor)
+        return cls._from_offsets(
+            grapheme_str, "".join(phonemes), grapheme_offsets, phoneme_ends
+        )
+
+    @property
+    def grapheme_spans(self) -> Tuple[Tuple[int, int], ...]:
+        offsets = self._grapheme_offsets
+        return tuple(zip(offsets[::2], offsets[1::2]))
+
+    @property
+    def phoneme_spans(self) -> Tuple[Tuple[int, int], ...]:
+        ends = self._phoneme_ends
+        return tuple(zip([0] + ends[:-1].tolist(), ends))
 
-        indices = [
-            idx
-            for idx, (token_start, token_end) in enumerate(self.phoneme_spans)
-            if token_end > start and token_start < end
+    @property
+    def grapheme_list(self) -> Tuple[str, ...]:
+        text = self.grapheme_str
+        offsets = self._grapheme_offsets
+        return tuple(text[start:end] for start, end in zip(offsets[::2], offsets[1::2]))
+
+    @property
+    def phoneme_list(self) -> Tuple[str, ...]:
+        text = self.phoneme_str
+        return tuple(text[start:end] for start, end in self.phoneme_spans)
+
+    @property
+    def phoneme_segments(self) -> List[str]:
+        """``phoneme_str`` split by :func:`segment_phonemes`, token by token."""
+
+        return [
+            segment
+            for phoneme in self.phoneme_list
+            for segment in segment_phonemes(phoneme)
         ]
-        if not indices:
-            return None
 
-        first_idx, last_idx = indices[0], indices[-1]
-        first_graph_start, _ = self.grapheme_spans[first_idx]
-        _, last_graph_end = self.grapheme_spans[last_idx]
+    @property
+    def phoneme_codes(self) -> "array[int]":
+        """:attr:`phoneme_segments` encoded with the process-wide :data:`SYMBOLS`.
+
+        The encoding is computed on first access and kept with the object;
+        it is not pickled, since codes are specific to one process.
+        """
 
-        sub_grapheme_str = self.grapheme_str[first_graph_start:last_graph_end]
-        sub_grapheme_list = self.grapheme_list[first_idx : last_idx + 1]
-        sub_phoneme_list = self.phoneme_list[first_idx : last_idx + 1]
+        codes = self._phoneme_codes
+        if codes is None:
+            codes = SYMBOLS.encode(self.phoneme_segments)
+            object.__setattr__(self, "_phoneme_codes", codes)
+        return codes
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise FrozenInstanceError(f"cannot assign to field {name!r}")
+
+    def __delattr__(self, name: str) -> None:
+        raise FrozenInstanceError(f"cannot delete field {name!r}")
+
+    def __reduce__(self):
+        return (
+            _trusted_grapheme_phoneme,
+            (
+                self.grapheme_str,
+                self.phoneme_str,
+                self._grapheme_offsets,
+                self._phoneme_ends,
+            ),
+        )
 
-        sub_grapheme_spans = tuple(
-            (start_ - first_graph_start, end_ - first_graph_start)
-            for (start_, end_) in self.grapheme_spans[first_idx : last_idx + 1]
+    def _key(self) -> Tuple[str, str, bytes, bytes]:
+        return (
+            self.grapheme_str,
+            self.phoneme_str,
+            self._grapheme_offsets.tobytes(),
+            self._phoneme_ends.tobytes(),
         )
 
-        phoneme_position = 0
-        sub_phoneme_spans = []
-        for value in sub_phoneme_list:
-            span_end = phoneme_position + len(value)
-            sub_phoneme_spans.append((phoneme_position, span_end))
-            phoneme_position = span_end
-
-        return GraphemePhoneme(
-            grapheme_str=sub_grapheme_str,
-            grapheme_list=sub_grapheme_list,
-            phoneme_str="".join(sub_phoneme_list),
-            phoneme_list=sub_phoneme_list,
-            grapheme_spans=sub_grapheme_spans,
-            phoneme_spans=tuple(sub_phoneme_spans),
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._key() == other._key()  # type: ignore[attr-defined]
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(grapheme_str={self.grapheme_str!r}, "
+            f"grapheme_list={self.grapheme_list!r}, "
+            f"phoneme_str={self.phoneme_str!r}, "
+            f"phoneme_list={self.phoneme_list!r}, "
+            f"grapheme_spans={self.grapheme_spans!r}, "
+            f"phoneme_spans={self.phoneme_spans!r})"
+        )
+
+    def _covering_tokens(self, start: int, end: int) -> Optional[Tuple[int, int]]:
+        """Return the first and last token overlapping ``start``..``end``."""
+
+        ends = self._phoneme_ends
+        if start >= end or end <= 0 or not ends:
+            return None
+
+        # Token ``i`` spans ``ends[i - 1]..ends[i]``; both bounds are sorted,
+        # so the overlapping tokens form one run found by binary search.
+        first_idx = bisect_right(ends, start)
+        last_idx = bisect_left(ends, end, 0, max(len(ends) - 1, 0))
+        if first_idx > last_idx:
+            return None
+        return first_idx, last_idx
+
+    def grapheme_span_covering(self, start: int, end: int) -> Optional[Tuple[int, int]]:
+        """Return the ``grapheme_str`` span of :meth:`subsequence_covering_span`.
+
+        ``None`` if no token overlaps ``start``..``end`` of ``phoneme_str``.
+        """
+
+        tokens = self._covering_tokens(start, end)
+        if tokens is None:
+            return None
+        first_idx, last_idx = tokens
+        offsets = self._grapheme_offsets
+        return offsets[2 * first_idx], offsets[2 * last_idx + 1]
+
+    def subsequence_covering_span(self, start: int, end: int) -> "GraphemePhoneme" | None:
+        """Return a new object covering ``start``..``end`` in ``phoneme_str``.
+
+        The returned object expands the ``start``/``end`` span to align with the
+        full grapheme/phoneme tokens that overlap with the requested region. If
+        no tokens overlap with the span ``None`` is returned.
+        """
+
+        tokens = self._covering_tokens(start, end)
+        if tokens is None:
+            return None
+        first_idx, last_idx = tokens
+
+        ends = self._phoneme_ends
+        offsets = self._grapheme_offsets
+        first_graph_start = offsets[2 * first_idx]
+        last_graph_end = offsets[2 * last_idx + 1]
+        phoneme_start = ends[first_idx - 1] if first_idx else 0
+        phoneme_end = ends[last_idx]
+
+        return GraphemePhoneme._from_offsets(
+            self.grapheme_str[first_graph_start:last_graph_end],
+            self.phoneme_str[phoneme_start:phoneme_end],
+            array(
+                _OFFSET_TYPECODE,
+                [
+                    value - first_graph_start
+                    for value in offsets[2 * first_idx : 2 * last_idx + 2]
+                ],
+            ),
+            array(
+                _OFFSET_TYPECODE,
+                [value - phoneme_start for value in ends[first_idx : last_idx + 1]],
+            ),
         )
 
     def to_dict(self) -> dict:
@@ -262,32 +750,28 @@ class GraphemePhoneme:
     ) -> "GraphemePhoneme":
         """Build an instance from stored components."""
 
-        grapheme_spans: List[Tuple[int, int]] = []
+        if len(grapheme_list) != len(phoneme_list):
+            raise ValueError("grapheme_list and phoneme_list must be the same length")
+        if "".join(phoneme_list) != phoneme_str:
+            raise ValueError("phoneme_str must be the concatenation of phoneme_list")
+
+        grapheme_offsets = array(_OFFSET_TYPECODE)
         cursor = 0
         for grapheme in grapheme_list:
             index = grapheme_str.find(grapheme, cursor)
             if index == -1:
                 raise ValueError("Unable to locate grapheme segment in grapheme_str")
-            start = index
-            end = index + len(grapheme)
-            grapheme_spans.append((start, end))
-            cursor = end
+            cursor = index + len(grapheme)
+            grapheme_offsets.append(index)
+            grapheme_offsets.append(cursor)
 
-        phoneme_spans: List[Tuple[int, int]] = []
+        phoneme_ends = array(_OFFSET_TYPECODE)
         position = 0
         for phoneme in phoneme_list:
-            end = position + len(phoneme)
-            phoneme_spans.append((position, end))
-            position = end
+            position += len(phoneme)
+            phoneme_ends.append(position)
 
-        return cls(
-            grapheme_str=grapheme_str,
-            grapheme_list=tuple(grapheme_list),
-            phoneme_str=phoneme_str,
-            phoneme_list=tuple(phoneme_list),
-            grapheme_spans=tuple(grapheme_spans),
-            phoneme_spans=tuple(phoneme_spans),
-        )
+        return cls._from_offsets(grapheme_str, phoneme_str, grapheme_offsets, phoneme_ends)
 
     @classmethod
     def from_dict(cls, payload: dict) -> "GraphemePhoneme":
@@ -299,3 +783,14 @@ class GraphemePhoneme:
             payload["phoneme_str"],
             payload["phoneme_list"],
         )
+
+
+def _trusted_grapheme_phoneme(
+    grapheme_str: str,
+    phoneme_str: str,
+    grapheme_offsets: "array[int]",
+    phoneme_ends: "array[int]",
+) -> GraphemePhoneme:
+    return GraphemePhoneme._from_offsets(
+        grapheme_str, phoneme_str, grapheme_offsets, phoneme_ends
+    )
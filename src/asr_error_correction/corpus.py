@@ -0,0 +1,135 @@
+"""Multi-process alignment of whole transcript corpora."""
+from __future__ import annotations
+
+import multiprocessing
+import tempfile
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import ExitStack
+from multiprocessing.context import BaseContext
+from pathlib import Path
+from typing import Deque, Iterable, Iterator, List, Mapping, Optional, Union
+
+from .aio import SentenceResult
+from .alignment import LocalAlignment, local_align_sentence
+from .binary import MappedEntries, write_binary_lexicon
+from .conversion import GraphemePhoneme, IPAConverter
+from .iteration import chunked
+from .lexicon import IPALexicon
+
+__all__ = ["align_corpus"]
+
+
+DEFAULT_CORPUS_CHUNK_SIZE = 64
+
+Sentence = Union[str, GraphemePhoneme]
+
+
+class _CorpusJob:
+    """Aligns chunks of sentences against every entry of a lexicon."""
+
+    def __init__(
+        self,
+        converter: IPAConverter,
+        entries: Mapping[str, GraphemePhoneme],
+        aligner: Optional[LocalAlignment],
+    ) -> None:
+        self.converter = converter
+        self.entries = entries
+        self.aligner = aligner
+        self._queries: Optional[List[GraphemePhoneme]] = None
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_queries"] = None
+        return state
+
+    def __call__(self, chunk: List[Sentence]) -> List[SentenceResult]:
+        if self._queries is None:
+            self._queries = list(self.entries.values())
+        results = []
+        for sentence in chunk:
+            if isinstance(sentence, str):
+                sentence = self.converter.convert_to_grapheme_phoneme(sentence)
+            results.append(
+                (sentence, local_align_sentence(sentence, self._queries, self.aligner))
+            )
+        return results
+
+
+_worker_job: Optional[_CorpusJob] = None
+
+
+def _init_worker(job: _CorpusJob) -> None:
+    global _worker_job
+    _worker_job = job
+
+
+def _run_worker_chunk(chunk: List[Sentence]) -> List[SentenceResult]:
+    assert _worker_job is not None
+    return _worker_job(chunk)
+
+
+def align_corpus(
+    sentences: Iterable[Sentence],
+    lexicon: IPALexicon,
+    aligner: Optional[LocalAlignment] = None,
+    *,
+    workers: int = 1,
+    chunk_size: int = DEFAULT_CORPUS_CHUNK_SIZE,
+    mp_context: Optional[BaseContext] = None,
+) -> Iterator[SentenceResult]:
+    """Yield ``(sentence, alignments)`` for every sentence, in input order.
+
+    Each sentence is a transcript, converted with the lexicon's converter,
+    or an already converted :class:`GraphemePhoneme`, and is aligned
+    against every lexicon entry exactly as :func:`local_align_sentence`
+    would.
+
+    With ``workers`` greater than one, sentences are sent to a process pool
+    in chunks of ``chunk_size`` with a bounded number of chunks in flight,
+    so the input is consumed lazily. The lexicon is handed to every worker
+    once, when it starts, and never per task: forked workers inherit it,
+    and other start methods open a memory-mapped binary copy (see
+    :mod:`asr_error_correction.binary`) whose pages all workers share. A
+    lexicon loaded from a binary file is shared as is.
+    """
+
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+    chunks = chunked(sentences, chunk_size)
+    if workers <= 1:
+        job = _CorpusJob(lexicon.converter, lexicon.entries, aligner)
+        for chunk in chunks:
+            yield from job(chunk)
+        return
+
+    context = mp_context or multiprocessing.get_context()
+    with ExitStack() as stack:
+        entries = lexicon.entries
+        if context.get_start_method() != "fork" and not isinstance(
+            entries, MappedEntries
+        ):
+            directory = stack.enter_context(tempfile.TemporaryDirectory())
+            path = Path(directory) / "lexicon.bin"
+            write_binary_lexicon(path, entries.items())
+            entries = stack.enter_context(MappedEntries(path))
+        executor = stack.enter_context(
+            ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(_CorpusJob(lexicon.converter, entries, aligner),),
+            )
+        )
+        pending: Deque[Future] = deque()
+        try:
+            for chunk in chunks:
+                pending.append(executor.submit(_run_worker_chunk, chunk))
+                if len(pending) >= 2 * workers:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,163 @@
+"""End-to-end correction of transcripts against a lexicon."""
+from __future__ import annotations
+
+from bisect import bisect_right
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Union
+
+from .alignment import LocalAlignment
+from .iteration import chunked
+from .lexicon import IPALexicon
+from .memo import CachedAlignment
+
+__all__ = ["Correction", "Edit", "correct"]
+
+
+DEFAULT_MIN_RATIO = 0.8
+DEFAULT_BATCH_SIZE = 256
+
+
+class Edit(NamedTuple):
+    """``original`` at ``start``..``end`` of the transcript became ``replacement``.
+
+    ``key`` is the lexicon entry the replacement comes from and ``score``
+    its alignment score.
+    """
+
+    start: int
+    end: int
+    original: str
+    replacement: str
+    score: float
+    key: str
+
+
+class Correction(NamedTuple):
+    """A transcript, its corrected form and the edits between them."""
+
+    text: str
+    corrected: str
+    edits: List[Edit]
+
+
+class _Candidate(NamedTuple):
+    score: float
+    start: int
+    end: int
+    # Index of the entry in lexicon order.
+    entry: int
+
+
+def _select(candidates: Iterable[_Candidate]) -> List[_Candidate]:
+    """Keep the best candidates whose grapheme spans do not overlap.
+
+    Candidates are taken by decreasing score, then longest span, then
+    position and lexicon order; the result is sorted by ``start``.
+    """
+
+    chosen: List[_Candidate] = []
+    starts: List[int] = []
+    for candidate in sorted(
+        candidates,
+        key=lambda c: (-c.score, c.start - c.end, c.start, c.entry),
+    ):
+        index = bisect_right(starts, candidate.start)
+        if index and chosen[index - 1].end > candidate.start:
+            continue
+        if index < len(chosen) and chosen[index].start < candidate.end:
+            continue
+        starts.insert(index, candidate.start)
+        chosen.insert(index, candidate)
+    return chosen
+
+
+def _rewrite(
+    text: str,
+    chosen: Sequence[_Candidate],
+    keys: Sequence[str],
+    replacements: Sequence[str],
+) -> Correction:
+    """Splice the replacements of ``chosen`` into ``text`` in one pass."""
+
+    pieces: List[str] = []
+    edits: List[Edit] = []
+    cursor = 0
+    for candidate in chosen:
+        original = text[candidate.start : candidate.end]
+        replacement = replacements[candidate.entry]
+        if replacement == original:
+            continue
+        pieces.append(text[cursor : candidate.start])
+        pieces.append(replacement)
+        cursor = candidate.end
+        edits.append(
+            Edit(
+                candidate.start,
+                candidate.end,
+                original,
+                replacement,
+                candidate.score,
+                keys[candidate.entry],
+            )
+        )
+    pieces.append(text[cursor:])
+    return Correction(text, "".join(pieces), edits)
+
+
+def correct(
+    texts: Iterable[str],
+    lexicon: IPALexicon,
+    aligner: Optional[Union[LocalAlignment, CachedAlignment]] = None,
+    *,
+    min_ratio: float = DEFAULT_MIN_RATIO,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> List[Correction]:
+    """Rewrite every transcript with the lexicon entries it most likely means.
+
+    Transcripts are converted with the lexicon's converter, in batches of
+    ``batch_size``, and aligned against every entry with the ``hits_many``
+    of ``aligner`` (a ``"numpy"`` :class:`LocalAlignment` by default, or a
+    :class:`~asr_error_correction.memo.CachedAlignment`). A hit is a
+    candidate if it scores at least ``min_ratio`` times the length of the
+    entry's phoneme sequence, i.e. of a perfect match, and at least the
+    aligner's ``min_score``; it covers the transcript tokens its phonemes
+    overlap.
+
+    Where candidates overlap, the best scoring one wins, then the longest.
+    Winning candidates replace their span with the entry's ``grapheme_str``;
+    spans that already read like the entry are left alone but still keep
+    weaker candidates out.
+    """
+
+    if not 0 < min_ratio:
+        raise ValueError("min_ratio must be positive")
+    if batch_size < 1:
+        raise ValueError("batch_size must be positive")
+    local_aligner = aligner or LocalAlignment(engine="numpy")
+    keys = list(lexicon.entries)
+    queries = [lexicon.entries[key] for key in keys]
+    replacements = [query.grapheme_str for query in queries]
+    thresholds: List[Optional[float]] = []
+    for query in queries:
+        units = len(query.phoneme_segments if local_aligner.segmented else query.phoneme_str)
+        threshold = min_ratio * units if units else None
+        if threshold is not None and local_aligner.min_score is not None:
+            threshold = max(threshold, local_aligner.min_score)
+        thresholds.append(threshold)
+
+    corrections: List[Correction] = []
+    for chunk in chunked(texts, batch_size):
+        sentences = lexicon.converter.convert_to_grapheme_phoneme_many(chunk)
+        for text, sentence in zip(chunk, sentences):
+            candidates: List[_Candidate] = []
+            if queries and sentence.phoneme_str:
+                all_hits = local_aligner.hits_many(sentence, queries)
+                for entry, hits in enumerate(all_hits):
+                    threshold = thresholds[entry]
+                    for hit in hits:
+                        if threshold is None or hit.score < threshold:
+                            continue
+                        span = sentence.grapheme_span_covering(hit.start, hit.end)
+                        if span is not None:
+                            candidates.append(_Candidate(float(hit.score), *span, entry))
+            corrections.append(_rewrite(text, _select(candidates), keys, replacements))
+    return corrections
@@ -0,0 +1,231 @@
+"""Aho-Corasick search for exact phoneme matches of lexicon entries."""
+from __future__ import annotations
+
+from collections import deque
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from .alignment import LocalAlignment, local_align_sentence
+from .conversion import GraphemePhoneme
+
+__all__ = ["ExactMatch", "ExactMatches", "PhonemeAutomaton"]
+
+
+_Results = List[Tuple[GraphemePhoneme, List[Tuple[float, GraphemePhoneme]]]]
+
+
+class ExactMatch(NamedTuple):
+    """An occurrence of entry ``key`` at ``start``..``end`` of ``phoneme_str``.
+
+    ``matched`` is the part of the sentence covering the occurrence, as
+    returned by :meth:`GraphemePhoneme.subsequence_covering_span`.
+    """
+
+    key: str
+    start: int
+    end: int
+    matched: GraphemePhoneme
+
+
+class ExactMatches(NamedTuple):
+    """Exact matches in a sentence and the ``phoneme_str`` spans they leave."""
+
+    matches: List[ExactMatch]
+    uncovered: List[Tuple[int, int]]
+
+
+def _uncovered(length: int, spans: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    gaps: List[Tuple[int, int]] = []
+    cursor = 0
+    for start, end in sorted(spans):
+        if start > cursor:
+            gaps.append((cursor, start))
+        cursor = max(cursor, end)
+    if cursor < length:
+        gaps.append((cursor, length))
+    return gaps
+
+
+def _collect_matches(
+    sentence: GraphemePhoneme,
+    occurrences: Iterable[Tuple[int, int, List[str]]],
+    whole_tokens: bool,
+) -> ExactMatches:
+    """Turn ``(start, end, keys)`` occurrences into :class:`ExactMatches`."""
+
+    boundaries = None
+    if whole_tokens:
+        boundaries = {0, *(end for _, end in sentence.phoneme_spans)}
+    matches: List[ExactMatch] = []
+    spans: List[Tuple[int, int]] = []
+    for start, end, keys in occurrences:
+        if boundaries is not None and (
+            start not in boundaries or end not in boundaries
+        ):
+            continue
+        matched = sentence.subsequence_covering_span(start, end)
+        if matched is None:
+            continue
+        spans.append((start, end))
+        matches.extend(ExactMatch(key, start, end, matched) for key in keys)
+    return ExactMatches(matches, _uncovered(len(sentence.phoneme_str), spans))
+
+
+class PhonemeAutomaton:
+    """Lexicon entries compiled into an Aho-Corasick automaton.
+
+    States form a trie over the entries' ``phoneme_str``; every state also
+    has a failure link to the longest proper suffix that is a trie state,
+    and an output link to the longest such suffix ending an entry. A
+    sentence is scanned once, so finding every occurrence of every entry
+    takes time linear in the sentence length plus the number of
+    occurrences, however large the lexicon.
+    """
+
+    def __init__(self, entries: Mapping[str, GraphemePhoneme]) -> None:
+        self.entries = entries
+        self._keys: List[str] = list(entries)
+        goto: List[Dict[str, int]] = [{}]
+        depths: List[int] = [0]
+        terminals: List[List[int]] = [[]]
+        for position, key in enumerate(self._keys):
+            phonemes = entries[key].phoneme_str
+            if not phonemes:
+                continue
+            state = 0
+            for phoneme in phonemes:
+                following = goto[state].get(phoneme)
+                if following is None:
+                    following = len(goto)
+                    goto[state][phoneme] = following
+                    goto.append({})
+                    depths.append(depths[state] + 1)
+                    terminals.append([])
+                state = following
+            terminals[state].append(position)
+
+        # Breadth first, so that the links of shallower states are known.
+        fail = [0] * len(goto)
+        output = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for phoneme, child in goto[state].items():
+                link = fail[state]
+                while link and phoneme not in goto[link]:
+                    link = fail[link]
+                link = goto[link].get(phoneme, 0)
+                fail[child] = link
+                output[child] = link if terminals[link] else output[link]
+                queue.append(child)
+
+        self._goto = goto
+        self._depths = depths
+        self._terminals = terminals
+        self._fail = fail
+        self._output = output
+
+    def __len__(self) -> int:
+        return len(self._goto) - 1
+
+    def find(self, phonemes: str) -> Iterator[Tuple[int, int, List[str]]]:
+        """Yield ``(start, end, keys)`` for every entry occurring in ``phonemes``.
+
+        Occurrences are produced by increasing ``end`` and, for one ``end``,
+        longest first; ``keys`` lists the entries with that phoneme string.
+        """
+
+        goto, fail, output = self._goto, self._fail, self._output
+        terminals, depths = self._terminals, self._depths
+        state = 0
+        for end, phoneme in enumerate(phonemes, 1):
+            while state and phoneme not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(phoneme, 0)
+            found = state if terminals[state] else output[state]
+            while found:
+                keys = [self._keys[position] for position in terminals[found]]
+                yield end - depths[found], end, keys
+                found = output[found]
+
+    def match(
+        self, sentence: GraphemePhoneme, *, whole_tokens: bool = False
+    ) -> ExactMatches:
+        """Return every exact occurrence in ``sentence`` and the spans left over.
+
+        With ``whole_tokens`` only occurrences starting and ending on token
+        boundaries of ``sentence`` count, so e.g. an entry cannot match the
+        middle of an English word. ``uncovered`` lists, in order, the maximal
+        ``phoneme_str`` spans that no reported occurrence covers.
+        """
+
+        return _collect_matches(sentence, self.find(sentence.phoneme_str), whole_tokens)
+
+    def align_sentence(
+        self,
+        sentence: GraphemePhoneme,
+        aligner: Optional[LocalAlignment] = None,
+        *,
+        whole_tokens: bool = False,
+    ) -> _Results:
+        """Align ``sentence`` against every entry, exact matches first.
+
+        Entries occurring exactly are scored like a perfect match on the
+        scale of ``aligner`` (one point per phoneme, or per segment for a
+        segmented aligner) and are not aligned any further. The other
+        entries go through :func:`local_align_sentence` with ``aligner``,
+        but only against the uncovered parts of the sentence, each expanded
+        to whole tokens. As with ``local_align_sentence`` every entry gets
+        at most one hit, its best (the first exact occurrence, or the best
+        scoring region), and hits below the aligner's ``min_score`` are
+        dropped. Results are in lexicon order.
+        """
+
+        local_aligner = aligner or LocalAlignment()
+        min_score = local_aligner.min_score
+        found = self.match(sentence, whole_tokens=whole_tokens)
+        exact: Dict[str, List[Tuple[float, GraphemePhoneme]]] = {}
+        for match in found.matches:
+            if match.key in exact:
+                continue
+            entry = self.entries[match.key]
+            if local_aligner.segmented:
+                score = float(len(entry.phoneme_segments))
+            else:
+                score = float(len(entry.phoneme_str))
+            # A perfect match is the best any alignment can score, so an
+            # entry whose match falls below ``min_score`` gets no hit at all.
+            if min_score is not None and score < min_score:
+                exact[match.key] = []
+            else:
+                exact[match.key] = [(score, match.matched)]
+
+        remaining = [key for key in self._keys if key not in exact]
+        queries = [self.entries[key] for key in remaining]
+        fuzzy: Dict[str, List[Tuple[float, GraphemePhoneme]]] = {
+            key: [] for key in remaining
+        }
+        for start, end in found.uncovered:
+            region = sentence.subsequence_covering_span(start, end)
+            if region is None or not queries:
+                continue
+            for key, (_, hits) in zip(
+                remaining, local_align_sentence(region, queries, local_aligner)
+            ):
+                best = fuzzy[key]
+                for hit in hits:
+                    if not best or hit[0] > best[0][0]:
+                        best[:] = [hit]
+
+        return [
+            (self.entries[key], exact[key] if key in exact else fuzzy[key])
+            for key in self._keys
+        ]
@@ -0,0 +1,311 @@
+"""Phoneme n-gram inverted index used to pre-filter lexicon entries."""
+from __future__ import annotations
+
+import json
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import (
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from .conversion import GraphemePhoneme
+
+__all__ = ["IndexReport", "PhonemeNGramIndex"]
+
+
+DEFAULT_NGRAM_SIZE = 2
+
+# Removed ids kept around before :meth:`PhonemeNGramIndex.compact` may run.
+_MIN_DEAD_TO_COMPACT = 256
+_ALIVE = sys.maxsize
+
+
+class IndexReport(NamedTuple):
+    """Recall and pruning measured on a held-out set of sentences.
+
+    ``speedup`` is the number of indexed entries divided by the mean number
+    of candidates, i.e. how many fewer alignments have to be run.
+    """
+
+    recall: float
+    mean_candidates: float
+    speedup: float
+
+
+def _ngrams(phonemes: str, n: int) -> Set[str]:
+    if len(phonemes) <= n:
+        return {phonemes} if phonemes else set()
+    return {phonemes[i : i + n] for i in range(len(phonemes) - n + 1)}
+
+
+class PhonemeNGramIndex:
+    """Map phoneme n-grams of ``phoneme_str`` to the entries containing them.
+
+    Entries whose phoneme string is shorter than ``n`` are indexed under the
+    whole string, so they can still be retrieved.
+    """
+
+    def __init__(self, n: int = DEFAULT_NGRAM_SIZE) -> None:
+        if n < 1:
+            raise ValueError("n must be positive")
+        self.n = n
+        self._keys: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._sizes: List[int] = []
+        self._postings: Dict[str, List[int]] = {}
+        self._short_lengths: FrozenSet[int] = frozenset()
+        # Every add or remove ticks the clock; an entry id is live from the
+        # tick that added it until the tick that removed it.
+        self._clock = 0
+        self._born: List[int] = []
+        self._died: List[int] = []
+
+    @classmethod
+    def build(
+        cls, entries: Mapping[str, GraphemePhoneme], n: int = DEFAULT_NGRAM_SIZE
+    ) -> "PhonemeNGramIndex":
+        """Index every entry of ``entries``."""
+
+        index = cls(n)
+        for key, value in entries.items():
+            index.add(key, value)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, key: str, value: GraphemePhoneme) -> None:
+        """Index ``value`` under ``key``, replacing any previous entry."""
+
+        if key in self._ids:
+            self.remove(key)
+        grams = _ngrams(value.phoneme_str, self.n)
+        self._clock += 1
+        entry_id = len(self._keys)
+        self._keys.append(key)
+        self._sizes.append(len(grams))
+        self._born.append(self._clock)
+        self._died.append(_ALIVE)
+        self._ids[key] = entry_id
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(entry_id)
+        length = len(value.phoneme_str)
+        if 0 < length < self.n and length not in self._short_lengths:
+            self._short_lengths = self._short_lengths | {length}
+
+    def remove(self, key: str) -> None:
+        """Stop returning ``key`` as a candidate.
+
+        Posting lists are left untouched and the retired id is only marked
+        dead; once dead ids outnumber live ones the index is compacted.
+        """
+
+        entry_id = self._ids.pop(key, None)
+        if entry_id is None:
+            return
+        self._clock += 1
+        self._died[entry_id] = self._clock
+        dead = len(self._keys) - len(self._ids)
+        if dead > max(len(self._ids), _MIN_DEAD_TO_COMPACT):
+            self.compact()
+
+    def compact(self) -> None:
+        """Drop the ids of removed entries from every table and posting list.
+
+        The tables are rebuilt rather than modified, so views taken with
+        :meth:`_view` keep working on the old ones.
+        """
+
+        remap: Dict[int, int] = {}
+        keys: List[str] = []
+        sizes: List[int] = []
+        for entry_id, key in enumerate(self._keys):
+            if self._died[entry_id] == _ALIVE:
+                remap[entry_id] = len(keys)
+                keys.append(key)
+                sizes.append(self._sizes[entry_id])
+        postings: Dict[str, List[int]] = {}
+        for gram, entry_ids in self._postings.items():
+            live = [remap[entry_id] for entry_id in entry_ids if entry_id in remap]
+            if live:
+                postings[gram] = live
+        self._keys = keys
+        self._sizes = sizes
+        self._postings = postings
+        self._ids = {key: entry_id for entry_id, key in enumerate(keys)}
+        self._born = [0] * len(keys)
+        self._died = [_ALIVE] * len(keys)
+        self._short_lengths = frozenset(
+            len(gram) for gram in postings if len(gram) < self.n
+        )
+
+    def _live(self, entry_id: int) -> bool:
+        return self._born[entry_id] <= self._clock < self._died[entry_id]
+
+    def _view(self) -> "PhonemeNGramIndex":
+        """Return a copy unaffected by later :meth:`add` and :meth:`remove` calls.
+
+        Tables and posting lists are shared: they only ever grow, ids are
+        never reused and :meth:`compact` replaces them instead of editing
+        them, so the view only has to fix the clock. Taking a view costs
+        the same however large the index is. The view must not be modified.
+        """
+
+        return _IndexView(self)
+
+    def query(
+        self,
+        phonemes: str,
+        top_k: Optional[int] = None,
+        min_shared: int = 1,
+    ) -> List[str]:
+        """Return keys sharing at least ``min_shared`` n-grams with ``phonemes``.
+
+        Keys are ranked by the fraction of their own n-grams found in
+        ``phonemes``, then by the number of shared n-grams. An entry with
+        fewer than ``min_shared`` n-grams qualifies when all of them match.
+        """
+
+        grams = _ngrams(phonemes, self.n)
+        for length in self._short_lengths:
+            grams.update(_ngrams(phonemes, length))
+
+        counts: Counter = Counter()
+        for gram in grams:
+            postings = self._postings.get(gram)
+            if postings:
+                counts.update(postings)
+
+        ranked: List[Tuple[float, int, int]] = []
+        for entry_id, shared in counts.items():
+            size = self._sizes[entry_id]
+            if shared < min(min_shared, size):
+                continue
+            if not self._live(entry_id):
+                continue
+            ranked.append((-shared / size, -shared, entry_id))
+        ranked.sort()
+        if top_k is not None:
+            ranked = ranked[:top_k]
+        return [self._keys[entry_id] for _, _, entry_id in ranked]
+
+    def evaluate(
+        self,
+        held_out: Iterable[Tuple[GraphemePhoneme, str]],
+        top_k: Optional[int] = None,
+        min_shared: int = 1,
+    ) -> IndexReport:
+        """Measure how often the expected key survives pre-filtering.
+
+        ``held_out`` yields ``(sentence, expected_key)`` pairs, e.g. ASR
+        transcripts labelled with the lexicon entry they should match.
+        """
+
+        total = found = candidates = 0
+        for sentence, expected in held_out:
+            keys = self.query(sentence.phoneme_str, top_k, min_shared)
+            total += 1
+            candidates += len(keys)
+            found += expected in keys
+        if not total:
+            return IndexReport(0.0, 0.0, 0.0)
+        mean_candidates = candidates / total
+        speedup = len(self) / mean_candidates if mean_candidates else float("inf")
+        return IndexReport(found / total, mean_candidates, speedup)
+
+    def save_to(self, path: Path | str, keys: Sequence[str]) -> None:
+        """Persist the postings, numbering entries by their position in ``keys``."""
+
+        positions = {key: position for position, key in enumerate(keys)}
+        postings: Dict[str, List[int]] = {}
+        for gram, entry_ids in self._postings.items():
+            live = [
+                positions[self._keys[entry_id]]
+                for entry_id in entry_ids
+                if self._live(entry_id) and self._keys[entry_id] in positions
+            ]
+            if live:
+                postings[gram] = live
+        output_path = Path(path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with output_path.open("w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "n": self.n,
+                    "entries": len(keys),
+                    "short_lengths": sorted(self._short_lengths),
+                    "postings": postings,
+                },
+                file,
+                ensure_ascii=False,
+            )
+
+    @classmethod
+    def load_from(
+        cls, path: Path | str, entries: Mapping[str, GraphemePhoneme]
+    ) -> "PhonemeNGramIndex":
+        """Load postings written by :meth:`save_to` for ``entries``.
+
+        Only the keys of ``entries`` are read, so lazily loaded entries are
+        not materialised. A :class:`ValueError` is raised when the postings
+        were saved for a different number of entries.
+        """
+
+        with Path(path).open("r", encoding="utf-8") as file:
+            data = json.load(file)
+        if data.get("entries") != len(entries):
+            raise ValueError(
+                f"n-gram index {path} was saved for {data.get('entries')} entries, "
+                f"not {len(entries)}"
+            )
+        index = cls(int(data["n"]))
+        index._keys = list(entries)
+        index._ids = {key: entry_id for entry_id, key in enumerate(index._keys)}
+        index._sizes = [0] * len(index._keys)
+        index._born = [0] * len(index._keys)
+        index._died = [_ALIVE] * len(index._keys)
+        index._postings = {
+            gram: list(entry_ids) for gram, entry_ids in data["postings"].items()
+        }
+        for entry_ids in index._postings.values():
+            for entry_id in entry_ids:
+                index._sizes[entry_id] += 1
+        index._short_lengths = frozenset(data["short_lengths"])
+        return index
+
+
+class _IndexView(PhonemeNGramIndex):
+    """Read-only state of a :class:`PhonemeNGramIndex` at one clock tick."""
+
+    def __init__(self, index: PhonemeNGramIndex) -> None:
+        super().__init__(index.n)
+        self._keys = index._keys
+        self._sizes = index._sizes
+        self._postings = index._postings
+        self._short_lengths = index._short_lengths
+        self._born = index._born
+        self._died = index._died
+        self._clock = index._clock
+        self._length = len(index)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def add(self, key: str, value: GraphemePhoneme) -> None:
+        raise TypeError("index views are read-only")
+
+    def remove(self, key: str) -> None:
+        raise TypeError("index views are read-only")
+
+    def compact(self) -> None:
+        raise TypeError("index views are read-only")
@@ -0,0 +1,215 @@
+"""Opt-in stage timers and counters for the conversion and alignment paths."""
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, TypeVar
+
+__all__ = ["INSTRUMENTATION", "Instrumentation", "Snapshot", "StageStats"]
+
+
+# Upper bounds of the latency histogram buckets: 1µs doubling up to ~67s.
+# A last, unbounded bucket catches anything slower.
+LATENCY_BUCKETS: Tuple[float, ...] = tuple(1e-6 * 2**k for k in range(27))
+
+Callback = Callable[[str, float], None]
+
+_F = TypeVar("_F", bound=Callable[..., object])
+
+
+class StageStats(NamedTuple):
+    """Aggregated latencies of one instrumented stage, in seconds."""
+
+    count: int
+    total: float
+    min: float
+    max: float
+    # Observations per :data:`LATENCY_BUCKETS` bucket, plus the overflow.
+    buckets: Tuple[int, ...]
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Return an upper bound of the ``q`` quantile (``0 <= q <= 1``)."""
+
+        if not self.count:
+            return 0.0
+        rank = max(1, round(q * self.count))
+        seen = 0
+        for bound, observed in zip(LATENCY_BUCKETS, self.buckets):
+            seen += observed
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class Snapshot(NamedTuple):
+    """Point-in-time copy of every stage and counter."""
+
+    stages: Dict[str, StageStats]
+    counters: Dict[str, int]
+
+
+class _Stage:
+    __slots__ = ("count", "total", "min", "max", "buckets")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        self.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def stats(self) -> StageStats:
+        return StageStats(
+            self.count, self.total, self.min, self.max, tuple(self.buckets)
+        )
+
+
+class _Timer:
+    __slots__ = ("_owner", "_stage", "_started")
+
+    def __init__(self, owner: "Instrumentation", stage: str) -> None:
+        self._owner = owner
+        self._stage = stage
+
+    def __enter__(self) -> None:
+        self._started = time.perf_counter()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._owner.record(self._stage, time.perf_counter() - self._started)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info: object) -> None:
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Instrumentation:
+    """Collect per-stage latency histograms and event counters.
+
+    Nothing is recorded until :meth:`enable` is called; while disabled,
+    every instrumented call site only tests :attr:`enabled`. Statistics
+    are per process, so process-pool workers keep their own.
+
+    Stages recorded by this package:
+
+    * ``converter.tokenize``, ``converter.sanitize`` and
+      ``converter.lookup.en`` / ``converter.lookup.zh``, one observation per
+      call into ``eng_to_ipa`` or ``dragonmapper`` (cache hits never reach
+      them; bulk English lookups resolve many words per call);
+    * ``lexicon.build`` (:meth:`IPALexicon.add_phrases`) and
+      ``lexicon.load``;
+    * ``alignment.dp``, ``alignment.extract_span`` and
+      ``alignment.subsequence`` (the counter ``alignment.pairs`` holds the
+      number of sentence/query pairs aligned).
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._stages: Dict[str, _Stage] = {}
+        self._counters: Dict[str, int] = {}
+        self._callbacks: List[Callback] = []
+
+    def enable(self, callback: Optional[Callback] = None) -> None:
+        """Start recording; ``callback`` is added with :meth:`add_callback`."""
+
+        if callback is not None:
+            self.add_callback(callback)
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Stop recording. Collected statistics are kept."""
+
+        self.enabled = False
+
+    def add_callback(self, callback: Callback) -> None:
+        """Call ``callback(stage, seconds)`` for every timed observation."""
+
+        with self._lock:
+            self._callbacks = self._callbacks + [callback]
+
+    def remove_callback(self, callback: Callback) -> None:
+        with self._lock:
+            self._callbacks = [c for c in self._callbacks if c is not callback]
+
+    def record(self, stage: str, seconds: float) -> None:
+        """Add one observation of ``stage``."""
+
+        with self._lock:
+            entry = self._stages.get(stage)
+            if entry is None:
+                entry = self._stages[stage] = _Stage()
+            entry.add(seconds)
+            callbacks = self._callbacks
+        for callback in callbacks:
+            callback(stage, seconds)
+
+    def increment(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + amount
+
+    def timer(self, stage: str) -> "_Timer | _NullTimer":
+        """Context manager recording the duration of its block as ``stage``."""
+
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, stage)
+
+    def timed(self, stage: str) -> Callable[[_F], _F]:
+        """Decorator recording every call of the function as ``stage``."""
+
+        def decorate(function: _F) -> _F:
+            @wraps(function)
+            def wrapper(*args: object, **kwargs: object) -> object:
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.record(stage, time.perf_counter() - started)
+
+            return wrapper  # type: ignore[return-value]
+
+        return decorate
+
+    def snapshot(self) -> Snapshot:
+        """Return a copy of the statistics collected so far."""
+
+        with self._lock:
+            return Snapshot(
+                {name: stage.stats() for name, stage in self._stages.items()},
+                dict(self._counters),
+            )
+
+    def reset(self) -> None:
+        """Drop every statistic; callbacks and :attr:`enabled` are kept."""
+
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+
+
+# Process-wide instance used by the converter, lexicon and aligners.
+INSTRUMENTATION = Instrumentation()
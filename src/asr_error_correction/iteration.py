@@ -0,0 +1,24 @@
+"""Small iteration helpers shared by the batch APIs."""
+from __future__ import annotations
+
+from itertools import islice
+from typing import Iterable, Iterator, List, TypeVar
+
+__all__ = ["chunked"]
+
+
+_T = TypeVar("_T")
+
+
+def chunked(items: Iterable[_T], size: int) -> Iterator[List[_T]]:
+    """Yield consecutive lists of ``size`` items, the last one possibly shorter.
+
+    ``items`` is consumed lazily, one chunk at a time.
+    """
+
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
@@ -2,42 +2,255 @@
 from __future__ import annotations
 
 import json
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing.context import BaseContext
 from pathlib import Path
-from typing import Dict, Iterable, Optional
+from typing import (
+    Callable,
+    Deque,
+    Iterable,
+    Iterator,
+    List,
+    MutableMapping,
+    Optional,
+    Tuple,
+)
 
+from .binary import MappedEntries, is_binary_lexicon, write_binary_lexicon
 from .conversion import GraphemePhoneme, IPAConverter
+from .exact import ExactMatches, PhonemeAutomaton
+from .index import DEFAULT_NGRAM_SIZE, PhonemeNGramIndex
+from .instrumentation import INSTRUMENTATION
+from .iteration import chunked
+from .trie import PhonemeTrie
 
 __all__ = ["IPALexicon"]
 
 
+DEFAULT_CHUNK_SIZE = 1000
+
+_worker_converter: Optional[IPAConverter] = None
+
+
+def _init_worker(converter: IPAConverter) -> None:
+    global _worker_converter
+    _worker_converter = converter
+
+
+def _convert_chunk(phrases: List[str]) -> List[GraphemePhoneme]:
+    assert _worker_converter is not None
+    return _worker_converter.convert_to_grapheme_phoneme_many(phrases)
+
+
+def _index_path(path: Path) -> Path:
+    return path.with_name(path.name + ".ngram.json")
+
+
 class IPALexicon:
     """Build and persist a lexicon of phrases and their IPA forms."""
 
     def __init__(self, converter: Optional[IPAConverter] = None) -> None:
         self.converter = converter or IPAConverter()
-        self.entries: Dict[str, GraphemePhoneme] = {}
+        self.entries: MutableMapping[str, GraphemePhoneme] = {}
+        self.index: Optional[PhonemeNGramIndex] = None
+        self._trie: Optional[PhonemeTrie] = None
+        self._automaton: Optional[PhonemeAutomaton] = None
+
+    @INSTRUMENTATION.timed("lexicon.build")
+    def add_phrases(
+        self,
+        phrases: Iterable[str],
+        *,
+        workers: int = 1,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        progress: Optional[Callable[[int], None]] = None,
+        mp_context: Optional[BaseContext] = None,
+    ) -> None:
+        """Convert ``phrases`` and add them to :attr:`entries`.
+
+        Phrases are converted in chunks of ``chunk_size``. With ``workers``
+        greater than one the chunks are spread over a process pool whose
+        workers receive a copy of :attr:`converter`; entries are still
+        inserted in input order, so a repeated phrase keeps its last value.
+        ``progress`` is called with the number of phrases added so far after
+        every chunk.
+        """
+
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        chunks = chunked(
+            (phrase for phrase in phrases if phrase is not None), chunk_size
+        )
+        if workers > 1:
+            results = self._convert_parallel(chunks, workers, mp_context)
+        else:
+            results = (
+                (chunk, self.converter.convert_to_grapheme_phoneme_many(chunk))
+                for chunk in chunks
+            )
+
+        done = 0
+        for chunk, converted in results:
+            self.entries.update(zip(chunk, converted))
+            self._trie = None
+            self._automaton = None
+            if self.index is not None:
+                for phrase, value in zip(chunk, converted):
+                    self.index.add(phrase, value)
+            done += len(chunk)
+            if progress is not None:
+                progress(done)
+
+    def _convert_parallel(
+        self,
+        chunks: Iterator[List[str]],
+        workers: int,
+        mp_context: Optional[BaseContext],
+    ) -> Iterator[Tuple[List[str], List[GraphemePhoneme]]]:
+        # Keep a bounded window of chunks in flight so that huge inputs are
+        # neither materialised upfront nor left waiting on an idle pool.
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=mp_context,
+            initializer=_init_worker,
+            initargs=(self.converter,),
+        ) as executor:
+            pending: Deque[Tuple[List[str], Future]] = deque()
+            for chunk in chunks:
+                pending.append((chunk, executor.submit(_convert_chunk, chunk)))
+                if len(pending) >= 2 * workers:
+                    chunk, future = pending.popleft()
+                    yield chunk, future.result()
+            while pending:
+                chunk, future = pending.popleft()
+                yield chunk, future.result()
+
+    def build_index(self, n: int = DEFAULT_NGRAM_SIZE) -> PhonemeNGramIndex:
+        """Build the phoneme n-gram index used by :meth:`candidates`.
+
+        Once built, the index is kept up to date by :meth:`add_phrases` and
+        saved next to the lexicon by :meth:`save_to`.
+        """
 
-    def add_phrases(self, phrases: Iterable[str]) -> None:
-        for phrase in phrases:
-            if phrase is None:
-                continue
-            self.entries[phrase] = self.converter.convert_to_grapheme_phoneme(phrase)
+        self.index = PhonemeNGramIndex.build(self.entries, n)
+        return self.index
+
+    def candidates(
+        self,
+        sentence: GraphemePhoneme,
+        top_k: Optional[int] = None,
+        min_shared: int = 1,
+    ) -> List[GraphemePhoneme]:
+        """Return the entries sharing phoneme n-grams with ``sentence``.
+
+        The result can be passed to :func:`local_align_sentence` instead of
+        every entry of the lexicon. The index is built with the default
+        n-gram size if :meth:`build_index` has not been called.
+        """
+
+        index = self.index if self.index is not None else self.build_index()
+        keys = index.query(sentence.phoneme_str, top_k, min_shared)
+        return [self.entries[key] for key in keys]
+
+    def align_sentence(
+        self,
+        sentence: GraphemePhoneme,
+        min_score: Optional[float] = None,
+    ) -> List[Tuple[GraphemePhoneme, List[Tuple[float, GraphemePhoneme]]]]:
+        """Align ``sentence`` against every entry through a :class:`PhonemeTrie`.
+
+        Entries sharing a phoneme prefix share its alignment rows. With
+        ``min_score`` only entries reaching that score are returned and
+        hopeless trie branches are skipped. The trie is built on first use
+        and rebuilt after :meth:`add_phrases` or :meth:`load_from`.
+        """
+
+        if self._trie is None:
+            self._trie = PhonemeTrie(self.entries)
+        return self._trie.align(sentence, min_score)
+
+    def exact_matches(
+        self, sentence: GraphemePhoneme, *, whole_tokens: bool = False
+    ) -> ExactMatches:
+        """Find every entry occurring exactly in ``sentence.phoneme_str``.
+
+        See :meth:`PhonemeAutomaton.match`; the ``uncovered`` spans of the
+        result are the only parts of the sentence still worth aligning. The
+        automaton is built on first use and rebuilt after :meth:`add_phrases`
+        or :meth:`load_from`.
+        """
+
+        if self._automaton is None:
+            self._automaton = PhonemeAutomaton(self.entries)
+        return self._automaton.match(sentence, whole_tokens=whole_tokens)
+
+    def _items(self) -> Iterable[Tuple[str, GraphemePhoneme]]:
+        if isinstance(self.entries, MappedEntries):
+            return self.entries.iter_items()
+        return self.entries.items()
+
+    def save_to(self, path: Path | str, *, binary: bool = False) -> None:
+        """Write the lexicon to ``path`` as JSON or, with ``binary``, in the
+        memory-mappable format of :mod:`asr_error_correction.binary`."""
 
-    def save_to(self, path: Path | str) -> None:
         output_path = Path(path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        with output_path.open("w", encoding="utf-8") as file:
-            json.dump(
-                {key: value.to_dict() for key, value in self.entries.items()},
-                file,
-                ensure_ascii=False,
-                indent=2,
-            )
+        # Write next to the target and swap it in, so a lexicon that is
+        # currently memory-mapped from ``path`` stays readable while saving.
+        temporary_path = output_path.with_name(output_path.name + ".tmp")
+        if binary:
+            write_binary_lexicon(temporary_path, self._items())
+        else:
+            with temporary_path.open("w", encoding="utf-8") as file:
+                json.dump(
+                    {key: value.to_dict() for key, value in self._items()},
+                    file,
+                    ensure_ascii=False,
+                    indent=2,
+                )
+        os.replace(temporary_path, output_path)
+        index_path = _index_path(output_path)
+        if self.index is not None:
+            self.index.save_to(index_path, list(self.entries))
+        elif index_path.exists():
+            # A sidecar left by an earlier save no longer matches the entries.
+            index_path.unlink()
 
+    @INSTRUMENTATION.timed("lexicon.load")
     def load_from(self, path: Path | str) -> None:
+        """Load a lexicon written by :meth:`save_to` in either format.
+
+        Binary lexicons are memory-mapped: entries are materialised lazily
+        and phrases added afterwards are kept in memory. A file mapped by an
+        earlier load is released once the new entries are in place.
+        """
+
         input_path = Path(path)
-        with input_path.open("r", encoding="utf-8") as file:
-            data = json.load(file)
-        self.entries = {
-            str(key): GraphemePhoneme.from_dict(value) for key, value in data.items()
-        }
+        previous = self.entries
+        if is_binary_lexicon(input_path):
+            self.entries = MappedEntries(input_path)
+        else:
+            with input_path.open("r", encoding="utf-8") as file:
+                data = json.load(file)
+            self.entries = {
+                str(key): GraphemePhoneme.from_dict(value)
+                for key, value in data.items()
+            }
+        if isinstance(previous, MappedEntries):
+            previous.close()
+        self._trie = None
+        self._automaton = None
+        index_path = _index_path(input_path)
+        self.index = (
+            PhonemeNGramIndex.load_from(index_path, self.entries)
+            if index_path.exists()
+            else None
+        )
+
+    def close(self) -> None:
+        """Release the file mapped by :meth:`load_from`, if any."""
+
+        if isinstance(self.entries, MappedEntries):
+            self.entries.close()
@@ -0,0 +1,434 @@
+"""Hot-reloadable lexicon with copy-on-write snapshots and a change log."""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import (
+    AbstractSet,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from .binary import MappedEntries
+from .conversion import GraphemePhoneme
+from .exact import ExactMatches, PhonemeAutomaton, _collect_matches
+from .lexicon import IPALexicon
+from .trie import PhonemeTrie
+
+__all__ = ["LiveLexicon"]
+
+
+_ADD = "add"
+_REMOVE = "remove"
+
+_TRIE = "trie"
+_AUTOMATON = "automaton"
+_Build = Callable[[Mapping[str, GraphemePhoneme]], Any]
+_BUILDERS: Dict[str, _Build] = {
+    _TRIE: PhonemeTrie,
+    _AUTOMATON: PhonemeAutomaton,
+}
+# Layers may hold this many retired entries beyond the live ones before
+# they are all merged into one.
+_MIN_RETIRED_TO_MERGE = 64
+_ALIVE = sys.maxsize
+
+# ``(key, value)`` of a change; ``value`` is ``None`` for a removal.
+_Change = Tuple[str, Optional[GraphemePhoneme]]
+
+
+class _OverlayEntries(Mapping[str, GraphemePhoneme]):
+    """Immutable entries: a base mapping with some keys added or removed.
+
+    Neither the base nor the two sets of changes are ever modified, so
+    publishing a snapshot only copies the changes made since the base.
+    Keys of the base keep their position, even when replaced; the other
+    keys follow in the order they were added.
+    """
+
+    def __init__(
+        self,
+        base: Mapping[str, GraphemePhoneme],
+        added: Mapping[str, GraphemePhoneme],
+        removed: AbstractSet[str],
+    ) -> None:
+        self._base = base
+        self._added = added
+        self._removed = removed
+        self._length = (
+            len(base) - len(removed) + sum(1 for key in added if key not in base)
+        )
+
+    def __getitem__(self, key: str) -> GraphemePhoneme:
+        value = self._added.get(key)
+        if value is not None:
+            return value
+        if key in self._removed:
+            raise KeyError(key)
+        return self._base[key]
+
+    def __contains__(self, key: object) -> bool:
+        if key in self._added:
+            return True
+        return key not in self._removed and key in self._base
+
+    def __iter__(self) -> Iterator[str]:
+        for key in self._base:
+            if key not in self._removed:
+                yield key
+        for key in self._added:
+            if key not in self._base:
+                yield key
+
+    def __len__(self) -> int:
+        return self._length
+
+
+class _Layer(NamedTuple):
+    """A trie or automaton built once over a batch of entries.
+
+    ``retired`` maps the keys of ``entries`` replaced or removed since to
+    the version that did so. It is the only part ever modified, and only by
+    adding keys, so a snapshot of version ``v`` keeps seeing exactly the
+    entries retired after ``v``.
+    """
+
+    entries: Mapping[str, GraphemePhoneme]
+    structure: Any
+    retired: Dict[str, int]
+
+    def live(self, key: str, version: int) -> bool:
+        return self.retired.get(key, _ALIVE) > version
+
+
+_Layers = Tuple[_Layer, ...]
+
+
+def _merge(layers: _Layers, build: _Build) -> _Layer:
+    entries = {
+        key: value
+        for layer in layers
+        for key, value in layer.entries.items()
+        if key not in layer.retired
+    }
+    return _Layer(entries, build(entries), {})
+
+
+def _grow(
+    layers: _Layers,
+    added: Dict[str, GraphemePhoneme],
+    build: _Build,
+    live: int,
+) -> _Layers:
+    """Add a layer for ``added`` and merge layers like a binary counter.
+
+    A layer is merged into the one before it once it holds at least half
+    as many entries, so every entry is rebuilt O(log n) times and a query
+    visits O(log n) layers. When retired entries outnumber the ``live``
+    ones, all layers are merged.
+    """
+
+    if added:
+        layers = layers + (_Layer(added, build(added), {}),)
+    while len(layers) > 1 and (
+        len(layers[-2].entries) <= 2 * len(layers[-1].entries)
+    ):
+        layers = layers[:-2] + (_merge(layers[-2:], build),)
+    held = sum(len(layer.entries) for layer in layers)
+    if len(layers) > 1 and held > 2 * live + _MIN_RETIRED_TO_MERGE:
+        layers = (_merge(layers, build),)
+    return layers
+
+
+class _LayeredStructure:
+    """The trie or automaton of one snapshot, read through the live layers.
+
+    The first snapshot that needs the structure builds it over its own
+    entries and, if it is still the latest snapshot, hands it to the live
+    lexicon, which from then on maintains it in place on every publish.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        live: "LiveLexicon",
+        snapshot: IPALexicon,
+        version: int,
+        layers: Optional[_Layers],
+    ) -> None:
+        self._kind = kind
+        self._live = live
+        self._snapshot = snapshot
+        self._version = version
+        self._layers = layers
+
+    def layers(self) -> _Layers:
+        if self._layers is None:
+            entries = self._snapshot.entries
+            layers = (_Layer(entries, _BUILDERS[self._kind](entries), {}),)
+            self._live._adopt(self._kind, self._version, layers)
+            self._layers = layers
+        return self._layers
+
+
+class _LayeredTrie(_LayeredStructure):
+    def align(
+        self, sentence: GraphemePhoneme, min_score: Optional[float] = None
+    ) -> List[Tuple[GraphemePhoneme, List[Tuple[float, GraphemePhoneme]]]]:
+        return [
+            (layer.entries[key], hits)
+            for layer in self.layers()
+            for key, hits in layer.structure._align_keys(sentence, min_score)
+            if layer.live(key, self._version)
+        ]
+
+
+class _LayeredAutomaton(_LayeredStructure):
+    def match(
+        self, sentence: GraphemePhoneme, *, whole_tokens: bool = False
+    ) -> ExactMatches:
+        occurrences: List[Tuple[int, int, int, List[str]]] = []
+        for rank, layer in enumerate(self.layers()):
+            for start, end, keys in layer.structure.find(sentence.phoneme_str):
+                keys = [key for key in keys if layer.live(key, self._version)]
+                if keys:
+                    occurrences.append((end, start, rank, keys))
+        # The order of PhonemeAutomaton.find: by end, longest first.
+        occurrences.sort(key=lambda occurrence: occurrence[:3])
+        return _collect_matches(
+            sentence,
+            ((start, end, keys) for end, start, _, keys in occurrences),
+            whole_tokens,
+        )
+
+
+class _Snapshot(IPALexicon):
+    """An :class:`IPALexicon` that refuses to be modified."""
+
+    def add_phrases(self, phrases: Iterable[str], **options: Any) -> None:
+        raise TypeError(
+            "lexicon snapshots are read-only; stage changes on the LiveLexicon"
+        )
+
+    def load_from(self, path: Path | str) -> None:
+        raise TypeError(
+            "lexicon snapshots are read-only; stage changes on the LiveLexicon"
+        )
+
+
+class LiveLexicon:
+    """A lexicon that changes while readers keep using it.
+
+    Readers call :meth:`snapshot` and get an :class:`IPALexicon` that never
+    changes, so it can be iterated, aligned against or handed to
+    :func:`~asr_error_correction.correction.correct` while hotwords come
+    and go; modifying a snapshot raises :class:`TypeError`. Writers stage
+    changes with :meth:`add_phrases` and :meth:`remove_phrases` and make
+    them visible with :meth:`publish`, which swaps in a new snapshot in one
+    assignment.
+
+    Snapshots share the entries of ``lexicon``, which must not be modified
+    afterwards, and only copy the changes made since. Derived structures
+    are updated in place rather than rebuilt: the lexicon's n-gram index,
+    if it has one, is read by every snapshot through a view fixed at
+    publication, and once a snapshot has used its trie or automaton, new
+    entries go into small layers merged like a binary counter while
+    retired ones are masked (see :func:`_grow`). Snapshot alignments list
+    entries layer by layer, so recently published entries come last.
+    Entries keep their encoded :attr:`~GraphemePhoneme.phoneme_codes`
+    across snapshots.
+
+    With ``log_path``, :meth:`publish` appends every set of changes to that
+    file as one JSON line, and :meth:`refresh` applies the lines other
+    processes appended, so a process started from the same base lexicon
+    catches up without reloading it. Only one process should write.
+    """
+
+    def __init__(
+        self,
+        lexicon: Optional[IPALexicon] = None,
+        *,
+        log_path: Optional[Path | str] = None,
+    ) -> None:
+        lexicon = lexicon or IPALexicon()
+        self.converter = lexicon.converter
+        self.log_path = None if log_path is None else Path(log_path)
+        entries = lexicon.entries
+        self._base: Mapping[str, GraphemePhoneme] = (
+            entries if isinstance(entries, MappedEntries) else dict(entries)
+        )
+        self._added: Dict[str, GraphemePhoneme] = {}
+        self._removed: Set[str] = set()
+        self._index = lexicon.index
+        self._layers: Dict[str, _Layers] = {}
+        self._staged: Dict[str, Optional[GraphemePhoneme]] = {}
+        self._lock = threading.Lock()
+        self._log_offset = 0
+        self._version = 0
+        self._snapshot = self._make_snapshot()
+        self.refresh()
+
+    @property
+    def version(self) -> int:
+        """Number of the latest published set of changes."""
+
+        return self._version
+
+    def close(self) -> None:
+        """Release the base lexicon's mapped file, if it has one.
+
+        Snapshots read the base entries, so none may be used afterwards.
+        """
+
+        if isinstance(self._base, MappedEntries):
+            self._base.close()
+
+    def snapshot(self) -> IPALexicon:
+        """Return the lexicon as of the latest :meth:`publish` or :meth:`refresh`."""
+
+        return self._snapshot
+
+    def add_phrases(self, phrases: Iterable[str]) -> None:
+        """Convert ``phrases`` and stage them for the next :meth:`publish`."""
+
+        phrases = list(phrases)
+        converted = self.converter.convert_to_grapheme_phoneme_many(phrases)
+        with self._lock:
+            self._staged.update(zip(phrases, converted))
+
+    def remove_phrases(self, phrases: Iterable[str]) -> None:
+        """Stage the removal of ``phrases``; unknown phrases are ignored."""
+
+        with self._lock:
+            for phrase in phrases:
+                self._staged[phrase] = None
+
+    def publish(self) -> IPALexicon:
+        """Apply the staged changes, log them and return the new snapshot."""
+
+        with self._lock:
+            if not self._staged:
+                return self._snapshot
+            changes = list(self._staged.items())
+            self._staged.clear()
+            version = self._version + 1
+            if self.log_path is not None:
+                self._append_to_log(version, changes)
+            self._apply(version, changes)
+            self._version = version
+            self._snapshot = self._make_snapshot()
+            return self._snapshot
+
+    def refresh(self) -> bool:
+        """Apply changes other processes appended to the log since last time.
+
+        Returns whether a new snapshot was published. Staged changes are
+        left staged.
+        """
+
+        if self.log_path is None:
+            return False
+        with self._lock:
+            try:
+                with self.log_path.open("rb") as file:
+                    file.seek(self._log_offset)
+                    data = file.read()
+            except FileNotFoundError:
+                return False
+            # Every line holds a whole version, so a version still being
+            # written is an incomplete last line, picked up next time.
+            complete = data.rfind(b"\n") + 1
+            if not complete:
+                return False
+            self._log_offset += complete
+            for line in data[:complete].decode("utf-8").splitlines():
+                record = json.loads(line)
+                version = int(record["version"])
+                changes: List[_Change] = [
+                    (
+                        change["key"],
+                        None
+                        if change["op"] == _REMOVE
+                        else GraphemePhoneme.from_dict(change["value"]),
+                    )
+                    for change in record["changes"]
+                ]
+                self._apply(version, changes)
+                self._version = max(self._version, version)
+            self._snapshot = self._make_snapshot()
+            return True
+
+    def _append_to_log(self, version: int, changes: List[_Change]) -> None:
+        records = []
+        for key, value in changes:
+            if value is None:
+                records.append({"op": _REMOVE, "key": key})
+            else:
+                records.append({"op": _ADD, "key": key, "value": value.to_dict()})
+        line = json.dumps({"version": version, "changes": records}, ensure_ascii=False)
+        data = (line + "\n").encode("utf-8")
+        assert self.log_path is not None
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.log_path.open("ab") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+            self._log_offset = file.tell()
+
+    def _apply(self, version: int, changes: List[_Change]) -> None:
+        added: Dict[str, GraphemePhoneme] = {}
+        for key, value in changes:
+            for layers in self._layers.values():
+                for layer in layers:
+                    if key in layer.entries and key not in layer.retired:
+                        layer.retired[key] = version
+            if value is None:
+                self._added.pop(key, None)
+                if key in self._base:
+                    self._removed.add(key)
+                if self._index is not None:
+                    self._index.remove(key)
+            else:
+                self._added[key] = value
+                self._removed.discard(key)
+                added[key] = value
+                if self._index is not None:
+                    self._index.add(key, value)
+        live = len(self._base) - len(self._removed)
+        live += sum(1 for key in self._added if key not in self._base)
+        for kind, layers in self._layers.items():
+            self._layers[kind] = _grow(layers, added, _BUILDERS[kind], live)
+
+    def _adopt(self, kind: str, version: int, layers: _Layers) -> None:
+        """Start maintaining ``layers``, built for ``version``, if still current."""
+
+        with self._lock:
+            if version == self._version and kind not in self._layers:
+                self._layers[kind] = layers
+
+    def _make_snapshot(self) -> IPALexicon:
+        snapshot = _Snapshot(self.converter)
+        snapshot.entries = _OverlayEntries(  # type: ignore[assignment]
+            self._base, dict(self._added), frozenset(self._removed)
+        )
+        if self._index is not None:
+            snapshot.index = self._index._view()
+        snapshot._trie = _LayeredTrie(  # type: ignore[assignment]
+            _TRIE, self, snapshot, self._version, self._layers.get(_TRIE)
+        )
+        snapshot._automaton = _LayeredAutomaton(  # type: ignore[assignment]
+            _AUTOMATON, self, snapshot, self._version, self._layers.get(_AUTOMATON)
+        )
+        return snapshot
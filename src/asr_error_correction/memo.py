@@ -0,0 +1,250 @@
+"""Memoised alignment keyed on phoneme sequences rather than objects."""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from .alignment import LocalAlignment
+from .cache import LRUCache
+from .conversion import GraphemePhoneme
+from .overlap import OverlapHit
+
+__all__ = ["AlignmentCacheInfo", "CachedAlignment"]
+
+
+DEFAULT_ALIGNMENT_CACHE_SIZE = 65536
+
+# Bumped whenever the cached hits of a pair could change.
+_FORMAT_VERSION = "1"
+# Separates segments in keys of segmented alignments, where the same
+# ``phoneme_str`` may be split differently.
+_SEGMENT_SEPARATOR = "\x1f"
+
+_Hits = Tuple[OverlapHit, ...]
+
+
+class AlignmentCacheInfo(NamedTuple):
+    """Usage statistics reported by :class:`CachedAlignment`."""
+
+    hits: int
+    misses: int
+    disk_hits: int
+    evictions: int
+    maxsize: int
+    currsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of pairs served from memory or disk."""
+
+        lookups = self.hits + self.misses
+        return (self.hits + self.disk_hits) / lookups if lookups else 0.0
+
+
+class _DiskCache:
+    """SQLite table of hits that several processes can read and extend."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid = 0
+        # Keys found so far; only updated under ``_lock``.
+        self.hits = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connections must not cross a fork.
+        if self._connection is None or self._pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(
+                self.path, timeout=30, check_same_thread=False, isolation_level=None
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS hits (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, _Hits]:
+        found: Dict[str, _Hits] = {}
+        with self._lock:
+            connection = self._connect()
+            # Stay below SQLite's limit on bound parameters.
+            for offset in range(0, len(keys), 500):
+                chunk = keys[offset : offset + 500]
+                rows = connection.execute(
+                    "SELECT key, value FROM hits WHERE key IN (%s)"
+                    % ",".join("?" * len(chunk)),
+                    chunk,
+                )
+                for key, value in rows:
+                    found[key] = tuple(OverlapHit(*hit) for hit in json.loads(value))
+            self.hits += len(found)
+        return found
+
+    def reset_hits(self) -> None:
+        with self._lock:
+            self.hits = 0
+
+    def put_many(self, items: Sequence[Tuple[str, _Hits]]) -> None:
+        if not items:
+            return
+        rows = [(key, json.dumps([list(hit) for hit in hits])) for key, hits in items]
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute("BEGIN")
+                connection.executemany(
+                    "INSERT OR IGNORE INTO hits (key, value) VALUES (?, ?)", rows
+                )
+
+
+class CachedAlignment:
+    """Wrap a :class:`LocalAlignment`, reusing the hits of repeated pairs.
+
+    Hits are cached per sentence phoneme sequence, query phoneme sequence
+    and aligner configuration, as character spans of the sentence's
+    ``phoneme_str``. They are projected onto the caller's sentence with
+    :meth:`GraphemePhoneme.subsequence_covering_span`, so sentences that
+    sound the same but are written differently share an entry.
+
+    Up to ``maxsize`` pairs are kept in memory, least recently used first
+    out. With ``cache_dir`` the hits are also stored in an SQLite database
+    there, which any number of processes may share; it is consulted on
+    memory misses. Copies sent to other processes start with an empty
+    memory cache.
+    """
+
+    def __init__(
+        self,
+        aligner: Optional[LocalAlignment] = None,
+        *,
+        maxsize: int = DEFAULT_ALIGNMENT_CACHE_SIZE,
+        cache_dir: Optional[Path | str] = None,
+    ) -> None:
+        self.aligner = aligner or LocalAlignment()
+        self.maxsize = maxsize
+        self.cache_dir = None if cache_dir is None else Path(cache_dir)
+        self._cache: LRUCache[_Hits] = LRUCache(maxsize)
+        self._disk = (
+            None if self.cache_dir is None else _DiskCache(self.cache_dir / "alignments.sqlite")
+        )
+        self._config = json.dumps([_FORMAT_VERSION, *self.aligner._config()])
+
+    def __getstate__(self) -> dict:
+        return {
+            "aligner": self.aligner,
+            "maxsize": self.maxsize,
+            "cache_dir": self.cache_dir,
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(
+            state["aligner"], maxsize=state["maxsize"], cache_dir=state["cache_dir"]
+        )
+
+    def cache_info(self) -> AlignmentCacheInfo:
+        """Return hit/miss statistics; disk hits are also memory misses."""
+
+        info = self._cache.info()
+        return AlignmentCacheInfo(
+            info.hits,
+            info.misses,
+            0 if self._disk is None else self._disk.hits,
+            info.evictions,
+            info.maxsize,
+            info.currsize,
+        )
+
+    def cache_clear(self) -> None:
+        """Empty the memory cache and reset the statistics."""
+
+        self._cache.clear()
+        if self._disk is not None:
+            self._disk.reset_hits()
+
+    @property
+    def segmented(self) -> bool:
+        return self.aligner.segmented
+
+    @property
+    def min_score(self) -> Optional[float]:
+        return self.aligner.min_score
+
+    def _units(self, value: GraphemePhoneme) -> str:
+        if self.aligner.segmented:
+            return _SEGMENT_SEPARATOR.join(value.phoneme_segments)
+        return value.phoneme_str
+
+    def _key(self, sentence_units: str, query: GraphemePhoneme) -> str:
+        digest = hashlib.sha256(self._config.encode("utf-8"))
+        for units in (sentence_units, self._units(query)):
+            digest.update(b"\0" + units.encode("utf-8"))
+        return digest.hexdigest()
+
+    def align(
+        self, sentence: GraphemePhoneme, query: GraphemePhoneme
+    ) -> List[Tuple[float, GraphemePhoneme]]:
+        """Align ``sentence`` against ``query``, reusing cached hits."""
+
+        return self.align_many(sentence, [query])[0]
+
+    def align_many(
+        self, sentence: GraphemePhoneme, queries: Sequence[GraphemePhoneme]
+    ) -> List[List[Tuple[float, GraphemePhoneme]]]:
+        """Align ``sentence`` against every query, computing only the misses.
+
+        The pairs found in neither cache are aligned together, so the
+        ``"numpy"`` engine still batches them.
+        """
+
+        return [
+            self.aligner._project_hits(sentence, hits)
+            for hits in self.hits_many(sentence, queries)
+        ]
+
+    def hits_many(
+        self, sentence: GraphemePhoneme, queries: Sequence[GraphemePhoneme]
+    ) -> List[_Hits]:
+        """:meth:`LocalAlignment.hits_many`, reusing cached hits."""
+
+        sentence_units = self._units(sentence)
+        keys = [self._key(sentence_units, query) for query in queries]
+        hits: List[Optional[_Hits]] = [self._cache.get(key) for key in keys]
+
+        missing = [position for position, value in enumerate(hits) if value is None]
+        if missing and self._disk is not None:
+            stored = self._disk.get_many([keys[position] for position in missing])
+            for position in missing:
+                value = stored.get(keys[position])
+                if value is not None:
+                    hits[position] = value
+                    self._cache.put(keys[position], value)
+            missing = [position for position in missing if hits[position] is None]
+
+        if missing:
+            # Repeated queries are aligned and stored once.
+            first: Dict[str, int] = {}
+            for position in missing:
+                first.setdefault(keys[position], position)
+            computed = self.aligner.hits_many(
+                sentence, [queries[position] for position in first.values()]
+            )
+            new_items: Dict[str, _Hits] = {}
+            for key, value in zip(first, computed):
+                value = tuple(OverlapHit(float(hit.score), hit.start, hit.end) for hit in value)
+                self._cache.put(key, value)
+                new_items[key] = value
+            for position in missing:
+                hits[position] = new_items[keys[position]]
+            if self._disk is not None:
+                self._disk.put_many(list(new_items.items()))
+
+        return hits  # type: ignore[return-value]
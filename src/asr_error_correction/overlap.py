@@ -0,0 +1,477 @@
+"""Vectorised overlap (semi-global) alignment compatible with ``lingpy``."""
+from __future__ import annotations
+
+from typing import Dict, Iterator, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+from .phonemes import SymbolTable
+
+__all__ = ["OverlapHit", "overlap_align", "overlap_align_many", "overlap_hits_many"]
+
+
+DEFAULT_GOP = -1.0
+DEFAULT_SCALE = 0.5
+DEFAULT_BUCKET_WIDTH = 4
+
+# Upper bound on DP cells held at once (~9 bytes each) by a batched alignment.
+_MAX_BATCH_CELLS = 4_000_000
+
+_MATCH = 1
+_GAP_IN_SENTENCE = 2
+_GAP_IN_QUERY = 3
+_MARKERS = frozenset({"", "-", "‖"})
+
+
+class OverlapHit(NamedTuple):
+    """Score and matched ``[start, end)`` region of the sentence."""
+
+    score: float
+    start: int
+    end: int
+
+
+def _is_marker(token: str) -> bool:
+    return token.strip() in _MARKERS
+
+
+class _EncodedQueries(NamedTuple):
+    codes: np.ndarray
+    lengths: np.ndarray
+    markers: np.ndarray
+
+
+def _encode_sentence(
+    sentence: Sequence[str] | Sequence[int], table: SymbolTable | None
+) -> Tuple[Dict[str, int] | None, np.ndarray, np.ndarray, np.ndarray]:
+    if table is not None:
+        codes = np.asarray(sentence, dtype=np.intp)
+        return None, codes, table.markers()[codes], table.sizes()[codes]
+    symbols: Dict[str, int] = {}
+    codes = np.fromiter(
+        (symbols.setdefault(segment, len(symbols)) for segment in sentence),
+        np.intp,
+        len(sentence),
+    )
+    markers = np.fromiter((_is_marker(s) for s in sentence), bool, len(sentence))
+    sizes = np.fromiter((len(s) for s in sentence), np.intp, len(sentence))
+    return symbols, codes, markers, sizes
+
+
+def _encode_queries(
+    queries: Sequence[Sequence[str]] | Sequence[Sequence[int]],
+    symbols: Dict[str, int] | None,
+    table: SymbolTable | None,
+) -> _EncodedQueries:
+    """Pad ``queries`` into one code matrix; unknown segments never match.
+
+    With a ``table`` the queries already hold its codes and are copied as is.
+    """
+
+    width = max(len(query) for query in queries)
+    codes = np.full((len(queries), width), -1, dtype=np.intp)
+    markers = np.zeros((len(queries), width), dtype=bool)
+    for row, query in enumerate(queries):
+        if table is not None:
+            codes[row, : len(query)] = query
+        else:
+            codes[row, : len(query)] = [symbols.get(segment, -1) for segment in query]
+            markers[row, : len(query)] = [_is_marker(segment) for segment in query]
+    if table is not None:
+        markers = table.markers()[np.maximum(codes, 0)] & (codes >= 0)
+    lengths = np.fromiter((len(query) for query in queries), np.intp, len(queries))
+    return _EncodedQueries(codes, lengths, markers)
+
+
+def _fill(
+    sentence_codes: np.ndarray,
+    queries: _EncodedQueries,
+    gop: float,
+    scale: float,
+    scorer: np.ndarray | None = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Fill lingpy's semi-global DP for a batch of queries.
+
+    Rows follow the query and columns follow the sentence, exactly as in
+    ``lingpy.algorithm.cython.talign.semi_globalign``, including its tie
+    breaking and its rule of extending a gap only when the neighbouring cell
+    was itself reached through a gap. Each cell on an anti-diagonal depends
+    only on the two previous anti-diagonals, so the matrices are stored
+    skewed (cell ``(i, j)`` of query ``b`` lives at ``[i + j, b, i]``) and
+    every diagonal of every query is updated with a few operations on
+    contiguous slices. Padding rows beyond a query's length never feed back
+    into its real rows.
+
+    Segments score +1 when equal and -1 otherwise, or ``scorer[query,
+    sentence]`` when a substitution matrix over the codes is given.
+
+    Returns the final score of every query and the skewed score and
+    traceback matrices.
+    """
+
+    m = len(sentence_codes)
+    batch, n = queries.codes.shape
+    diagonals = n + m + 1
+    value = np.zeros((diagonals, batch, n + 1), dtype=np.float64)
+    trace = np.zeros((diagonals, batch, n + 1), dtype=np.int8)
+    trace[0, :, 0] = _MATCH
+    trace[1 : m + 1, :, 0] = _GAP_IN_SENTENCE
+    rows = np.arange(1, n + 1)
+    trace[rows, :, rows] = _GAP_IN_QUERY
+
+    last_row = rows[None, :] == queries.lengths[:, None]
+    reversed_sentence = sentence_codes[::-1]
+    extend = gop * scale
+
+    for diagonal in range(2, n + m + 1):
+        lo = max(1, diagonal - m)
+        hi = min(n, diagonal - 1) + 1
+        previous = diagonal - 1
+
+        up = value[previous, :, lo - 1 : hi - 1]
+        gap_a = up + np.where(
+            trace[previous, :, lo - 1 : hi - 1] == _GAP_IN_QUERY, extend, gop
+        )
+        if diagonal - m >= 1:
+            # The last sentence column: trailing query segments are free.
+            gap_a[:, 0] = up[:, 0]
+
+        left = value[previous, :, lo:hi]
+        gap_b = np.where(
+            last_row[:, lo - 1 : hi - 1],
+            # The last query row: trailing sentence segments are free.
+            left,
+            left
+            + np.where(trace[previous, :, lo:hi] == _GAP_IN_SENTENCE, extend, gop),
+        )
+
+        # Row i meets sentence column j = diagonal - i.
+        segments = reversed_sentence[m - diagonal + lo : m - diagonal + hi]
+        query_segments = queries.codes[:, lo - 1 : hi - 1]
+        if scorer is None:
+            scores = np.where(query_segments == segments, 1.0, -1.0)
+        else:
+            # Padding codes (-1) index the last symbol; they never feed back.
+            scores = scorer[query_segments, segments]
+        match = value[diagonal - 2, :, lo - 1 : hi - 1] + scores
+
+        take_a = (gap_a > match) & (gap_a >= gap_b)
+        take_match = match >= gap_b
+        value[diagonal, :, lo:hi] = np.where(
+            take_a, gap_a, np.where(take_match, match, gap_b)
+        )
+        trace[diagonal, :, lo:hi] = np.where(
+            take_a, _GAP_IN_QUERY, np.where(take_match, _MATCH, _GAP_IN_SENTENCE)
+        )
+
+    lengths = queries.lengths
+    final = value[lengths + m, np.arange(batch), lengths]
+    return final, value, trace
+
+
+def _traceback_spans(
+    trace: np.ndarray,
+    queries: _EncodedQueries,
+    sentence_markers: np.ndarray,
+    sentence_sizes: np.ndarray,
+    skewed: bool = True,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Walk every query's traceback back from its final cell in lockstep.
+
+    The spans follow the conventions of the ``lingpy`` token walk in
+    :mod:`asr_error_correction.alignment`: a span starts at the first
+    sentence segment paired with a query segment and extends by the length
+    of every such paired segment. Returns ``(found, starts, ends)``.
+    ``trace`` is stored as in :func:`_fill`, or column by column
+    (``[j, b, i]``) when ``skewed`` is false.
+    """
+
+    m = len(sentence_markers)
+    batch = len(queries.lengths)
+    index = np.arange(batch)
+    i = queries.lengths.copy()
+    j = np.full(batch, m, dtype=np.intp)
+    paired = np.full((batch, m), -1, dtype=np.intp)
+    active = (i > 0) | (j > 0)
+    while active.any():
+        step = trace[i + j if skewed else j, index, i]
+        match = active & (step == _MATCH)
+        paired[index[match], j[match] - 1] = i[match] - 1
+        i -= active & ((step == _GAP_IN_QUERY) | match)
+        j -= active & ((step == _GAP_IN_SENTENCE) | match)
+        active = (i > 0) | (j > 0)
+
+    counted = (paired >= 0) & ~sentence_markers[None, :]
+    counted &= ~queries.markers[index[:, None], np.maximum(paired, 0)]
+    sizes = np.where(sentence_markers, 0, sentence_sizes)
+    offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    found = counted.any(axis=1)
+    starts = offsets[counted.argmax(axis=1)]
+    ends = starts + (counted * sizes[None, :]).sum(axis=1)
+    return found, starts, ends
+
+
+def _buckets(
+    lengths: Sequence[int], sentence_length: int, bucket_width: int
+) -> List[List[int]]:
+    """Group query indices of similar length into memory-bounded batches."""
+
+    groups: Dict[int, List[int]] = {}
+    for position, length in enumerate(lengths):
+        groups.setdefault((length - 1) // bucket_width, []).append(position)
+
+    batches: List[List[int]] = []
+    for key in sorted(groups):
+        members = groups[key]
+        longest = max(lengths[position] for position in members)
+        per_query = (longest + sentence_length + 1) * (longest + 1)
+        size = max(1, _MAX_BATCH_CELLS // per_query)
+        batches.extend(
+            members[offset : offset + size] for offset in range(0, len(members), size)
+        )
+    return batches
+
+
+class _AlignedBatch(NamedTuple):
+    positions: List[int]
+    queries: _EncodedQueries
+    final: np.ndarray
+    value: np.ndarray
+    trace: np.ndarray
+
+
+class _EncodedSentence(NamedTuple):
+    codes: np.ndarray
+    markers: np.ndarray
+    sizes: np.ndarray
+
+
+def _aligned_batches(
+    sentence: Sequence[str] | Sequence[int],
+    queries: Sequence[Sequence[str]] | Sequence[Sequence[int]],
+    gop: float,
+    scale: float,
+    bucket_width: int,
+    table: SymbolTable | None,
+    scorer: np.ndarray | None,
+) -> Tuple[_EncodedSentence, Iterator[_AlignedBatch]]:
+    if bucket_width < 1:
+        raise ValueError("bucket_width must be positive")
+    if scorer is not None and table is None:
+        raise ValueError("scorer requires integer-encoded input and a table")
+    symbols, codes, markers, sizes = _encode_sentence(sentence, table)
+    encoded_sentence = _EncodedSentence(codes, markers, sizes)
+
+    def batches() -> Iterator[_AlignedBatch]:
+        lengths = [len(query) for query in queries]
+        non_empty = [position for position, length in enumerate(lengths) if length]
+        for batch in _buckets(
+            [lengths[position] for position in non_empty], len(sentence), bucket_width
+        ):
+            positions = [non_empty[member] for member in batch]
+            encoded = _encode_queries([queries[p] for p in positions], symbols, table)
+            final, value, trace = _fill(codes, encoded, gop, scale, scorer)
+            yield _AlignedBatch(positions, encoded, final, value, trace)
+
+    return encoded_sentence, batches()
+
+
+def overlap_align_many(
+    sentence: Sequence[str] | Sequence[int],
+    queries: Sequence[Sequence[str]] | Sequence[Sequence[int]],
+    *,
+    gop: float = DEFAULT_GOP,
+    scale: float = DEFAULT_SCALE,
+    bucket_width: int = DEFAULT_BUCKET_WIDTH,
+    table: SymbolTable | None = None,
+    scorer: np.ndarray | None = None,
+) -> List[OverlapHit | None]:
+    """Align every query in ``queries`` inside ``sentence``.
+
+    Queries are grouped into buckets whose lengths differ by less than
+    ``bucket_width``; each bucket is padded into one score tensor and
+    aligned in a single vectorised pass. The results are identical to
+    calling :func:`overlap_align` for each query and keep the input order.
+    When ``table`` is given, ``sentence`` and ``queries`` are sequences of
+    its codes (such as :attr:`GraphemePhoneme.phoneme_codes`) and no
+    string is compared. A ``scorer`` matrix indexed by those codes (see
+    :func:`asr_error_correction.scoring.substitution_matrix`) then replaces
+    the identity scores.
+    """
+
+    results: List[OverlapHit | None] = [None] * len(queries)
+    encoded_sentence, batches = _aligned_batches(
+        sentence, queries, gop, scale, bucket_width, table, scorer
+    )
+    if len(sentence) == 0:
+        return results
+    for batch in batches:
+        found, starts, ends = _traceback_spans(
+            batch.trace, batch.queries, encoded_sentence.markers, encoded_sentence.sizes
+        )
+        for row, position in enumerate(batch.positions):
+            if found[row]:
+                results[position] = OverlapHit(
+                    float(batch.final[row]), int(starts[row]), int(ends[row])
+                )
+    return results
+
+
+def _trace_path(
+    trace: np.ndarray, row: int, i: int, j: int, first_step: int
+) -> List[Tuple[int, int]]:
+    """Return the ``(query, sentence)`` segment pairs of one traceback.
+
+    The walk starts at cell ``(i, j)`` of query ``row`` with ``first_step``
+    and then follows the stored traceback.
+    """
+
+    pairs: List[Tuple[int, int]] = []
+    step = first_step
+    while i > 0 or j > 0:
+        if step == _MATCH:
+            pairs.append((i - 1, j - 1))
+            i -= 1
+            j -= 1
+        elif step == _GAP_IN_QUERY:
+            i -= 1
+        else:
+            j -= 1
+        step = trace[i + j, row, i]
+    pairs.reverse()
+    return pairs
+
+
+def _path_hit(
+    pairs: List[Tuple[int, int]],
+    score: float,
+    query_markers: np.ndarray,
+    sentence: _EncodedSentence,
+    offsets: np.ndarray,
+) -> Tuple[OverlapHit, int, int] | None:
+    """Turn a traceback into a hit plus its first and last sentence segment."""
+
+    counted = [
+        column
+        for query_index, column in pairs
+        if not sentence.markers[column] and not query_markers[query_index]
+    ]
+    if not counted:
+        return None
+    start = int(offsets[counted[0]])
+    end = start + int(sentence.sizes[counted].sum())
+    return OverlapHit(score, start, end), counted[0], counted[-1]
+
+
+def overlap_hits_many(
+    sentence: Sequence[str] | Sequence[int],
+    queries: Sequence[Sequence[str]] | Sequence[Sequence[int]],
+    *,
+    max_hits: int = 1,
+    min_score: float | None = None,
+    gop: float = DEFAULT_GOP,
+    scale: float = DEFAULT_SCALE,
+    bucket_width: int = DEFAULT_BUCKET_WIDTH,
+    table: SymbolTable | None = None,
+    scorer: np.ndarray | None = None,
+) -> List[List[OverlapHit]]:
+    """Return up to ``max_hits`` non-overlapping hits of every query.
+
+    The first hit is the one :func:`overlap_align_many` reports. Further
+    hits are read from the same DP matrices, Waterman-Eggert style: every
+    sentence position where the whole query can end is a candidate scored
+    by its last-row cell, candidates are traced back from best to worst and
+    kept when they share no sentence segment with a hit already kept.
+    Hits scoring below ``min_score`` are dropped. The remaining arguments
+    are those of :func:`overlap_align_many`.
+    """
+
+    if max_hits < 1:
+        raise ValueError("max_hits must be positive")
+    results: List[List[OverlapHit]] = [[] for _ in queries]
+    encoded_sentence, batches = _aligned_batches(
+        sentence, queries, gop, scale, bucket_width, table, scorer
+    )
+    m = len(sentence)
+    if m == 0:
+        return results
+    sizes = np.where(encoded_sentence.markers, 0, encoded_sentence.sizes)
+    encoded_sentence = encoded_sentence._replace(sizes=sizes)
+    offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    extend = gop * scale
+    columns = np.arange(1, m + 1)
+
+    for batch in batches:
+        for row, position in enumerate(batch.positions):
+            n = int(batch.queries.lengths[row])
+            query_markers = batch.queries.markers[row]
+            last = batch.queries.codes[row, n - 1]
+
+            # Score of the whole query ending exactly at every column, i.e.
+            # the last-row cell before the free trailing sentence gap.
+            up = batch.value[n - 1 + columns, row, n - 1]
+            gap_a = up + np.where(
+                batch.trace[n - 1 + columns, row, n - 1] == _GAP_IN_QUERY, extend, gop
+            )
+            gap_a[-1] = up[-1]
+            if scorer is None:
+                scores = np.where(encoded_sentence.codes == last, 1.0, -1.0)
+            else:
+                scores = scorer[last, encoded_sentence.codes]
+            match = batch.value[n - 2 + columns, row, n - 1] + scores
+            ending = np.maximum(gap_a, match)
+            steps = np.where(gap_a > match, _GAP_IN_QUERY, _MATCH)
+
+            candidates = [(float(batch.final[row]), n, m, int(batch.trace[n + m, row, n]))]
+            for column in np.argsort(-ending, kind="stable"):
+                candidates.append(
+                    (float(ending[column]), n, int(column) + 1, int(steps[column]))
+                )
+
+            hits = results[position]
+            taken: List[Tuple[int, int]] = []
+            for score, i, j, step in candidates:
+                if len(hits) == max_hits or (min_score is not None and score < min_score):
+                    break
+                found = _path_hit(
+                    _trace_path(batch.trace, row, i, j, step),
+                    score,
+                    query_markers,
+                    encoded_sentence,
+                    offsets,
+                )
+                if found is None:
+                    if not hits:
+                        # Nothing aligns at all, as in overlap_align_many.
+                        break
+                    continue
+                hit, first, last_column = found
+                if any(first <= high and low <= last_column for low, high in taken):
+                    continue
+                taken.append((first, last_column))
+                hits.append(hit)
+    return results
+
+
+def overlap_align(
+    sentence: Sequence[str] | Sequence[int],
+    query: Sequence[str] | Sequence[int],
+    *,
+    gop: float = DEFAULT_GOP,
+    scale: float = DEFAULT_SCALE,
+    table: SymbolTable | None = None,
+    scorer: np.ndarray | None = None,
+) -> OverlapHit | None:
+    """Align ``query`` inside ``sentence`` and return the best overlap hit.
+
+    ``sentence`` and ``query`` are sequences of phoneme segments (a plain
+    string aligns character by character, like ``lingpy.align.pw_align``).
+    The score matches ``pw_align(sentence, query, mode="overlap")`` with the
+    default identity scorer; ``start``/``end`` are offsets into the
+    concatenated sentence string. ``None`` is returned when nothing aligns.
+    Integer-encoded inputs are accepted as in :func:`overlap_align_many`.
+    """
+
+    return overlap_align_many(
+        sentence, [query], gop=gop, scale=scale, table=table, scorer=scorer
+    )[0]
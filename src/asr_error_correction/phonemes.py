@@ -0,0 +1,167 @@
+"""Phoneme segmentation and the interned phoneme symbol table."""
+from __future__ import annotations
+
+import unicodedata
+from array import array
+from threading import Lock
+from typing import Dict, FrozenSet, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+__all__ = ["SYMBOLS", "SymbolTable", "segment_phonemes"]
+
+
+# Two-letter clusters written without a tie bar that denote one affricate.
+DEFAULT_AFFRICATES: FrozenSet[str] = frozenset(
+    {"ts", "dz", "tʃ", "dʒ", "tɕ", "dʑ", "tʂ", "dʐ"}
+)
+
+_TIE_BARS = frozenset("͜͡")
+_TONE_LETTERS = frozenset("˥˦˧˨˩")
+# Modifier letters that mark prosody rather than modify the previous sound.
+_STANDALONE_MODIFIERS = frozenset("ˈˌ") | _TONE_LETTERS
+# Spacing modifiers outside the ``Lm`` category that still attach.
+_ATTACHING_SYMBOLS = frozenset("˞")
+_MARKERS = frozenset({"", "-", "‖"})
+
+# Codes are stored as ``array('H')``.
+_MAX_SYMBOLS = 1 << 16
+
+
+def _attaches(character: str) -> bool:
+    """Return ``True`` if ``character`` modifies the preceding segment."""
+
+    if character in _STANDALONE_MODIFIERS:
+        return False
+    if character in _ATTACHING_SYMBOLS:
+        return True
+    return unicodedata.category(character) in ("Mn", "Me", "Lm")
+
+
+def segment_phonemes(
+    ipa: str, affricates: FrozenSet[str] = DEFAULT_AFFRICATES
+) -> List[str]:
+    """Split ``ipa`` into phoneme segments.
+
+    Combining diacritics and modifier letters such as ``ʰ``, ``ʷ`` or ``ː``
+    stay with the sound they modify, tie bars join their two neighbours,
+    runs of tone letters form one segment and the clusters in
+    ``affricates`` are kept together. Stress marks, spaces and any other
+    character form segments of their own, so ``"".join(segments) == ipa``.
+    """
+
+    segments: List[str] = []
+    join_next = False
+    for character in ipa:
+        if segments and (
+            join_next
+            or _attaches(character)
+            or segments[-1] + character in affricates
+            or (character in _TONE_LETTERS and segments[-1][-1] in _TONE_LETTERS)
+        ):
+            segments[-1] += character
+        else:
+            segments.append(character)
+        join_next = character in _TIE_BARS
+    return segments
+
+
+class SymbolTable:
+    """Interning table mapping phoneme segments to small integer codes.
+
+    Codes are assigned in first-seen order and never change, so sequences
+    encoded with the same table can be compared, hashed and aligned as
+    integers. The table is safe to share between threads. Codes are only
+    meaningful within one process; persist segments, not codes.
+    """
+
+    def __init__(self, symbols: Iterable[str] = ()) -> None:
+        self._codes: Dict[str, int] = {}
+        self._symbols: List[str] = []
+        self._lock = Lock()
+        self._tables = (np.zeros(0, dtype=np.intp), np.zeros(0, dtype=bool))
+        for symbol in symbols:
+            self.intern(symbol)
+
+    def __getstate__(self) -> dict:
+        return {"symbols": list(self._symbols)}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["symbols"])
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+    def __contains__(self, symbol: object) -> bool:
+        return symbol in self._codes
+
+    @property
+    def symbols(self) -> Sequence[str]:
+        """Interned symbols, indexed by code."""
+
+        return tuple(self._symbols)
+
+    def intern(self, symbol: str) -> int:
+        """Return the code of ``symbol``, assigning the next free one if new."""
+
+        code = self._codes.get(symbol)
+        if code is not None:
+            return code
+        with self._lock:
+            code = self._codes.get(symbol)
+            if code is None:
+                code = len(self._symbols)
+                if code >= _MAX_SYMBOLS:
+                    raise OverflowError("symbol table is full")
+                self._symbols.append(symbol)
+                self._codes[symbol] = code
+        return code
+
+    def symbol(self, code: int) -> str:
+        """Return the symbol interned as ``code``."""
+
+        return self._symbols[code]
+
+    def encode(self, segments: Iterable[str]) -> "array[int]":
+        """Intern every segment and return their codes as ``array('H')``."""
+
+        return array("H", [self.intern(segment) for segment in segments])
+
+    def encode_ipa(self, ipa: str) -> "array[int]":
+        """Segment ``ipa`` with :func:`segment_phonemes` and encode it."""
+
+        return self.encode(segment_phonemes(ipa))
+
+    def decode(self, codes: Iterable[int]) -> List[str]:
+        """Return the segments of ``codes``."""
+
+        return [self._symbols[code] for code in codes]
+
+    def sizes(self) -> np.ndarray:
+        """Length in characters of every symbol, indexed by code."""
+
+        return self._refresh()[0]
+
+    def markers(self) -> np.ndarray:
+        """Whether every symbol is an alignment gap marker, indexed by code."""
+
+        return self._refresh()[1]
+
+    def _refresh(self) -> Tuple[np.ndarray, np.ndarray]:
+        tables = self._tables
+        symbols = self._symbols[:]
+        if len(tables[0]) != len(symbols):
+            tables = (
+                np.fromiter(map(len, symbols), np.intp, len(symbols)),
+                np.fromiter(
+                    (symbol.strip() in _MARKERS for symbol in symbols),
+                    bool,
+                    len(symbols),
+                ),
+            )
+            self._tables = tables
+        return tables
+
+
+# Process-wide table used by :class:`GraphemePhoneme` and the aligners.
+SYMBOLS = SymbolTable()
@@ -0,0 +1,181 @@
+"""Frozen pronunciation tables standing in for eng_to_ipa and dragonmapper.
+
+Layout (little endian)::
+
+    header          magic, English entries, Chinese entries, string blob size
+    string_offsets  uint64[2 * entries + 1]  key and IPA of every entry
+    blob            UTF-8 strings
+
+English entries come first, then Chinese ones; each group is sorted by key
+bytes. English keys are lower-case words, Chinese keys are single
+characters and CC-CEDICT words. The file is memory-mapped, so opening it is
+immediate and processes share its pages.
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import sqlite3
+import struct
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+__all__ = [
+    "FrozenPronunciations",
+    "build_frozen_pronunciations",
+    "write_frozen_pronunciations",
+]
+
+
+MAGIC = b"IPAPRON1"
+_HEADER = struct.Struct("<8sQQQ")
+
+# Marker eng_to_ipa appends to words missing from its dictionary.
+_UNKNOWN_WORD = "*"
+
+
+def write_frozen_pronunciations(
+    path: Path | str,
+    english: Iterable[Tuple[str, str]],
+    chinese: Iterable[Tuple[str, str]],
+) -> None:
+    """Write ``(key, ipa)`` pairs for both languages to ``path``."""
+
+    groups = []
+    for pairs in (english, chinese):
+        encoded = {
+            key.encode("utf-8"): ipa.encode("utf-8") for key, ipa in pairs
+        }
+        groups.append(sorted(encoded.items()))
+
+    blob = bytearray()
+    offsets = [0]
+    for group in groups:
+        for key, ipa in group:
+            blob += key
+            offsets.append(len(blob))
+            blob += ipa
+            offsets.append(len(blob))
+
+    output_path = Path(path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = output_path.with_name(f"{output_path.name}.{os.getpid()}.tmp")
+    with temporary_path.open("wb") as file:
+        file.write(_HEADER.pack(MAGIC, len(groups[0]), len(groups[1]), len(blob)))
+        file.write(np.asarray(offsets, dtype="<u8").tobytes())
+        file.write(bytes(blob))
+    os.replace(temporary_path, output_path)
+
+
+def _english_pairs() -> Iterator[Tuple[str, str]]:
+    # Imported here: building is the only time the backends are needed.
+    import eng_to_ipa.transcribe
+
+    from .conversion import _convert_english_words
+
+    database = Path(eng_to_ipa.transcribe.__file__).parent / "resources" / "CMU_dict.db"
+    with sqlite3.connect(database) as connection:
+        rows = connection.execute("SELECT DISTINCT word FROM dictionary")
+        # The tokenizer only hands purely alphabetic words to the backend.
+        words = sorted(word for (word,) in rows if word.isalpha())
+    return zip(words, _convert_english_words(words))
+
+
+def _chinese_pairs() -> Iterator[Tuple[str, str]]:
+    import dragonmapper.hanzi
+
+    from .conversion import hanzi_to_ipa
+
+    for key in (*dragonmapper.hanzi._CHARACTERS, *dragonmapper.hanzi._WORDS):
+        try:
+            yield key, hanzi_to_ipa(key)
+        except ValueError:
+            # A few CC-CEDICT readings are not valid Pinyin; the live backend
+            # fails on those words too.
+            continue
+
+
+def build_frozen_pronunciations(path: Path | str) -> None:
+    """Freeze every pronunciation known to the installed backends.
+
+    The English table holds ``eng_to_ipa.convert(word)`` for every word of
+    the CMU dictionary, the Chinese one ``dragonmapper.hanzi.to_ipa`` for
+    every character and CC-CEDICT word. This takes a while; the resulting
+    file is meant to be built once and shipped.
+    """
+
+    write_frozen_pronunciations(path, _english_pairs(), _chinese_pairs())
+
+
+class FrozenPronunciations:
+    """Pronunciation lookups served from a :func:`write_frozen_pronunciations` file.
+
+    :meth:`english` and :meth:`chinese` return what ``eng_to_ipa.convert``
+    and ``dragonmapper.hanzi.to_ipa`` return for a single alphabetic word
+    or a run of Chinese characters. Unknown English words come back in
+    eng_to_ipa's ``word*`` form; unknown characters are kept as they are.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        with self.path.open("rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, english, chinese, _ = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a frozen pronunciation file")
+        entries = english + chinese
+        self._offsets = np.frombuffer(self._map, "<u8", 2 * entries + 1, _HEADER.size)
+        self._blob_start = _HEADER.size + self._offsets.nbytes
+        self._english = (0, english)
+        self._chinese = (english, entries)
+
+    def __reduce__(self):
+        return (FrozenPronunciations, (str(self.path),))
+
+    def __len__(self) -> int:
+        return self._chinese[1]
+
+    def _string(self, index: int) -> bytes:
+        start = self._blob_start + int(self._offsets[index])
+        end = self._blob_start + int(self._offsets[index + 1])
+        return self._map[start:end]
+
+    def _find(self, group: Tuple[int, int], key: str) -> Optional[str]:
+        target = key.encode("utf-8")
+        lo, hi = group
+        while lo < hi:
+            mid = (lo + hi) // 2
+            candidate = self._string(2 * mid)
+            if candidate < target:
+                lo = mid + 1
+            elif candidate > target:
+                hi = mid
+            else:
+                return self._string(2 * mid + 1).decode("utf-8")
+        return None
+
+    def english(self, word: str) -> str:
+        """Return the IPA of the alphabetic ``word``."""
+
+        key = word.lower()
+        ipa = self._find(self._english, key)
+        return key + _UNKNOWN_WORD if ipa is None else ipa
+
+    def english_many(self, words: Iterable[str]) -> List[str]:
+        return [self.english(word) for word in words]
+
+    def chinese(self, text: str) -> str:
+        """Return the IPA of a run of Chinese characters.
+
+        Like dragonmapper, a run that is a dictionary word gets the word's
+        reading; otherwise every character is read on its own.
+        """
+
+        ipa = self._find(self._chinese, text)
+        if ipa is not None:
+            return ipa
+        if len(text) == 1:
+            return text
+        return " ".join(self.chinese(character) for character in text)
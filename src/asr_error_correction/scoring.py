@@ -0,0 +1,208 @@
+"""Phonetically weighted substitution scores derived from panphon features."""
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import weakref
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .cache import LRUCache
+from .phonemes import SymbolTable
+
+if TYPE_CHECKING:
+    import panphon
+
+__all__ = ["DEFAULT_CACHE_DIR", "substitution_matrix", "table_matrix"]
+
+
+DEFAULT_CACHE_DIR = (
+    Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    / "asr_error_correction"
+)
+
+# Bumped whenever the scores computed for an inventory change.
+_FORMAT_VERSION = "2"
+
+# Weighted feature distance from which a substitution scores like an
+# unrelated mismatch (-1); vowel/consonant pairs lie around 0.35-0.4 while
+# voicing or place-of-articulation neighbours lie below 0.1.
+_DISSIMILAR_DISTANCE = 0.25
+
+_matrices = LRUCache(maxsize=8)
+_feature_table: Optional["panphon.FeatureTable"] = None
+# Feature vector of every symbol seen so far; NaN for symbols panphon lacks.
+_vectors: Dict[str, np.ndarray] = {}
+# Matrix of every symbol table, in table order, grown as the table grows.
+_table_matrices: "weakref.WeakKeyDictionary[SymbolTable, np.ndarray]" = (
+    weakref.WeakKeyDictionary()
+)
+_table_lock = threading.Lock()
+
+
+def _features() -> "panphon.FeatureTable":
+    global _feature_table
+    if _feature_table is None:
+        import panphon
+
+        _feature_table = panphon.FeatureTable()
+    return _feature_table
+
+
+def _inventory_key(inventory: Sequence[str]) -> str:
+    digest = hashlib.sha256(_FORMAT_VERSION.encode("utf-8"))
+    for symbol in inventory:
+        digest.update(symbol.encode("utf-8") + b"\0")
+    return digest.hexdigest()
+
+
+def _symbol_vectors(symbols: Sequence[str]) -> np.ndarray:
+    table = _features()
+    vectors = np.empty((len(symbols), len(table.names)))
+    for row, symbol in enumerate(symbols):
+        vector = _vectors.get(symbol)
+        if vector is None:
+            # A segment panphon splits further (e.g. an affricate) gets the
+            # mean of its parts; symbols without features (spaces, digits,
+            # stress) get NaN.
+            parts = table.word_to_vector_list(symbol, numeric=True)
+            vector = np.full(len(table.names), np.nan)
+            if parts:
+                vector = np.mean(parts, axis=0)
+            _vectors[symbol] = vector
+        vectors[row] = vector
+    return vectors
+
+
+def _pairwise(rows: np.ndarray, columns: np.ndarray) -> np.ndarray:
+    """Score every row vector against every column vector."""
+
+    table = _features()
+    count = len(table.names)
+    weights = np.asarray(table.weights, dtype=np.float64)
+    if weights.shape != (count,):
+        weights = np.ones(count)
+
+    difference = np.abs(rows[:, None, :] - columns[None, :, :])
+    # Features range over -1..1, so the weighted distance lies in 0..1.
+    distance = (difference * weights).sum(axis=2) / (2.0 * weights.sum())
+    scores = np.maximum(1.0 - 2.0 * distance / _DISSIMILAR_DISTANCE, -1.0)
+    known_rows = ~np.isnan(rows[:, 0])
+    known_columns = ~np.isnan(columns[:, 0])
+    scores[~(known_rows[:, None] & known_columns[None, :])] = -1.0
+    return scores
+
+
+def _compute(symbols: Sequence[str]) -> np.ndarray:
+    vectors = _symbol_vectors(symbols)
+    scores = _pairwise(vectors, vectors)
+    np.fill_diagonal(scores, 1.0)
+    return scores
+
+
+def substitution_matrix(
+    symbols: Sequence[str], cache_dir: Optional[Path | str] = DEFAULT_CACHE_DIR
+) -> np.ndarray:
+    """Return the ``len(symbols)`` square matrix of substitution scores.
+
+    Entry ``[a, b]`` scores aligning ``symbols[a]`` with ``symbols[b]``: 1 for
+    identical symbols, falling linearly with their weighted panphon feature
+    distance down to -1 for dissimilar ones. Symbols panphon does not know
+    only match themselves. This is the identity scorer's range, so gap
+    penalties keep their meaning.
+
+    Matrices are kept in memory and, unless ``cache_dir`` is ``None``, in an
+    ``.npy`` file named after a hash of the sorted inventory, so processes
+    that saw the same symbols in another order share it. Feature vectors
+    are computed once per symbol.
+    """
+
+    inventory = sorted(set(symbols))
+    matrix = _stored(inventory, cache_dir, lambda: _compute(inventory))
+    return _reorder(matrix, inventory, symbols)
+
+
+def _stored(
+    inventory: List[str],
+    cache_dir: Optional[Path | str],
+    compute: Callable[[], np.ndarray],
+) -> np.ndarray:
+    """Return the matrix of the sorted ``inventory`` from memory, disk or ``compute``."""
+
+    key = _inventory_key(inventory)
+    matrix = _matrices.get(key)
+    if matrix is None:
+        path = None if cache_dir is None else Path(cache_dir) / f"substitution-{key}.npy"
+        if path is not None and path.exists():
+            matrix = np.load(path)
+        else:
+            matrix = compute()
+            if path is not None:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                temporary_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+                with temporary_path.open("wb") as file:
+                    np.save(file, matrix)
+                os.replace(temporary_path, path)
+        matrix.setflags(write=False)
+        _matrices.put(key, matrix)
+    return matrix
+
+
+def _reorder(
+    matrix: np.ndarray, symbols: Sequence[str], order: Sequence[str]
+) -> np.ndarray:
+    """Return ``matrix``, whose rows follow ``symbols``, in the order ``order``."""
+
+    if list(order) == list(symbols):
+        return matrix
+    positions = {symbol: position for position, symbol in enumerate(symbols)}
+    rows = np.fromiter((positions[symbol] for symbol in order), np.intp, len(order))
+    reordered = matrix[np.ix_(rows, rows)]
+    reordered.setflags(write=False)
+    return reordered
+
+
+def table_matrix(
+    table: SymbolTable, cache_dir: Optional[Path | str] = DEFAULT_CACHE_DIR
+) -> np.ndarray:
+    """Return :func:`substitution_matrix` for every symbol of ``table``.
+
+    Tables only ever append symbols, so the matrix is memoized per table by
+    its size: the first call goes through :func:`substitution_matrix` and
+    its cache, later calls return the same matrix until the table grows.
+    The grown matrix is then looked up under the new inventory in the same
+    caches, and if it is missing only the rows and columns of new symbols
+    are computed before it is stored there.
+    """
+
+    matrix = _table_matrices.get(table)
+    size = len(table)
+    if matrix is not None and len(matrix) == size:
+        return matrix
+    with _table_lock:
+        matrix = _table_matrices.get(table)
+        symbols = table.symbols
+        if matrix is None:
+            matrix = substitution_matrix(symbols, cache_dir)
+        elif len(matrix) < len(symbols):
+            inventory = sorted(symbols)
+            previous = matrix
+
+            def grow() -> np.ndarray:
+                old = len(previous)
+                added = _pairwise(
+                    _symbol_vectors(symbols[old:]), _symbol_vectors(symbols)
+                )
+                added[:, old:][np.diag_indices(len(symbols) - old)] = 1.0
+                grown = np.empty((len(symbols), len(symbols)))
+                grown[:old, :old] = previous
+                grown[old:] = added
+                grown[:old, old:] = added[:, :old].T
+                return _reorder(grown, symbols, inventory)
+
+            matrix = _reorder(_stored(inventory, cache_dir, grow), inventory, symbols)
+        _table_matrices[table] = matrix
+    return matrix
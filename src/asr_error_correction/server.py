@@ -0,0 +1,448 @@
+"""Long-running conversion and alignment daemon with micro-batching.
+
+The server loads a lexicon once and keeps its converter and aligner caches
+warm across requests. Clients (see :mod:`asr_error_correction.client`)
+talk to it over a Unix domain socket or a localhost TCP port.
+
+Protocol: every message, in either direction, is a frame made of a 4-byte
+big-endian length followed by that many bytes of UTF-8 JSON. A request is
+``{"id": <int>, "op": <op>, "text": <str>}`` with ``op`` one of
+``"convert"``, ``"grapheme_phoneme"`` and ``"align"``; the response is
+``{"id": <int>, "result": ...}`` or ``{"id": <int>, "error": <str>}``.
+A connection may have any number of requests outstanding, and responses
+may arrive out of order.
+
+Requests from all connections are collected into micro-batches of up to
+``max_batch_size`` requests, waiting at most ``max_latency`` seconds after
+the first one arrived, and every batch goes through the batched
+conversion (:meth:`IPAConverter.convert_many` and friends) and alignment
+(``align_many``) paths.
+
+Run it with ``python -m asr_error_correction.server LEXICON --socket PATH``
+or ``--port PORT``. The command line daemon wraps its aligner in a
+:class:`~asr_error_correction.memo.CachedAlignment`, optionally backed by
+``--cache-dir``, and takes the converter options the lexicon was built
+with.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set, Tuple, Union
+
+from .alignment import LocalAlignment, local_align_sentence
+from .conversion import DEFAULT_CACHE_SIZE, GraphemePhoneme, IPAConverter
+from .lexicon import IPALexicon
+from .memo import DEFAULT_ALIGNMENT_CACHE_SIZE, CachedAlignment
+from .pronunciations import FrozenPronunciations
+
+__all__ = ["CorrectionServer", "ServerStats", "main"]
+
+
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_LATENCY = 0.005
+DEFAULT_HOST = "127.0.0.1"
+
+# Frames larger than this are rejected, and the connection dropped.
+MAX_FRAME_SIZE = 64 << 20
+
+_FRAME_HEADER = struct.Struct(">I")
+
+OPS = ("convert", "grapheme_phoneme", "align")
+
+# A Unix socket path or a ``(host, port)`` pair.
+Address = Union[str, Tuple[str, int]]
+
+
+def _encode_frame(payload: object) -> bytes:
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode(
+        "utf-8"
+    )
+    return _FRAME_HEADER.pack(len(body)) + body
+
+
+def _encode_alignments(
+    keys: Sequence[str],
+    sentence: GraphemePhoneme,
+    alignments: Sequence[Tuple[GraphemePhoneme, List[Tuple[float, GraphemePhoneme]]]],
+) -> dict:
+    # Only entries with hits are sent: a lexicon may have many thousands.
+    return {
+        "sentence": sentence.to_dict(),
+        "matches": [
+            [key, [[float(score), matched.to_dict()] for score, matched in hits]]
+            for key, (_, hits) in zip(keys, alignments)
+            if hits
+        ],
+    }
+
+
+class ServerStats(NamedTuple):
+    """Requests answered and batches run since the server started."""
+
+    requests: int
+    batches: int
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.requests / self.batches if self.batches else 0.0
+
+
+class _Request(NamedTuple):
+    op: str
+    text: str
+    arrived: float
+    future: "asyncio.Future[object]"
+
+
+class CorrectionServer:
+    """Serve conversion and alignment of a lexicon over a local socket.
+
+    ``aligner`` is used for ``"align"`` requests, which align the converted
+    transcript against every lexicon entry like :func:`local_align_sentence`
+    (an aligner with ``align_many``, such as a ``"numpy"``
+    :class:`LocalAlignment`, receives all entries at once). Batches run one
+    at a time on a dedicated thread, so the converter and aligner are never
+    used concurrently and the event loop keeps accepting requests.
+    """
+
+    def __init__(
+        self,
+        lexicon: IPALexicon,
+        aligner: Optional[Union[LocalAlignment, CachedAlignment]] = None,
+        *,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_latency: float = DEFAULT_MAX_LATENCY,
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be positive")
+        if max_latency < 0:
+            raise ValueError("max_latency must be non-negative")
+        self.lexicon = lexicon
+        self.aligner = aligner
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self._keys = list(lexicon.entries)
+        self._queries = [lexicon.entries[key] for key in self._keys]
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending: List[_Request] = []
+        self._servers: List[asyncio.AbstractServer] = []
+        self._writers: Set[asyncio.StreamWriter] = set()
+        self._batcher: Optional["asyncio.Task[None]"] = None
+        self._unix_path: Optional[str] = None
+        self._requests = 0
+        self._batches = 0
+
+    def stats(self) -> ServerStats:
+        return ServerStats(self._requests, self._batches)
+
+    async def __aenter__(self) -> "CorrectionServer":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
+    async def start(self, address: Address) -> Address:
+        """Listen on ``address`` and return it; a TCP port of 0 is resolved."""
+
+        # Created here so that they belong to the running loop.
+        self._arrived = asyncio.Event()
+        self._full = asyncio.Event()
+        self._batcher = asyncio.ensure_future(self._run_batches())
+        if isinstance(address, str):
+            server = await asyncio.start_unix_server(self._handle, path=address)
+            self._unix_path = address
+            bound: Address = address
+        else:
+            host, port = address
+            server = await asyncio.start_server(self._handle, host, port)
+            bound = server.sockets[0].getsockname()[:2]
+        self._servers.append(server)
+        return bound
+
+    async def serve_forever(self) -> None:
+        await asyncio.gather(*(server.serve_forever() for server in self._servers))
+
+    async def aclose(self) -> None:
+        """Stop listening, fail outstanding requests and release the thread."""
+
+        for server in self._servers:
+            server.close()
+        # Pooled clients keep their connections open.
+        for writer in list(self._writers):
+            writer.close()
+        for server in self._servers:
+            await server.wait_closed()
+        self._servers.clear()
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+            self._batcher = None
+        for request in self._pending:
+            request.future.cancel()
+        self._pending.clear()
+        if self._unix_path is not None:
+            try:
+                os.unlink(self._unix_path)
+            except FileNotFoundError:
+                pass
+            self._unix_path = None
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._executor.shutdown)
+
+    def _submit(self, op: str, text: str) -> "asyncio.Future[object]":
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(_Request(op, text, loop.time(), future))
+        self._arrived.set()
+        if len(self._pending) >= self.max_batch_size:
+            self._full.set()
+        return future
+
+    async def _run_batches(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._arrived.wait()
+            remaining = self._pending[0].arrived + self.max_latency - loop.time()
+            if len(self._pending) < self.max_batch_size and remaining > 0:
+                try:
+                    await asyncio.wait_for(self._full.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+            batch = self._pending[: self.max_batch_size]
+            del self._pending[: self.max_batch_size]
+            if not self._pending:
+                self._arrived.clear()
+            if len(self._pending) < self.max_batch_size:
+                self._full.clear()
+
+            batch = [request for request in batch if not request.future.done()]
+            if not batch:
+                continue
+            outcomes = await loop.run_in_executor(
+                self._executor,
+                self._process,
+                [(request.op, request.text) for request in batch],
+            )
+            self._requests += len(batch)
+            self._batches += 1
+            for request, (ok, value) in zip(batch, outcomes):
+                if request.future.done():
+                    continue
+                if ok:
+                    request.future.set_result(value)
+                else:
+                    request.future.set_exception(value)  # type: ignore[arg-type]
+
+    def _process(self, requests: Sequence[Tuple[str, str]]) -> List[Tuple[bool, object]]:
+        """Answer a batch, one batched call per operation."""
+
+        outcomes: List[Tuple[bool, object]] = [(False, None)] * len(requests)
+        by_op: Dict[str, List[int]] = {}
+        for position, (op, _) in enumerate(requests):
+            by_op.setdefault(op, []).append(position)
+        for op, positions in by_op.items():
+            texts = [requests[position][1] for position in positions]
+            try:
+                results = self._run_op(op, texts)
+            except Exception as error:  # reported to the clients
+                results = None
+                for position in positions:
+                    outcomes[position] = (False, error)
+            if results is not None:
+                for position, result in zip(positions, results):
+                    outcomes[position] = (True, result)
+        return outcomes
+
+    def _run_op(self, op: str, texts: List[str]) -> List[object]:
+        converter = self.lexicon.converter
+        if op == "convert":
+            return list(converter.convert_many(texts))
+        sentences = converter.convert_to_grapheme_phoneme_many(texts)
+        if op == "grapheme_phoneme":
+            return [sentence.to_dict() for sentence in sentences]
+        return [
+            _encode_alignments(
+                self._keys,
+                sentence,
+                local_align_sentence(sentence, self._queries, self.aligner),
+            )
+            for sentence in sentences
+        ]
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self._writers.add(writer)
+        responses: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue()
+        sender = asyncio.ensure_future(self._send(writer, responses))
+        answers: List["asyncio.Task[None]"] = []
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(_FRAME_HEADER.size)
+                except asyncio.IncompleteReadError:
+                    break
+                (size,) = _FRAME_HEADER.unpack(header)
+                if size > MAX_FRAME_SIZE:
+                    break
+                body = await reader.readexactly(size)
+                answers.append(
+                    asyncio.ensure_future(self._answer(body, responses))
+                )
+                answers = [task for task in answers if not task.done()]
+            if answers:
+                await asyncio.gather(*answers)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            for task in answers:
+                task.cancel()
+            await responses.put(None)
+            await sender
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _answer(
+        self, body: bytes, responses: "asyncio.Queue[Optional[bytes]]"
+    ) -> None:
+        request_id = None
+        try:
+            request = json.loads(body.decode("utf-8"))
+            request_id = request.get("id")
+            op, text = request.get("op"), request.get("text")
+            if op not in OPS:
+                raise ValueError(f"Unknown operation: {op!r}")
+            if not isinstance(text, str):
+                raise ValueError("text must be a string")
+            response = {"id": request_id, "result": await self._submit(op, text)}
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:  # reported to the client
+            response = {"id": request_id, "error": f"{type(error).__name__}: {error}"}
+        await responses.put(_encode_frame(response))
+
+    @staticmethod
+    async def _send(
+        writer: asyncio.StreamWriter, responses: "asyncio.Queue[Optional[bytes]]"
+    ) -> None:
+        while True:
+            frame = await responses.get()
+            if frame is None:
+                return
+            try:
+                writer.write(frame)
+                await writer.drain()
+            except ConnectionError:
+                return
+
+
+def _parse_args(argv: Optional[Sequence[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("lexicon", help="lexicon written by IPALexicon.save_to")
+    where = parser.add_mutually_exclusive_group(required=True)
+    where.add_argument("--socket", help="Unix domain socket path to listen on")
+    where.add_argument("--port", type=int, help="TCP port to listen on")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="TCP host (default: %(default)s)")
+    parser.add_argument(
+        "--engine",
+        choices=("lingpy", "numpy"),
+        default="numpy",
+        help="alignment engine (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="directory of an alignment cache shared with other processes",
+    )
+    parser.add_argument(
+        "--alignment-cache-size",
+        type=int,
+        default=DEFAULT_ALIGNMENT_CACHE_SIZE,
+        help="alignments kept in memory (default: %(default)s)",
+    )
+    converter = parser.add_argument_group(
+        "converter", "must match the options the lexicon was built with"
+    )
+    for flag in (
+        "--remove-tone-marks",
+        "--remove-stress-marks",
+        "--strip-whitespace",
+        "--remove-punctuation",
+    ):
+        converter.add_argument(flag, action="store_true")
+    converter.add_argument(
+        "--token-cache-size",
+        type=int,
+        default=DEFAULT_CACHE_SIZE,
+        help="converted tokens kept in memory (default: %(default)s)",
+    )
+    converter.add_argument(
+        "--pronunciations",
+        help="frozen pronunciation file to use instead of the IPA backends",
+    )
+    parser.add_argument(
+        "--max-batch-size", type=int, default=DEFAULT_MAX_BATCH_SIZE
+    )
+    parser.add_argument(
+        "--max-latency-ms",
+        type=float,
+        default=DEFAULT_MAX_LATENCY * 1000,
+        help="longest a request waits for its batch to fill (default: %(default)s)",
+    )
+    return parser.parse_args(argv)
+
+
+def _build_server(args: argparse.Namespace) -> CorrectionServer:
+    converter = IPAConverter(
+        remove_tone_marks=args.remove_tone_marks,
+        remove_stress_marks=args.remove_stress_marks,
+        strip_whitespace=args.strip_whitespace,
+        remove_punctuation=args.remove_punctuation,
+        cache_size=args.token_cache_size,
+        pronunciations=(
+            FrozenPronunciations(args.pronunciations) if args.pronunciations else None
+        ),
+    )
+    lexicon = IPALexicon(converter)
+    lexicon.load_from(args.lexicon)
+    aligner = CachedAlignment(
+        LocalAlignment(engine=args.engine),
+        maxsize=args.alignment_cache_size,
+        cache_dir=args.cache_dir,
+    )
+    return CorrectionServer(
+        lexicon,
+        aligner,
+        max_batch_size=args.max_batch_size,
+        max_latency=args.max_latency_ms / 1000,
+    )
+
+
+async def _serve(server: CorrectionServer, address: Address) -> None:
+    loop = asyncio.get_running_loop()
+    stopped = asyncio.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stopped.set)
+    async with server:
+        bound = await server.start(address)
+        print(f"Serving on {bound}", flush=True)
+        await stopped.wait()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = _parse_args(argv)
+    server = _build_server(args)
+    address: Address = args.socket if args.socket else (args.host, args.port)
+    asyncio.run(_serve(server, address))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""Incremental conversion and alignment of growing partial transcripts."""
+from __future__ import annotations
+
+import os
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .alignment import _project_hit
+from .conversion import _CHINESE_SEGMENT, GraphemePhoneme, IPAConverter, _Segment
+from .lexicon import IPALexicon
+from .overlap import (
+    DEFAULT_GOP,
+    DEFAULT_SCALE,
+    _GAP_IN_QUERY,
+    _GAP_IN_SENTENCE,
+    _MATCH,
+    OverlapHit,
+    _encode_queries,
+    _is_marker,
+    _traceback_spans,
+)
+
+__all__ = ["StreamingSession"]
+
+
+_Results = List[Tuple[GraphemePhoneme, List[Tuple[float, GraphemePhoneme]]]]
+
+
+def _common_prefix(a: str, b: str) -> int:
+    return len(os.path.commonprefix([a, b]))
+
+
+class StreamingSession:
+    """Convert and align successive partial hypotheses of one utterance.
+
+    Every :meth:`update` receives the whole current transcript. Only the
+    part after the prefix shared with the previous transcript is tokenized
+    and looked up again, and the overlap alignment DP (see
+    :mod:`asr_error_correction.overlap`) keeps one column per sentence
+    phoneme, so only the columns of changed phonemes are filled. The
+    results are identical to :func:`local_align_sentence` with a ``"numpy"``
+    :class:`LocalAlignment` on the from-scratch conversion.
+
+    ``queries`` defaults to every lexicon entry. Memory grows with
+    ``queries x longest query x sentence length``.
+    """
+
+    def __init__(
+        self,
+        lexicon: IPALexicon,
+        queries: Optional[Sequence[GraphemePhoneme]] = None,
+        *,
+        gop: float = DEFAULT_GOP,
+        scale: float = DEFAULT_SCALE,
+    ) -> None:
+        self.converter: IPAConverter = lexicon.converter
+        self.queries = list(lexicon.entries.values()) if queries is None else list(queries)
+        self.gop = gop
+        self.scale = scale
+
+        self._symbols: Dict[str, int] = {}
+        for query in self.queries:
+            for phoneme in query.phoneme_str:
+                self._symbols.setdefault(phoneme, len(self._symbols))
+        self._rows = [
+            position for position, query in enumerate(self.queries) if query.phoneme_str
+        ]
+        self._encoded = (
+            _encode_queries(
+                [self.queries[position].phoneme_str for position in self._rows],
+                self._symbols,
+                None,
+            )
+            if self._rows
+            else None
+        )
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the current utterance."""
+
+        self.sentence = self.converter.convert_to_grapheme_phoneme("")
+        self._segments: List[_Segment] = []
+        self._pieces: List[Tuple[int, int, str]] = []
+        self._columns = 0
+        if self._encoded is not None:
+            batch, width = self._encoded.codes.shape
+            self._values = np.zeros((16, batch, width + 1))
+            self._trace = np.zeros((16, batch, width + 1), dtype=np.int8)
+            rows = np.arange(width + 1)
+            self._last_row = rows[None, :] == self._encoded.lengths[:, None]
+
+    def update(self, text: str) -> _Results:
+        """Align the current transcript ``text`` against every query."""
+
+        sentence = self._convert(text)
+        self._extend(self.sentence.phoneme_str, sentence.phoneme_str)
+        self.sentence = sentence
+        return self._results()
+
+    def _convert(self, text: str) -> GraphemePhoneme:
+        common = _common_prefix(self.sentence.grapheme_str, text)
+
+        # A token ending before the shared prefix does is followed by an
+        # unchanged character, so it is tokenized the same way again.
+        keep = bisect_left([end for _, _, end in self._segments], common)
+        restart = self._segments[keep - 1][2] if keep else 0
+        segments = self._segments[:keep]
+        if keep < len(self._segments):
+            kind, start, _ = self._segments[keep]
+            if kind == _CHINESE_SEGMENT and start < common:
+                # Chinese pieces are looked up character by character.
+                segments.append((kind, start, common))
+                restart = common
+
+        tail = self.converter._segments(text, restart)
+        self._segments = segments + tail
+        kept = bisect_right([end for _, end, _ in self._pieces], restart)
+        pieces: List[Tuple[int, int, str]] = []
+        self.converter._render(text, tail, self.converter._lookup, False, pieces)
+        self._pieces[kept:] = pieces
+        return GraphemePhoneme._from_pieces(text, self._pieces)
+
+    def _extend(self, previous: str, phonemes: str) -> None:
+        if self._encoded is None:
+            return
+        m = len(phonemes)
+        if m + 1 > len(self._values):
+            capacity = max(m + 1, 2 * len(self._values))
+            for name in ("_values", "_trace"):
+                old = getattr(self, name)
+                grown = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+                grown[: len(old)] = old
+                setattr(self, name, grown)
+
+        # Column j only depends on the first j phonemes, except for the
+        # final column, which is filled separately and never kept.
+        valid = min(self._columns, _common_prefix(previous, phonemes) + 1, m)
+        if valid == 0:
+            self._values[0] = 0.0
+            self._trace[0] = _GAP_IN_QUERY
+            self._trace[0, :, 0] = _MATCH
+            valid = 1
+        for column in range(valid, m):
+            self._fill_column(column, phonemes[column - 1], last=False)
+        self._columns = max(valid, m)
+        if m:
+            self._fill_column(m, phonemes[m - 1], last=True)
+
+    def _fill_column(self, column: int, phoneme: str, last: bool) -> None:
+        """Fill sentence column ``column`` for every query.
+
+        This is the recurrence of :func:`asr_error_correction.overlap._fill`
+        taken column by column: the diagonal and horizontal candidates come
+        from the previous column, the vertical one from the cell above.
+        """
+
+        extend = self.gop * self.scale
+        gop = self.gop
+        previous_values = self._values[column - 1]
+        previous_trace = self._trace[column - 1]
+        values = self._values[column]
+        trace = self._trace[column]
+        values[:, 0] = 0.0
+        trace[:, 0] = _GAP_IN_SENTENCE
+
+        code = self._symbols.get(phoneme, -2)
+        match = previous_values[:, :-1] + np.where(
+            self._encoded.codes == code, 1.0, -1.0
+        )
+        left = previous_values[:, 1:]
+        gap_b = np.where(
+            # The last query row: trailing sentence segments are free.
+            self._last_row[:, 1:],
+            left,
+            left + np.where(previous_trace[:, 1:] == _GAP_IN_SENTENCE, extend, gop),
+        )
+        for row in range(1, values.shape[1]):
+            up = values[:, row - 1]
+            if last:
+                # The last sentence column: trailing query segments are free.
+                gap_a = up
+            else:
+                gap_a = up + np.where(trace[:, row - 1] == _GAP_IN_QUERY, extend, gop)
+            diagonal = match[:, row - 1]
+            horizontal = gap_b[:, row - 1]
+            take_a = (gap_a > diagonal) & (gap_a >= horizontal)
+            take_match = diagonal >= horizontal
+            values[:, row] = np.where(
+                take_a, gap_a, np.where(take_match, diagonal, horizontal)
+            )
+            trace[:, row] = np.where(
+                take_a, _GAP_IN_QUERY, np.where(take_match, _MATCH, _GAP_IN_SENTENCE)
+            )
+
+    def _results(self) -> _Results:
+        results: _Results = [(query, []) for query in self.queries]
+        phonemes = self.sentence.phoneme_str
+        m = len(phonemes)
+        if self._encoded is None or m == 0:
+            return results
+
+        lengths = self._encoded.lengths
+        final = self._values[m, np.arange(len(lengths)), lengths]
+        markers = np.fromiter((_is_marker(p) for p in phonemes), bool, m)
+        found, starts, ends = _traceback_spans(
+            self._trace[: m + 1],
+            self._encoded,
+            markers,
+            np.ones(m, dtype=np.intp),
+            skewed=False,
+        )
+        for row, position in enumerate(self._rows):
+            if found[row]:
+                hit = OverlapHit(float(final[row]), int(starts[row]), int(ends[row]))
+                results[position] = (
+                    self.queries[position],
+                    _project_hit(self.sentence, hit),
+                )
+        return results
@@ -0,0 +1,326 @@
+"""Align a sentence against a whole lexicon through a shared-prefix trie."""
+from __future__ import annotations
+
+from typing import Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .alignment import _project_hit
+from .conversion import GraphemePhoneme
+from .overlap import (
+    DEFAULT_GOP,
+    DEFAULT_SCALE,
+    _GAP_IN_QUERY,
+    _GAP_IN_SENTENCE,
+    _MATCH,
+    OverlapHit,
+    _is_marker,
+)
+
+__all__ = ["PhonemeTrie"]
+
+
+# Upper bound on the DP cells of one frontier chunk.
+_MAX_CHUNK_CELLS = 2_000_000
+_MATCH_SCORE = 1.0
+_MISMATCH_SCORE = -1.0
+
+_Results = List[Tuple[GraphemePhoneme, List[Tuple[float, GraphemePhoneme]]]]
+
+
+class PhonemeTrie:
+    """Lexicon entries compiled into a trie over their phoneme strings.
+
+    Every trie node corresponds to one row of the overlap alignment DP (see
+    :mod:`asr_error_correction.overlap`): a row only depends on the row of
+    the parent node and on the node's phoneme, so entries sharing a prefix
+    share the rows of that prefix. Rows are computed level by level, one
+    vectorised update per sentence column for a whole chunk of sibling
+    nodes.
+    """
+
+    def __init__(self, entries: Mapping[str, GraphemePhoneme]) -> None:
+        self.entries = entries
+        self._keys: List[str] = list(entries)
+        self._phonemes: List[str] = []
+        symbols: Dict[str, int] = {}
+        root: Dict[str, dict] = {}
+        terminal_of: Dict[int, List[int]] = {}
+        nested_terminals: List[Tuple[dict, int]] = []
+        for position, key in enumerate(self._keys):
+            phonemes = entries[key].phoneme_str
+            self._phonemes.append(phonemes)
+            if not phonemes:
+                continue
+            node = root
+            for phoneme in phonemes:
+                symbols.setdefault(phoneme, len(symbols))
+                node = node.setdefault(phoneme, {})
+            nested_terminals.append((node, position))
+
+        # Number the nodes breadth first so that siblings are contiguous.
+        codes: List[int] = [-1]
+        depths: List[int] = [0]
+        child_start: List[int] = []
+        child_end: List[int] = []
+        ids = {id(root): 0}
+        queue = [root]
+        for node in queue:
+            child_start.append(len(codes))
+            for phoneme, child in node.items():
+                ids[id(child)] = len(codes)
+                codes.append(symbols[phoneme])
+                depths.append(depths[ids[id(node)]] + 1)
+                queue.append(child)
+            child_end.append(len(codes))
+        for node, position in nested_terminals:
+            terminal_of.setdefault(ids[id(node)], []).append(position)
+
+        self._symbols = symbols
+        self._markers = np.fromiter(
+            (_is_marker(phoneme) for phoneme in symbols), bool, len(symbols)
+        )
+        self._codes = np.asarray(codes, dtype=np.intp)
+        self._depths = np.asarray(depths, dtype=np.intp)
+        self._child_start = np.asarray(child_start, dtype=np.intp)
+        self._child_end = np.asarray(child_end, dtype=np.intp)
+        self._terminals = terminal_of
+        is_terminal = np.zeros(len(codes), dtype=bool)
+        is_terminal[list(terminal_of)] = True
+        self._is_terminal = is_terminal
+
+        # Deepest terminal below every node, for the pruning bound.
+        deepest = np.where(is_terminal, self._depths, 0)
+        for node in range(len(codes) - 1, -1, -1):
+            start, end = child_start[node], child_end[node]
+            if end > start:
+                deepest[node] = max(deepest[node], deepest[start:end].max())
+        self._deepest = deepest
+
+    def __len__(self) -> int:
+        return len(self._codes) - 1
+
+    def align(
+        self,
+        sentence: GraphemePhoneme,
+        min_score: Optional[float] = None,
+    ) -> _Results:
+        """Align ``sentence`` against every entry, like :func:`local_align_sentence`.
+
+        Scores and matched spans are both read from the trie rows: every
+        cell carries the first paired sentence segment and the paired length
+        of the path that reaches it, so no entry is aligned again. Without
+        ``min_score`` the result equals ``local_align_sentence`` with a
+        ``"numpy"`` :class:`LocalAlignment` over all entries, in lexicon
+        order. With ``min_score`` only entries scoring at least that much are
+        returned, and trie branches that cannot reach it are never expanded.
+        """
+
+        return [
+            (self.entries[key], hits) for key, hits in self._align_keys(sentence, min_score)
+        ]
+
+    def _align_keys(
+        self, sentence: GraphemePhoneme, min_score: Optional[float]
+    ) -> List[Tuple[str, List[Tuple[float, GraphemePhoneme]]]]:
+        """:meth:`align`, with the key of every entry instead of the entry."""
+
+        scores, hits = self._walk(sentence, min_score, DEFAULT_GOP, DEFAULT_SCALE)
+        results: List[Tuple[str, List[Tuple[float, GraphemePhoneme]]]] = []
+        for position, key in enumerate(self._keys):
+            score = scores[position]
+            if min_score is not None and (score is None or score < min_score):
+                continue
+            results.append((key, _project_hit(sentence, hits[position])))
+        return results
+
+    def scores(
+        self,
+        sentence: GraphemePhoneme,
+        min_score: Optional[float] = None,
+        *,
+        gop: float = DEFAULT_GOP,
+        scale: float = DEFAULT_SCALE,
+    ) -> List[Optional[float]]:
+        """Return the overlap alignment score of every entry, in lexicon order.
+
+        Entries with an empty phoneme string, or pruned because they cannot
+        reach ``min_score``, are reported as ``None``.
+        """
+
+        return self._walk(sentence, min_score, gop, scale)[0]
+
+    def _walk(
+        self,
+        sentence: GraphemePhoneme,
+        min_score: Optional[float],
+        gop: float,
+        scale: float,
+    ) -> Tuple[List[Optional[float]], List[Optional[OverlapHit]]]:
+        scores: List[Optional[float]] = [None] * len(self._keys)
+        hits: List[Optional[OverlapHit]] = [None] * len(self._keys)
+        m = len(sentence.phoneme_str)
+        if m == 0 or len(self._codes) == 1:
+            return scores, hits
+
+        sentence_codes = np.fromiter(
+            (self._symbols.get(phoneme, -2) for phoneme in sentence.phoneme_str),
+            np.intp,
+            m,
+        )
+        sentence_markers = np.fromiter(
+            (_is_marker(phoneme) for phoneme in sentence.phoneme_str), bool, m
+        )
+        # Same span conventions as ``overlap._traceback_spans``.
+        offsets = np.concatenate(([0], np.cumsum(~sentence_markers)[:-1]))
+        extend = gop * scale
+        chunk_size = max(1, _MAX_CHUNK_CELLS // (m + 1))
+
+        root_trace = np.full((1, m + 1), _GAP_IN_SENTENCE, dtype=np.int8)
+        root_trace[0, 0] = _MATCH
+        root_state = _PathState(
+            np.full((1, m + 1), -1, dtype=np.intp), np.zeros((1, m + 1), dtype=np.intp)
+        )
+        stack = [(np.zeros(1, dtype=np.intp), np.zeros((1, m + 1)), root_trace, root_state)]
+        while stack:
+            parents, parent_values, parent_trace, parent_state = stack.pop()
+            starts = self._child_start[parents]
+            counts = self._child_end[parents] - starts
+            if not counts.any():
+                continue
+            owner = np.repeat(np.arange(len(parents)), counts)
+            children = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(
+                counts.sum()
+            )
+
+            up = parent_values[owner]
+            gap_a = up + np.where(parent_trace[owner] == _GAP_IN_QUERY, extend, gop)
+            # The last sentence column: trailing query segments are free.
+            gap_a[:, m] = up[:, m]
+            codes = self._codes[children]
+            match = np.empty_like(up)
+            match[:, 1:] = up[:, :-1] + np.where(
+                codes[:, None] == sentence_codes[None, :],
+                _MATCH_SCORE,
+                _MISMATCH_SCORE,
+            )
+
+            # Path state of the candidates coming from the parent row; a
+            # diagonal step pairs the node's phoneme with a sentence segment.
+            state_a = _PathState(parent_state.first[owner], parent_state.paired[owner])
+            counted = ~self._markers[codes][:, None] & ~sentence_markers[None, :]
+            previous_first = state_a.first[:, :-1]
+            first_match = np.empty_like(state_a.first)
+            first_match[:, 1:] = np.where(
+                counted & (previous_first < 0), np.arange(m)[None, :], previous_first
+            )
+            paired_match = np.empty_like(state_a.paired)
+            paired_match[:, 1:] = state_a.paired[:, :-1] + counted
+            state_match = _PathState(first_match, paired_match)
+
+            terminal = self._is_terminal[children]
+            if terminal.any():
+                final, _, final_state = _fill_row(
+                    gap_a[terminal],
+                    match[terminal],
+                    state_a.select(terminal),
+                    state_match.select(terminal),
+                    extend,
+                    gop,
+                    True,
+                )
+                for row, node in enumerate(children[terminal]):
+                    score = float(final[row, m])
+                    first = int(final_state.first[row, m])
+                    hit = None
+                    if first >= 0:
+                        start = int(offsets[first])
+                        hit = OverlapHit(score, start, start + int(final_state.paired[row, m]))
+                    for position in self._terminals[int(node)]:
+                        scores[position] = score
+                        hits[position] = hit
+
+            values, trace, state = _fill_row(
+                gap_a, match, state_a, state_match, extend, gop, False
+            )
+            expandable = self._deepest[children] > self._depths[children]
+            if min_score is not None:
+                remaining = self._deepest[children] - self._depths[children]
+                bound = values.max(axis=1) + remaining * max(_MATCH_SCORE, 0.0)
+                expandable &= bound >= min_score
+            keep = np.flatnonzero(expandable)
+            for offset in range(0, len(keep), chunk_size):
+                selected = keep[offset : offset + chunk_size]
+                stack.append(
+                    (children[selected], values[selected], trace[selected], state.select(selected))
+                )
+        return scores, hits
+
+
+class _PathState(NamedTuple):
+    """Per-cell summary of the traceback path reaching every DP cell.
+
+    ``first`` is the first sentence segment paired with a query segment
+    (``-1`` before any) and ``paired`` the number of paired segments.
+    """
+
+    first: np.ndarray
+    paired: np.ndarray
+
+    def select(self, rows: np.ndarray) -> "_PathState":
+        return _PathState(self.first[rows], self.paired[rows])
+
+
+def _fill_row(
+    gap_a: np.ndarray,
+    match: np.ndarray,
+    state_a: _PathState,
+    state_match: _PathState,
+    extend: float,
+    gop: float,
+    last_row: bool,
+) -> Tuple[np.ndarray, np.ndarray, _PathState]:
+    """Resolve the horizontal gap recurrence of one DP row for many nodes.
+
+    ``gap_a`` and ``match`` hold the candidates coming from the parent row,
+    with the path states they extend; the candidate from the left depends
+    on the cell just computed, so the row is swept column by column,
+    vectorised over the nodes. On an entry's ``last_row`` trailing sentence
+    segments are free.
+    """
+
+    count, width = gap_a.shape
+    values = np.zeros((count, width))
+    trace = np.empty((count, width), dtype=np.int8)
+    trace[:, 0] = _GAP_IN_QUERY
+    first = np.empty((count, width), dtype=np.intp)
+    paired = np.empty((count, width), dtype=np.intp)
+    first[:, 0] = state_a.first[:, 0]
+    paired[:, 0] = state_a.paired[:, 0]
+    for column in range(1, width):
+        left = values[:, column - 1]
+        if last_row:
+            gap_b = left
+        else:
+            gap_b = left + np.where(
+                trace[:, column - 1] == _GAP_IN_SENTENCE, extend, gop
+            )
+        a = gap_a[:, column]
+        diagonal = match[:, column]
+        take_a = (a > diagonal) & (a >= gap_b)
+        take_match = diagonal >= gap_b
+        values[:, column] = np.where(take_a, a, np.where(take_match, diagonal, gap_b))
+        trace[:, column] = np.where(
+            take_a, _GAP_IN_QUERY, np.where(take_match, _MATCH, _GAP_IN_SENTENCE)
+        )
+        first[:, column] = np.where(
+            take_a,
+            state_a.first[:, column],
+            np.where(take_match, state_match.first[:, column], first[:, column - 1]),
+        )
+        paired[:, column] = np.where(
+            take_a,
+            state_a.paired[:, column],
+            np.where(take_match, state_match.paired[:, column], paired[:, column - 1]),
+        )
+    return values, trace, _PathState(first, paired)
@@ -0,0 +1,37 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = PROJECT_ROOT / "src"
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+if str(SRC_ROOT) not in sys.path:
+    sys.path.insert(0, str(SRC_ROOT))
+
+import pytest
+
+import asr_error_correction.conversion as conversion
+
+
+@pytest.fixture()
+def patch_backends(monkeypatch):
+    """Return a function replacing the English and Chinese IPA backends."""
+
+    def patch(english, chinese):
+        monkeypatch.setattr(conversion, "eng_to_ipa_convert", english)
+        monkeypatch.setattr(
+            conversion, "eng_to_ipa_list", lambda words: [[english(word)] for word in words]
+        )
+        monkeypatch.setattr(conversion, "hanzi_to_ipa", chinese)
+
+    return patch
+
+
+@pytest.fixture(autouse=True)
+def patch_converters(patch_backends):
+    """Lower-case English tokens and keep Chinese text as is.
+
+    Test modules needing other pronunciations override this fixture.
+    """
+
+    patch_backends(str.lower, lambda text: text)
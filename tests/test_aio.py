@@ -0,0 +1,94 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from asr_error_correction import (
+    AsyncAligner,
+    IPAConverter,
+    IPALexicon,
+    LocalAlignment,
+    local_align_sentence,
+)
+
+
+TRANSCRIPTS = ["say hello world", "help me", "hello hello", "nothing here"]
+
+
+def _lexicon() -> IPALexicon:
+    lexicon = IPALexicon(IPAConverter())
+    lexicon.add_phrases(["hello", "world", "help"])
+    return lexicon
+
+
+def _expected(lexicon: IPALexicon, aligner: LocalAlignment):
+    queries = list(lexicon.entries.values())
+    results = []
+    for text in TRANSCRIPTS:
+        sentence = lexicon.converter.convert_to_grapheme_phoneme(text)
+        results.append((sentence, local_align_sentence(sentence, queries, aligner)))
+    return results
+
+
+async def _source(texts, pulled):
+    for text in texts:
+        pulled.append(text)
+        yield text
+        await asyncio.sleep(0)
+
+
+async def _collect(corrector: AsyncAligner, pulled):
+    results = []
+    async with corrector:
+        async for result in corrector.align_stream(_source(TRANSCRIPTS, pulled)):
+            # The source is never more than the window ahead of the consumer.
+            assert len(pulled) - len(results) <= corrector.max_in_flight
+            results.append(result)
+    return results
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_align_stream_yields_results_in_order(executor):
+    lexicon = _lexicon()
+    aligner = LocalAlignment(engine="numpy")
+    corrector = AsyncAligner(
+        lexicon,
+        aligner,
+        executor=executor,
+        workers=2,
+        max_in_flight=2,
+        mp_context=multiprocessing.get_context("fork"),
+    )
+
+    results = asyncio.run(_collect(corrector, []))
+
+    assert results == _expected(lexicon, aligner)
+
+
+def test_align_uses_a_caller_provided_executor():
+    lexicon = _lexicon()
+    aligner = LocalAlignment(engine="numpy")
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        corrector = AsyncAligner(lexicon, aligner, executor=executor)
+        result = asyncio.run(corrector.align(TRANSCRIPTS[0]))
+        asyncio.run(corrector.aclose())
+        # The executor still accepts work after aclose().
+        assert executor.submit(len, "abc").result() == 3
+
+    assert result == _expected(lexicon, aligner)[0]
+    with pytest.raises(ValueError):
+        AsyncAligner(lexicon, executor="fiber")
+
+
+def test_caller_provided_process_pools_are_rejected():
+    lexicon = _lexicon()
+
+    with ProcessPoolExecutor(
+        max_workers=1, mp_context=multiprocessing.get_context("fork")
+    ) as executor:
+        with pytest.raises(ValueError, match="executor='process'"):
+            AsyncAligner(lexicon, executor=executor)
+        # Nothing was submitted on the caller's behalf.
+        assert executor.submit(len, "abc").result() == 3
@@ -0,0 +1,61 @@
+from asr_error_correction import (
+    GraphemePhoneme,
+    LocalAlignment,
+    ThresholdedAlignment,
+    approximate_search,
+    local_align_sentence,
+)
+
+
+def _edit_distance_ends(text, pattern, max_errors):
+    previous = list(range(len(pattern) + 1))
+    ends = []
+    for position, symbol in enumerate(text):
+        current = [0]
+        for i in range(1, len(pattern) + 1):
+            current.append(
+                min(
+                    previous[i] + 1,
+                    current[i - 1] + 1,
+                    previous[i - 1] + (pattern[i - 1] != symbol),
+                )
+            )
+        previous = current
+        if current[-1] <= max_errors:
+            ends.append((position + 1, current[-1]))
+    return ends
+
+
+def test_approximate_search_matches_edit_distance_dp():
+    text = "nixɑʊhɛloʊwərldxɑʊhɑloʊ"
+    for pattern in ["xɑʊhɑloʊ", "hɛlo", "wrld", "zzzz", "ʊ" * 70]:
+        for max_errors in range(3):
+            found = approximate_search(text, pattern, max_errors)
+            assert [tuple(match) for match in found] == _edit_distance_ends(text, pattern, max_errors)
+
+
+def test_thresholded_alignment_only_aligns_passing_queries():
+    sentence = GraphemePhoneme.from_components(
+        "你好 hello", ["你", "好", "hello"], "nixɑʊhɛloʊ", ["ni", "xɑʊ", "hɛloʊ"]
+    )
+    close = GraphemePhoneme.from_components("哈喽", ["哈", "喽"], "hɑloʊ", ["hɑ", "loʊ"])
+    far = GraphemePhoneme.from_components("世界", ["世", "界"], "ʂɨtɕjɛ", ["ʂɨ", "tɕjɛ"])
+
+    class RecordingAligner(LocalAlignment):
+        def __init__(self):
+            super().__init__()
+            self.calls = []
+
+        def align(self, sentence, query):
+            self.calls.append(query)
+            return super().align(sentence, query)
+
+    inner = RecordingAligner()
+    aligner = ThresholdedAlignment(max_errors=1, aligner=inner)
+
+    results = local_align_sentence(sentence, [close, far], aligner)
+
+    assert inner.calls == [close]
+    assert results[1] == (far, [])
+    assert results[0][1] == LocalAlignment().align(sentence, close)
+    assert aligner.search(sentence, close)[0].distance == 1
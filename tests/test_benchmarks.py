@@ -0,0 +1,45 @@
+import json
+
+from benchmarks import run_benchmarks
+import asr_error_correction.conversion as conversion
+
+
+def test_corpus_generator_is_seeded_and_distinct():
+    first = run_benchmarks.CorpusGenerator(seed=3)
+    second = run_benchmarks.CorpusGenerator(seed=3)
+
+    phrases = first.phrases(500)
+
+    assert phrases == second.phrases(500)
+    assert len(set(phrases)) == 500
+    assert first.sentences(5) == second.sentences(5)
+
+
+def test_stub_benchmark_writes_comparable_json(tmp_path):
+    hanzi_to_ipa = conversion.hanzi_to_ipa
+    output = tmp_path / "results.json"
+
+    run_benchmarks.main(
+        [
+            "--sizes", "50", "--sentences", "5", "--queries", "10",
+            "--repeat", "2", "--engines", "numpy", "--output", str(output),
+        ]
+    )
+
+    assert conversion.hanzi_to_ipa is hanzi_to_ipa
+    report = json.loads(output.read_text(encoding="utf-8"))
+    assert report["metadata"]["backend"] == "stub"
+    names = [result["name"] for result in report["results"]]
+    assert names == [
+        "IPAConverter.convert",
+        "IPAConverter.convert_to_grapheme_phoneme",
+        "IPALexicon.add_phrases",
+        "IPALexicon.save_to",
+        "IPALexicon.load_from",
+        "IPALexicon.save_to",
+        "IPALexicon.load_from",
+        "local_align_sentence",
+    ]
+    for result in report["results"]:
+        assert result["p50_latency"] <= result["p99_latency"]
+        assert result["peak_rss_bytes"] > 0
@@ -0,0 +1,85 @@
+import pickle
+from pathlib import Path
+
+import pytest
+
+from asr_error_correction import IPAConverter, IPALexicon
+from asr_error_correction.binary import MappedEntries
+
+
+@pytest.fixture(autouse=True)
+def patch_converters(patch_backends):
+    patch_backends(lambda token: f"en({token})", lambda text: f"zh({text})")
+
+
+PHRASES = ["Hello", "世界", "你好 NASA!", "iPhone 手机", "Zoë"]
+
+
+def test_binary_lexicon_roundtrip_matches_json(tmp_path: Path):
+    lexicon = IPALexicon(IPAConverter())
+    lexicon.add_phrases(PHRASES)
+    lexicon.save_to(tmp_path / "lexicon.bin", binary=True)
+    lexicon.save_to(tmp_path / "lexicon.json")
+
+    mapped = IPALexicon()
+    mapped.load_from(tmp_path / "lexicon.bin")
+    from_json = IPALexicon()
+    from_json.load_from(tmp_path / "lexicon.json")
+
+    assert isinstance(mapped.entries, MappedEntries)
+    assert list(mapped.entries) == PHRASES
+    assert dict(mapped.entries) == from_json.entries == lexicon.entries
+    assert "missing" not in mapped.entries
+
+    mapped.save_to(tmp_path / "export.json")
+    assert (tmp_path / "export.json").read_text(encoding="utf-8") == (
+        tmp_path / "lexicon.json"
+    ).read_text(encoding="utf-8")
+
+
+def test_mapped_entries_overlay_changes_and_survive_pickling(tmp_path: Path):
+    lexicon = IPALexicon(IPAConverter())
+    lexicon.add_phrases(PHRASES[:3])
+    path = tmp_path / "lexicon.bin"
+    lexicon.save_to(path, binary=True)
+
+    lexicon.load_from(path)
+    lexicon.add_phrases(["world", "Hello"])
+    del lexicon.entries["世界"]
+
+    expected = ["Hello", "你好 NASA!", "world"]
+    assert list(lexicon.entries) == expected
+    assert len(lexicon.entries) == 3
+    assert list(pickle.loads(pickle.dumps(lexicon.entries))) == expected
+
+    lexicon.save_to(path, binary=True)
+    reloaded = IPALexicon()
+    reloaded.load_from(path)
+    assert dict(reloaded.entries) == dict(lexicon.entries)
+
+
+def test_mappings_are_released_on_close_and_reload(tmp_path: Path):
+    lexicon = IPALexicon(IPAConverter())
+    lexicon.add_phrases(PHRASES)
+    lexicon.save_to(tmp_path / "lexicon.bin", binary=True)
+    lexicon.save_to(tmp_path / "lexicon.json")
+
+    with MappedEntries(tmp_path / "lexicon.bin") as entries:
+        assert entries["Hello"] == lexicon.entries["Hello"]
+    assert entries.closed
+    with pytest.raises(ValueError):
+        entries["Hello"]
+    entries.close()
+
+    mapped = IPALexicon()
+    mapped.load_from(tmp_path / "lexicon.bin")
+    first = mapped.entries
+    mapped.load_from(tmp_path / "lexicon.bin")
+    assert first.closed and not mapped.entries.closed
+    mapped.load_from(tmp_path / "lexicon.json")
+    assert dict(mapped.entries) == lexicon.entries
+
+    mapped.load_from(tmp_path / "lexicon.bin")
+    last = mapped.entries
+    mapped.close()
+    assert last.closed
@@ -0,0 +1,81 @@
+import multiprocessing
+
+from asr_error_correction import (
+    IPAConverter,
+    IPALexicon,
+    LocalAlignment,
+    align_corpus,
+    local_align_sentence,
+)
+
+
+TRANSCRIPTS = [
+    "say hello world",
+    "help me",
+    "hello hello",
+    "nothing here",
+    "world help",
+]
+
+
+def _lexicon() -> IPALexicon:
+    lexicon = IPALexicon(IPAConverter())
+    lexicon.add_phrases(["hello", "world", "help", "hell"])
+    return lexicon
+
+
+def _expected(lexicon, aligner):
+    queries = list(lexicon.entries.values())
+    expected = []
+    for text in TRANSCRIPTS:
+        sentence = lexicon.converter.convert_to_grapheme_phoneme(text)
+        expected.append((sentence, local_align_sentence(sentence, queries, aligner)))
+    return expected
+
+
+def test_align_corpus_in_process_matches_local_align_sentence():
+    lexicon = _lexicon()
+    aligner = LocalAlignment(engine="numpy")
+
+    results = list(align_corpus(iter(TRANSCRIPTS), lexicon, aligner, chunk_size=2))
+
+    assert results == _expected(lexicon, aligner)
+
+
+def test_align_corpus_with_forked_workers_keeps_order():
+    lexicon = _lexicon()
+    aligner = LocalAlignment(engine="numpy")
+
+    results = list(
+        align_corpus(
+            TRANSCRIPTS,
+            lexicon,
+            aligner,
+            workers=2,
+            chunk_size=1,
+            mp_context=multiprocessing.get_context("fork"),
+        )
+    )
+
+    assert results == _expected(lexicon, aligner)
+
+
+def test_align_corpus_shares_a_mapped_lexicon_with_spawned_workers():
+    lexicon = _lexicon()
+    aligner = LocalAlignment(engine="numpy")
+    # Spawned workers do not inherit the patched backends, so hand them
+    # converted sentences.
+    sentences = lexicon.converter.convert_to_grapheme_phoneme_many(TRANSCRIPTS)
+
+    results = list(
+        align_corpus(
+            sentences,
+            lexicon,
+            aligner,
+            workers=2,
+            chunk_size=2,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    )
+
+    assert results == _expected(lexicon, aligner)
@@ -0,0 +1,85 @@
+import pytest
+
+from asr_error_correction import (
+    CachedAlignment,
+    IPAConverter,
+    IPALexicon,
+    LocalAlignment,
+    correct,
+)
+from asr_error_correction.correction import Edit, _Candidate, _select
+
+PINYIN = {
+    "订": "tiŋ",
+    "定": "tiŋ",
+    "票": "pʰiao",
+    "飘": "pʰiao",
+    "我": "wo",
+    "想": "ɕiaŋ",
+    "一": "i",
+    "张": "tʂaŋ",
+    "章": "tʂaŋ",
+}
+
+
+@pytest.fixture(autouse=True)
+def patch_converters(patch_backends):
+    patch_backends(
+        str.lower, lambda text: "".join(PINYIN.get(character, "x") for character in text)
+    )
+
+
+def _lexicon() -> IPALexicon:
+    lexicon = IPALexicon(IPAConverter())
+    lexicon.add_phrases(["订票", "hello world", "一张", "张票"])
+    return lexicon
+
+
+def test_correct_rewrites_transcripts_and_logs_edits():
+    texts = ["我想定飘 hello word", "nothing to see", ""]
+
+    corrections = correct(texts, _lexicon())
+
+    assert [correction.corrected for correction in corrections] == [
+        "我想订票 hello world",
+        "nothing to see",
+        "",
+    ]
+    assert corrections[0].edits == [
+        Edit(2, 4, "定飘", "订票", 8.0, "订票"),
+        Edit(5, 15, "hello word", "hello world", 8.0, "hello world"),
+    ]
+    assert corrections[1].edits == []
+
+
+def test_overlapping_candidates_keep_the_best_span():
+    (correction,) = correct(["一章飘"], _lexicon())
+
+    assert correction.corrected == "一张票"
+    assert [edit.key for edit in correction.edits] == ["张票"]
+
+    chosen = _select(
+        [
+            _Candidate(5.0, 0, 2, 0),
+            _Candidate(9.0, 1, 3, 1),
+            _Candidate(5.0, 3, 5, 2),
+            _Candidate(5.0, 3, 6, 3),
+        ]
+    )
+    assert chosen == [_Candidate(9.0, 1, 3, 1), _Candidate(5.0, 3, 6, 3)]
+
+
+def test_correct_matches_across_batch_sizes_and_aligners():
+    lexicon = _lexicon()
+    texts = ["我想定飘", "一章飘 hello word", "hello world", "张飘"] * 3
+
+    expected = correct(texts, lexicon)
+
+    assert correct(texts, lexicon, batch_size=1) == expected
+    assert correct(texts, lexicon, LocalAlignment()) == expected
+    cached = CachedAlignment(LocalAlignment(engine="numpy"))
+    assert correct(texts, lexicon, cached) == expected
+    assert cached.cache_info().hits > 0
+    # Spans that already read like the entry are not edits.
+    assert expected[2].edits == []
+    assert correct(texts, lexicon, min_ratio=2.0)[0].edits == []
@@ -0,0 +1,122 @@
+import random
+
+import pytest
+
+from asr_error_correction import (
+    GraphemePhoneme,
+    IPAConverter,
+    IPALexicon,
+    LocalAlignment,
+    local_align_sentence,
+)
+from asr_error_correction.exact import PhonemeAutomaton
+
+PINYIN = {"订": "tiŋ", "定": "tiŋ", "票": "pʰiao", "飘": "pʰiao", "我": "wo", "一": "i"}
+
+
+@pytest.fixture(autouse=True)
+def patch_converters(patch_backends):
+    patch_backends(
+        str.lower, lambda text: "".join(PINYIN.get(character, "x") for character in text)
+    )
+
+
+def _entries(phonemes):
+    return {
+        value: GraphemePhoneme.from_components(value, [value], value, [value])
+        for value in phonemes
+    }
+
+
+def test_find_reports_every_occurrence():
+    rng = random.Random(3)
+    patterns = ["".join(rng.choice("ab") for _ in range(rng.randint(1, 5))) for _ in range(40)]
+    automaton = PhonemeAutomaton(_entries(patterns))
+    text = "".join(rng.choice("abc") for _ in range(300))
+
+    found = sorted(
+        (start, end, key)
+        for start, end, keys in automaton.find(text)
+        for key in keys
+    )
+    expected = sorted(
+        (start, start + len(pattern), pattern)
+        for pattern in set(patterns)
+        for start in range(len(text) - len(pattern) + 1)
+        if text.startswith(pattern, start)
+    )
+
+    assert found == expected
+
+
+def test_lexicon_exact_matches_map_homophones_and_report_gaps():
+    converter = IPAConverter()
+    lexicon = IPALexicon(converter)
+    lexicon.add_phrases(["订票", "hello", "lo"])
+    sentence = converter.convert_to_grapheme_phoneme("我定飘 hello there")
+
+    result = lexicon.exact_matches(sentence)
+
+    assert [(match.key, match.matched.grapheme_str) for match in result.matches] == [
+        ("订票", "定飘"),
+        ("hello", "hello"),
+        ("lo", "hello"),
+    ]
+    assert result.uncovered == [(0, 2), (15, 20)]
+    assert sentence.phoneme_str[15:20] == "there"
+
+    whole = lexicon.exact_matches(sentence, whole_tokens=True)
+    assert [match.key for match in whole.matches] == ["订票", "hello"]
+
+    lexicon.add_phrases(["there"])
+    assert lexicon.exact_matches(sentence).uncovered == [(0, 2)]
+
+
+def test_align_sentence_only_aligns_uncovered_regions():
+    converter = IPAConverter()
+    lexicon = IPALexicon(converter)
+    lexicon.add_phrases(["订票", "help", "ther"])
+    automaton = PhonemeAutomaton(lexicon.entries)
+    sentence = converter.convert_to_grapheme_phoneme("我定飘 hello theirs")
+    aligner = LocalAlignment(engine="numpy")
+
+    results = automaton.align_sentence(sentence, aligner)
+
+    assert [query for query, _ in results] == list(lexicon.entries.values())
+    assert results[0][1] == [
+        (8.0, converter.convert_to_grapheme_phoneme("定飘")),
+    ]
+    region = sentence.subsequence_covering_span(0, 2)
+    assert region.grapheme_str == "我"
+    expected = [
+        hits
+        for _, hits in local_align_sentence(
+            sentence.subsequence_covering_span(10, len(sentence.phoneme_str)),
+            list(lexicon.entries.values())[1:],
+            aligner,
+        )
+    ]
+    assert automaton.match(sentence).uncovered == [(0, 2), (10, 21)]
+    for (_, hits), tail_hits in zip(results[1:], expected):
+        assert len(hits) <= 1
+        assert [hit for hit in hits if hit[1].grapheme_str != "我"] == tail_hits
+
+
+def test_align_sentence_scores_exact_hits_like_the_aligner():
+    converter = IPAConverter()
+    lexicon = IPALexicon(converter)
+    lexicon.add_phrases(["tsar", "hello"])
+    automaton = PhonemeAutomaton(lexicon.entries)
+    sentence = converter.convert_to_grapheme_phoneme("hello tsar hello")
+    aligner = LocalAlignment(engine="numpy", segmented=True)
+
+    results = automaton.align_sentence(sentence, aligner)
+
+    expected = local_align_sentence(sentence, list(lexicon.entries.values()), aligner)
+    assert [[score for score, _ in hits] for _, hits in results] == [[3.0], [5.0]]
+    assert [[score for score, _ in hits] for _, hits in expected] == [[3.0], [5.0]]
+    # One hit per entry, although "hello" occurs twice.
+    assert results[1][1][0][1].grapheme_str == "hello"
+
+    strict = LocalAlignment(engine="numpy", segmented=True, min_score=4.0)
+    assert [hits for _, hits in automaton.align_sentence(sentence, strict)][0] == []
@@ -0,0 +1,97 @@
+from pathlib import Path
+
+import pytest
+
+from asr_error_correction import IPAConverter, IPALexicon
+from asr_error_correction.index import PhonemeNGramIndex
+
+
+PRONUNCIATIONS = {
+    "Hello": "hɛloʊ",
+    "world": "wərld",
+    "yellow": "jɛloʊ",
+    "ok": "oʊ",
+    "我": "wɔ",
+    "想": "ɕjɑŋ",
+}
+
+
+@pytest.fixture(autouse=True)
+def patch_converters(patch_backends):
+    patch_backends(PRONUNCIATIONS.get, PRONUNCIATIONS.get)
+
+
+def _lexicon() -> IPALexicon:
+    lexicon = IPALexicon(IPAConverter())
+    lexicon.add_phrases(["Hello", "world", "yellow", "ok", "我想"])
+    return lexicon
+
+
+def test_candidates_prefilter_entries_by_shared_ngrams():
+    lexicon = _lexicon()
+    sentence = lexicon.converter.convert_to_grapheme_phoneme("yellow ok")
+
+    candidates = lexicon.candidates(sentence, min_shared=2)
+
+    assert [entry.grapheme_str for entry in candidates] == ["yellow", "ok", "Hello"]
+    assert lexicon.candidates(sentence, top_k=1, min_shared=2)[0].grapheme_str == "yellow"
+
+
+def test_index_tracks_new_phrases_and_is_saved_with_the_lexicon(tmp_path: Path):
+    lexicon = _lexicon()
+    lexicon.build_index(n=3)
+    lexicon.add_phrases(["我"])
+    sentence = lexicon.converter.convert_to_grapheme_phoneme("我")
+
+    assert [entry.grapheme_str for entry in lexicon.candidates(sentence)] == ["我"]
+
+    output_file = tmp_path / "lexicon.json"
+    lexicon.save_to(output_file)
+    loaded = IPALexicon(lexicon.converter)
+    loaded.load_from(output_file)
+
+    assert (tmp_path / "lexicon.json.ngram.json").exists()
+    assert loaded.index is not None and loaded.index.n == 3
+    assert loaded.candidates(sentence) == lexicon.candidates(sentence)
+
+
+def test_index_sidecar_follows_its_own_lexicon_file(tmp_path: Path):
+    lexicon = _lexicon()
+    lexicon.build_index()
+    lexicon.save_to(tmp_path / "lex.json")
+    lexicon.save_to(tmp_path / "lex.bin", binary=True)
+    assert (tmp_path / "lex.json.ngram.json").exists()
+    assert (tmp_path / "lex.bin.ngram.json").exists()
+
+    unindexed = IPALexicon(lexicon.converter)
+    unindexed.add_phrases(["ok"])
+    unindexed.save_to(tmp_path / "lex.json")
+    assert not (tmp_path / "lex.json.ngram.json").exists()
+
+    unindexed.load_from(tmp_path / "lex.json")
+    assert unindexed.index is None
+    binary = IPALexicon(lexicon.converter)
+    binary.load_from(tmp_path / "lex.bin")
+    assert binary.index is not None and len(binary.index) == len(lexicon.entries)
+
+
+def test_index_load_rejects_postings_for_other_entries(tmp_path: Path):
+    lexicon = _lexicon()
+    index = lexicon.build_index()
+    index.save_to(tmp_path / "index.json", list(lexicon.entries))
+
+    with pytest.raises(ValueError):
+        PhonemeNGramIndex.load_from(tmp_path / "index.json", {"ok": lexicon.entries["ok"]})
+
+
+def test_index_reports_recall_and_speedup():
+    lexicon = _lexicon()
+    index = PhonemeNGramIndex.build(lexicon.entries, n=2)
+    convert = lexicon.converter.convert_to_grapheme_phoneme
+    held_out = [(convert("yellow"), "Hello"), (convert("world"), "world")]
+
+    report = index.evaluate(held_out, top_k=1, min_shared=2)
+
+    assert report.recall == pytest.approx(0.5)
+    assert report.mean_candidates == pytest.approx(1.0)
+    assert report.speedup == pytest.approx(5.0)
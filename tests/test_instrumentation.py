@@ -0,0 +1,91 @@
+import pytest
+
+from asr_error_correction import (
+    IPAConverter,
+    IPALexicon,
+    LocalAlignment,
+    local_align_sentence,
+)
+from asr_error_correction.instrumentation import (
+    INSTRUMENTATION,
+    LATENCY_BUCKETS,
+    Instrumentation,
+)
+
+
+@pytest.fixture(autouse=True)
+def patch_converters(patch_backends):
+    patch_backends(str.lower, lambda text: "x")
+
+
+@pytest.fixture
+def instrumentation():
+    INSTRUMENTATION.reset()
+    yield INSTRUMENTATION
+    INSTRUMENTATION.disable()
+    INSTRUMENTATION.reset()
+
+
+def test_disabled_instrumentation_records_nothing(instrumentation):
+    converter = IPAConverter()
+    lexicon = IPALexicon(converter)
+    lexicon.add_phrases(["hello"])
+    local_align_sentence(
+        converter.convert_to_grapheme_phoneme("say hello"),
+        list(lexicon.entries.values()),
+        LocalAlignment(engine="numpy"),
+    )
+
+    snapshot = instrumentation.snapshot()
+    assert snapshot.stages == {}
+    assert snapshot.counters == {}
+
+
+def test_instrumentation_times_every_stage(instrumentation, tmp_path):
+    observed = []
+    instrumentation.enable(lambda stage, seconds: observed.append(stage))
+    converter = IPAConverter()
+    lexicon = IPALexicon(converter)
+    lexicon.add_phrases(["hello", "世界"])
+    lexicon.save_to(tmp_path / "lexicon.json")
+    lexicon.load_from(tmp_path / "lexicon.json")
+    sentence = converter.convert_to_grapheme_phoneme("say hello 世界 NASA")
+    queries = list(lexicon.entries.values())
+    local_align_sentence(sentence, queries, LocalAlignment(engine="numpy"))
+    local_align_sentence(sentence, queries, LocalAlignment())
+
+    snapshot = instrumentation.snapshot()
+    assert set(snapshot.stages) == {
+        "converter.tokenize",
+        "converter.sanitize",
+        "converter.lookup.en",
+        "converter.lookup.zh",
+        "lexicon.build",
+        "lexicon.load",
+        "alignment.dp",
+        "alignment.extract_span",
+        "alignment.subsequence",
+    }
+    assert snapshot.stages["lexicon.load"].count == 1
+    # One batched numpy pass, then one lingpy call per query.
+    assert snapshot.stages["alignment.dp"].count == 3
+    assert snapshot.counters == {"alignment.pairs": 4}
+    assert len(observed) == sum(stats.count for stats in snapshot.stages.values())
+
+
+def test_stage_histogram_and_quantiles():
+    instrumentation = Instrumentation()
+    instrumentation.enable()
+    for seconds in [1e-6] * 98 + [0.5, 2.0]:
+        instrumentation.record("stage", seconds)
+
+    stats = instrumentation.snapshot().stages["stage"]
+
+    assert stats.count == 100
+    assert sum(stats.buckets) == 100
+    assert len(stats.buckets) == len(LATENCY_BUCKETS) + 1
+    assert stats.min == 1e-6 and stats.max == 2.0
+    assert stats.quantile(0.5) == pytest.approx(1e-6)
+    assert 0.5 <= stats.quantile(0.99) < 1.0
+    assert stats.quantile(1.0) == 2.0
+    assert stats.mean == pytest.approx((98e-6 + 2.5) / 100)
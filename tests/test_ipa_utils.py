@@ -1,12 +1,7 @@
-import sys
 from pathlib import Path
 
-PROJECT_ROOT = Path(__file__).resolve().parents[1]
-SRC_ROOT = PROJECT_ROOT / "src"
-if str(PROJECT_ROOT) not in sys.path:
-    sys.path.insert(0, str(PROJECT_ROOT))
-if str(SRC_ROOT) not in sys.path:
-    sys.path.insert(0, str(SRC_ROOT))
+import multiprocessing
+import pickle
 
 import pytest
 
@@ -22,9 +17,8 @@ import asr_error_correction.alignment as alignment
 
 
 @pytest.fixture(autouse=True)
-def patch_converters(monkeypatch):
-    monkeypatch.setattr(conversion, "eng_to_ipa_convert", lambda token: f"en({token})")
-    monkeypatch.setattr(conversion, "hanzi_to_ipa", lambda text: f"zh({text})")
+def patch_converters(patch_backends):
+    patch_backends(lambda token: f"en({token})", lambda text: f"zh({text})")
 
 
 def test_ipa_converter_handles_mixed_languages():
@@ -57,6 +51,99 @@ def test_ipa_converter_can_remove_punctuation():
     assert converter.convert(text) == "en(Hello) zh(世界) en(N) en(A) en(S) en(A)"
 
 
+def test_ipa_converter_caches_token_lookups(monkeypatch):
+    calls = []
+
+    def fake_eng_to_ipa(token):
+        calls.append(token)
+        return f"en({token})"
+
+    monkeypatch.setattr(conversion, "eng_to_ipa_convert", fake_eng_to_ipa)
+    converter = IPAConverter()
+
+    first = converter.convert("Hello NASA hello")
+    second = converter.convert("Hello NASA")
+
+    assert first == "en(Hello) en(N) en(A) en(S) en(A) en(hello)"
+    assert second == "en(Hello) en(N) en(A) en(S) en(A)"
+    assert calls == ["Hello", "N", "A", "S", "hello"]
+    info = converter.cache_info()
+    assert info.hits == 3
+    assert info.evictions == 0
+
+
+def test_ipa_converter_cache_is_bounded_and_keyed_on_markers(monkeypatch):
+    monkeypatch.setattr(conversion, "eng_to_ipa_convert", lambda token: "ˈɛn")
+    converter = IPAConverter(cache_size=2)
+
+    assert converter.convert("a b c") == "ˈɛn ˈɛn ˈɛn"
+    assert converter.cache_info().evictions == 1
+    assert converter.cache_info().currsize == 2
+
+    converter.remove_stress_marks = True
+    assert converter.convert("c") == "ɛn"
+
+    uncached = IPAConverter(cache_size=0)
+    uncached.convert("a a")
+    assert uncached.cache_info().hits == 0
+    assert uncached.cache_info().currsize == 0
+
+
+def test_convert_many_matches_single_item_conversion(monkeypatch):
+    bulk_calls = []
+
+    def fake_eng_to_ipa_list(words):
+        bulk_calls.append(list(words))
+        return [[f"en({word})"] for word in words]
+
+    monkeypatch.setattr(conversion, "eng_to_ipa_list", fake_eng_to_ipa_list)
+    texts = ["Hello 世界 NASA!", "", "hello NASA， 世界", "Hello 你好"]
+
+    expected = [IPAConverter(remove_punctuation=True).convert(text) for text in texts]
+    converter = IPAConverter(remove_punctuation=True)
+
+    assert converter.convert_many(texts) == expected
+    assert bulk_calls == [["Hello", "hello"], ["N", "A", "S"]]
+
+
+def test_convert_to_grapheme_phoneme_many_matches_single_item_conversion():
+    texts = ["你好 Hello 世界!", "NASA 你好", "world"]
+    converter = IPAConverter(cache_size=0)
+
+    expected = [converter.convert_to_grapheme_phoneme(text) for text in texts]
+
+    assert converter.convert_to_grapheme_phoneme_many(texts) == expected
+
+
+def test_convert_with_grapheme_phoneme_shares_one_pass(monkeypatch):
+    calls = []
+
+    def fake_eng_to_ipa(token):
+        calls.append(token)
+        return f"ˈen({token})"
+
+    monkeypatch.setattr(conversion, "eng_to_ipa_convert", fake_eng_to_ipa)
+    monkeypatch.setattr(
+        conversion, "eng_to_ipa_list", lambda words: [[f"ˈen({word})"] for word in words]
+    )
+    texts = ["你好 Hello， 世界!", "NASA café", "\t\u3000"]
+    options = {"remove_punctuation": True, "strip_whitespace": True}
+    separate = IPAConverter(**options)
+    expected = [
+        (separate.convert(text), separate.convert_to_grapheme_phoneme(text))
+        for text in texts
+    ]
+    calls.clear()
+    converter = IPAConverter(cache_size=0, **options)
+
+    assert [converter.convert_with_grapheme_phoneme(text) for text in texts] == expected
+    # Without a cache, every English token still reaches the backend only once.
+    assert calls == ["Hello", "N", "A", "S", "A", "caf", "é"]
+    assert IPAConverter(**options).convert_with_grapheme_phoneme_many(texts) == expected
+    assert expected[1][0] == "ˈen(N)ˈen(A)ˈen(S)ˈen(A)ˈen(caf)ˈen(é)"
+    assert expected[1][1].grapheme_list == ("NASA", "caf", "é")
+
+
 def test_ipalexicon_save_and_load_roundtrip(tmp_path: Path):
     converter = IPAConverter()
     lexicon = IPALexicon(converter)
@@ -87,6 +174,59 @@ def test_converter_builds_grapheme_phoneme_structure():
     assert gp.phoneme_str == "zh你zh好enHellozh世zh界"
 
 
+def test_grapheme_phoneme_is_compact_immutable_and_sliceable():
+    gp = GraphemePhoneme.from_components(
+        "你好 hello", ["你", "好", "hello"], "nixɑʊhɛloʊ", ["ni", "xɑʊ", "hɛloʊ"]
+    )
+
+    assert not hasattr(gp, "__dict__")
+    with pytest.raises(AttributeError):
+        gp.phoneme_str = "x"
+    assert gp.grapheme_spans == ((0, 1), (1, 2), (3, 8))
+    assert gp.phoneme_spans == ((0, 2), (2, 5), (5, 10))
+    assert GraphemePhoneme(
+        gp.grapheme_str,
+        gp.grapheme_list,
+        gp.phoneme_str,
+        gp.phoneme_list,
+        gp.grapheme_spans,
+        gp.phoneme_spans,
+    ) == gp
+    assert pickle.loads(pickle.dumps(gp)) == gp
+    assert GraphemePhoneme.from_dict(gp.to_dict()) == gp
+
+    sub = gp.subsequence_covering_span(3, 6)
+    assert sub.grapheme_list == ("好", "hello")
+    assert sub.grapheme_spans == ((0, 1), (2, 7))
+    assert sub.phoneme_spans == ((0, 3), (3, 8))
+    assert gp.subsequence_covering_span(10, 12) is None
+    start, end = gp.grapheme_span_covering(3, 6)
+    assert gp.grapheme_str[start:end] == sub.grapheme_str
+    assert gp.grapheme_span_covering(10, 12) is None
+    with pytest.raises(ValueError):
+        GraphemePhoneme("ab", ("a",), "x", ("x",), ((1, 2),), ((0, 1),))
+
+
+def test_ipalexicon_add_phrases_in_parallel_preserves_order():
+    phrases = ["Hello", "世界", None, "NASA 你好", "Hello", "world"]
+    serial = IPALexicon(IPAConverter(remove_tone_marks=True))
+    serial.add_phrases(phrases)
+
+    reported = []
+    parallel = IPALexicon(IPAConverter(remove_tone_marks=True))
+    parallel.add_phrases(
+        phrases,
+        workers=2,
+        chunk_size=2,
+        progress=reported.append,
+        mp_context=multiprocessing.get_context("fork"),
+    )
+
+    assert list(parallel.entries) == list(serial.entries)
+    assert parallel.entries == serial.entries
+    assert reported == [2, 4, 5]
+
+
 def _build_sentence_and_query() -> tuple[GraphemePhoneme, GraphemePhoneme]:
     sentence = GraphemePhoneme.from_components(
         "你好 hello world",
@@ -0,0 +1,199 @@
+import threading
+
+import pytest
+
+from asr_error_correction import IPAConverter, IPALexicon, LiveLexicon, correct
+
+
+def _lexicon() -> IPALexicon:
+    lexicon = IPALexicon(IPAConverter())
+    lexicon.add_phrases(["hello", "world", "help"])
+    lexicon.build_index()
+    return lexicon
+
+
+def test_published_snapshots_never_change():
+    lexicon = _lexicon()
+    live = LiveLexicon(lexicon)
+    first = live.snapshot()
+
+    live.add_phrases(["goodbye", "hello"])
+    live.remove_phrases(["world", "missing"])
+    assert live.snapshot() is first
+
+    second = live.publish()
+    assert live.version == 1
+    assert list(first.entries) == ["hello", "world", "help"]
+    assert list(second.entries) == ["hello", "help", "goodbye"]
+    assert len(second.entries) == 3
+    assert "world" not in second.entries
+    assert second.entries["goodbye"] == lexicon.converter.convert_to_grapheme_phoneme(
+        "goodbye"
+    )
+    assert live.publish() is second
+
+    live.remove_phrases(["goodbye"])
+    live.add_phrases(["world"])
+    third = live.publish()
+    assert dict(third.entries) == {
+        key: lexicon.converter.convert_to_grapheme_phoneme(key)
+        for key in ["hello", "world", "help"]
+    }
+    assert [correction.corrected for correction in correct(["say goodby"], second)] == [
+        "say goodbye"
+    ]
+    assert correct(["say goodby"], third)[0].edits == []
+
+
+def test_index_is_updated_in_place_and_viewed_per_snapshot():
+    lexicon = _lexicon()
+    index = lexicon.index
+    live = LiveLexicon(lexicon)
+    sentence = lexicon.converter.convert_to_grapheme_phoneme("hello there")
+    before = live.snapshot()
+
+    live.add_phrases(["there"])
+    live.remove_phrases(["hello"])
+    after = live.publish()
+
+    assert live._index is index
+    assert [entry.grapheme_str for entry in before.candidates(sentence)] == [
+        "hello",
+        "help",
+    ]
+    assert [entry.grapheme_str for entry in after.candidates(sentence)] == [
+        "there",
+        "help",
+    ]
+
+
+def test_change_log_lets_other_processes_catch_up(tmp_path):
+    log_path = tmp_path / "changes.jsonl"
+    writer = LiveLexicon(_lexicon(), log_path=log_path)
+    writer.add_phrases(["goodbye"])
+    writer.remove_phrases(["world"])
+    writer.publish()
+
+    reader = LiveLexicon(_lexicon(), log_path=log_path)
+    assert reader.version == 1
+    assert list(reader.snapshot().entries) == list(writer.snapshot().entries)
+    assert not reader.refresh()
+
+    writer.add_phrases(["world"])
+    writer.publish()
+    with log_path.open("a", encoding="utf-8") as file:
+        file.write('{"version": 3, "key": "par')
+    assert reader.refresh()
+    assert reader.version == 2
+    assert dict(reader.snapshot().entries) == dict(writer.snapshot().entries)
+    assert not reader.refresh()
+
+
+def test_readers_iterate_snapshots_while_writer_publishes():
+    live = LiveLexicon(_lexicon())
+    errors = []
+    done = threading.Event()
+
+    def read():
+        while not done.is_set():
+            snapshot = live.snapshot()
+            keys = list(snapshot.entries)
+            if len(keys) != len(snapshot.entries) or any(
+                snapshot.entries[key] is None for key in keys
+            ):
+                errors.append(keys)
+
+    thread = threading.Thread(target=read)
+    thread.start()
+    try:
+        for round_ in range(50):
+            live.add_phrases([f"word{round_}"])
+            live.remove_phrases([f"word{round_ - 1}", "help"])
+            live.publish()
+    finally:
+        done.set()
+        thread.join()
+
+    assert errors == []
+    assert list(live.snapshot().entries) == ["hello", "world", "word49"]
+
+
+def test_snapshots_reject_modification():
+    snapshot = LiveLexicon(_lexicon()).snapshot()
+
+    with pytest.raises(TypeError):
+        snapshot.add_phrases(["goodbye"])
+    with pytest.raises(TypeError):
+        snapshot.index.add("goodbye", snapshot.entries["hello"])
+    assert list(snapshot.entries) == ["hello", "world", "help"]
+
+
+def test_log_only_applies_whole_versions(tmp_path):
+    log_path = tmp_path / "changes.jsonl"
+    writer = LiveLexicon(_lexicon(), log_path=log_path)
+    writer.add_phrases(["goodbye", "there"])
+    writer.remove_phrases(["world"])
+    writer.publish()
+    data = log_path.read_bytes()
+    assert data.count(b"\n") == 1
+
+    # A reader catching the append halfway through sees none of it.
+    log_path.write_bytes(data[: len(data) // 2])
+    reader = LiveLexicon(_lexicon(), log_path=log_path)
+    assert reader.version == 0
+    assert list(reader.snapshot().entries) == ["hello", "world", "help"]
+
+    log_path.write_bytes(data)
+    assert reader.refresh()
+    assert dict(reader.snapshot().entries) == dict(writer.snapshot().entries)
+
+
+def test_index_is_compacted_under_churn():
+    lexicon = _lexicon()
+    live = LiveLexicon(lexicon)
+    sentence = lexicon.converter.convert_to_grapheme_phoneme("word999 hello")
+    for round_ in range(1000):
+        live.add_phrases([f"word{round_}"])
+        live.remove_phrases([f"word{round_ - 1}"])
+        live.publish()
+
+    assert len(lexicon.index) == 4
+    assert len(lexicon.index._keys) <= 4 + 2 * 256
+    candidates = [entry.grapheme_str for entry in live.snapshot().candidates(sentence)]
+    assert "word999" in candidates and "word998" not in candidates
+
+
+def test_trie_and_automaton_are_maintained_across_publishes():
+    lexicon = _lexicon()
+    lexicon.add_phrases([f"base{number}" for number in range(300)])
+    live = LiveLexicon(lexicon)
+    sentence = lexicon.converter.convert_to_grapheme_phoneme("say hello there")
+    live.snapshot().align_sentence(sentence)
+    live.snapshot().exact_matches(sentence)
+    base_trie = live._layers["trie"][0].structure
+
+    snapshots = []
+    for round_ in range(20):
+        live.add_phrases([f"there{round_}", "there"])
+        live.remove_phrases([f"there{round_ - 1}", "help"])
+        snapshots.append(live.publish())
+    live.add_phrases(["help"])
+    snapshots.append(live.publish())
+
+    assert live._layers["trie"][0].structure is base_trie
+    assert len(live._layers["trie"]) > 1
+    for snapshot in [snapshots[0], snapshots[-1]]:
+        fresh = IPALexicon(lexicon.converter)
+        fresh.entries = dict(snapshot.entries)
+        assert sorted(
+            (entry.grapheme_str, hits) for entry, hits in snapshot.align_sentence(sentence)
+        ) == sorted(
+            (entry.grapheme_str, hits) for entry, hits in fresh.align_sentence(sentence)
+        )
+        assert sorted(snapshot.exact_matches(sentence).matches) == sorted(
+            fresh.exact_matches(sentence).matches
+        )
+        assert (
+            snapshot.exact_matches(sentence).uncovered
+            == fresh.exact_matches(sentence).uncovered
+        )
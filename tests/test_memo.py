@@ -0,0 +1,140 @@
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from asr_error_correction import (
+    CachedAlignment,
+    IPAConverter,
+    LocalAlignment,
+    local_align_sentence,
+)
+
+
+@pytest.fixture()
+def converter():
+    return IPAConverter()
+
+
+def _convert(converter, texts):
+    return [converter.convert_to_grapheme_phoneme(text) for text in texts]
+
+
+@pytest.mark.parametrize(
+    "aligner",
+    [
+        LocalAlignment(),
+        LocalAlignment(engine="numpy"),
+        LocalAlignment(engine="numpy", max_hits=3, min_score=2),
+    ],
+)
+def test_cached_alignment_matches_uncached(converter, aligner):
+    sentences = _convert(converter, ["say hello world", "hello hello", "nothing"])
+    queries = _convert(converter, ["hello", "world", "help"])
+    cached = CachedAlignment(aligner)
+
+    for _ in range(2):
+        for sentence in sentences:
+            assert local_align_sentence(sentence, queries, cached) == (
+                local_align_sentence(sentence, queries, aligner)
+            )
+            assert cached.align(sentence, queries[0]) == aligner.align(
+                sentence, queries[0]
+            )
+
+    info = cached.cache_info()
+    assert info.currsize == len(sentences) * len(queries)
+    assert info.misses == info.currsize
+    assert info.hits == 2 * len(sentences) * (len(queries) + 1) - info.misses
+
+
+def test_cached_hits_are_projected_onto_the_callers_sentence(converter):
+    aligner = LocalAlignment(engine="numpy")
+    cached = CachedAlignment(aligner)
+    query = converter.convert_to_grapheme_phoneme("world")
+    first = converter.convert_to_grapheme_phoneme("hello world")
+    second = converter.convert_to_grapheme_phoneme("Hello World")
+    assert first.phoneme_str == second.phoneme_str
+
+    cached.align(first, query)
+    result = cached.align(second, query)
+
+    assert cached.cache_info().hits == 1
+    assert result == aligner.align(second, query)
+    assert result[0][1].grapheme_str == "World"
+
+
+def test_cache_is_bounded_and_keyed_on_configuration(converter):
+    sentence = converter.convert_to_grapheme_phoneme("say hello world")
+    queries = _convert(converter, ["hello", "world", "help"])
+    cached = CachedAlignment(LocalAlignment(engine="numpy"), maxsize=2)
+
+    cached.align_many(sentence, queries)
+    info = cached.cache_info()
+    assert (info.currsize, info.evictions) == (2, 1)
+    assert info.hit_rate == 0.0
+
+    other = CachedAlignment(LocalAlignment(engine="numpy", segmented=True))
+    assert other._key(other._units(sentence), queries[0]) != cached._key(
+        cached._units(sentence), queries[0]
+    )
+
+
+def test_disk_cache_is_shared_between_instances(converter, tmp_path):
+    aligner = LocalAlignment(engine="numpy", max_hits=2)
+    sentence = converter.convert_to_grapheme_phoneme("hello say hello")
+    queries = _convert(converter, ["hello", "say", "zzz"])
+    expected = aligner.align_many(sentence, queries)
+
+    writer = CachedAlignment(aligner, cache_dir=tmp_path)
+    assert writer.align_many(sentence, queries) == expected
+
+    reader = pickle.loads(pickle.dumps(writer))
+    assert reader.cache_info().currsize == 0
+    assert reader.align_many(sentence, queries) == expected
+    info = reader.cache_info()
+    assert (info.misses, info.disk_hits) == (3, 3)
+    assert info.hit_rate == 1.0
+    assert (tmp_path / "alignments.sqlite").exists()
+
+
+def test_disk_hits_are_counted_across_threads(converter, tmp_path):
+    sentence = converter.convert_to_grapheme_phoneme("hello say hello")
+    queries = _convert(converter, ["hello", "say", "zzz"])
+    CachedAlignment(LocalAlignment(engine="numpy"), cache_dir=tmp_path).align_many(
+        sentence, queries
+    )
+    # Without a memory cache every lookup goes to disk.
+    reader = CachedAlignment(LocalAlignment(engine="numpy"), maxsize=0, cache_dir=tmp_path)
+
+    def read(_):
+        for _ in range(50):
+            reader.align_many(sentence, queries)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(read, range(8)))
+
+    assert reader.cache_info().disk_hits == 8 * 50 * 3
+    reader.cache_clear()
+    assert reader.cache_info().disk_hits == 0
+
+
+def test_repeated_queries_are_aligned_once_per_call(converter, tmp_path, monkeypatch):
+    aligner = LocalAlignment(engine="numpy")
+    sentence = converter.convert_to_grapheme_phoneme("say hello world")
+    queries = _convert(converter, ["hello", "world", "hello", "hello"])
+    cached = CachedAlignment(aligner, cache_dir=tmp_path)
+    aligned = []
+    hits_many = aligner.hits_many
+
+    def counting_hits_many(sentence, queries):
+        aligned.extend(query.phoneme_str for query in queries)
+        return hits_many(sentence, queries)
+
+    monkeypatch.setattr(aligner, "hits_many", counting_hits_many)
+
+    assert cached.align_many(sentence, queries) == [
+        aligner.align(sentence, query) for query in queries
+    ]
+    assert aligned == ["hello", "world"]
+    assert cached.cache_info().currsize == 2
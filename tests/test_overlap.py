@@ -0,0 +1,141 @@
+import random
+
+import pytest
+from lingpy.align import pw_align
+
+from asr_error_correction import GraphemePhoneme, LocalAlignment, local_align_sentence
+from asr_error_correction.alignment import _extract_matched_span
+from asr_error_correction.overlap import (
+    overlap_align,
+    overlap_align_many,
+    overlap_hits_many,
+)
+
+
+def _reference_pairs(count: int = 300, seed: int = 7):
+    rng = random.Random(seed)
+    alphabet = "aeiouɑʊɛəptkʂ"
+    for _ in range(count):
+        sentence = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 40)))
+        query = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 12)))
+        yield sentence, query
+
+
+def test_overlap_align_matches_lingpy_on_reference_pairs():
+    for sentence, query in _reference_pairs():
+        sentence_tokens, query_tokens, score = pw_align(sentence, query, mode="overlap")
+        span = _extract_matched_span(sentence_tokens, query_tokens)
+
+        hit = overlap_align(sentence, query)
+
+        if span is None:
+            assert hit is None
+            continue
+        assert hit.score == pytest.approx(score)
+        assert (hit.start, hit.end) == (span[1], span[2])
+
+
+def test_overlap_align_handles_empty_inputs():
+    assert overlap_align("", "abc") is None
+    assert overlap_align("abc", "") is None
+
+
+def test_local_alignment_numpy_engine_matches_lingpy_engine():
+    sentence = GraphemePhoneme.from_components(
+        "你好 hello world",
+        ["你", "好", "hello", "world"],
+        "nixɑʊhɛloʊwərld",
+        ["ni", "xɑʊ", "hɛloʊ", "wərld"],
+    )
+    query = GraphemePhoneme.from_components(
+        "好哈喽",
+        ["好", "哈", "喽"],
+        "xɑʊhɑloʊ",
+        ["xɑʊ", "hɑ", "loʊ"],
+    )
+
+    expected = LocalAlignment().align(sentence, query)
+    result = LocalAlignment(engine="numpy").align(sentence, query)
+
+    assert result[0][0] == pytest.approx(expected[0][0])
+    assert result[0][1] == expected[0][1]
+
+
+def test_local_alignment_rejects_unknown_engine():
+    with pytest.raises(ValueError):
+        LocalAlignment(engine="cuda")
+
+
+def test_overlap_align_many_matches_single_pair_alignment():
+    rng = random.Random(11)
+    sentence = "".join(rng.choice("aeiouptk") for _ in range(60))
+    queries = [
+        "".join(rng.choice("aeiouptk") for _ in range(rng.randint(0, 20)))
+        for _ in range(80)
+    ]
+
+    results = overlap_align_many(sentence, queries, bucket_width=3)
+
+    assert results == [overlap_align(sentence, query) for query in queries]
+
+
+def test_local_align_sentence_batches_numpy_engine(monkeypatch):
+    sentence = GraphemePhoneme.from_components(
+        "你好 hello", ["你", "好", "hello"], "nixɑʊhɛloʊ", ["ni", "xɑʊ", "hɛloʊ"]
+    )
+    queries = [
+        GraphemePhoneme.from_components("好", ["好"], "xɑʊ", ["xɑʊ"]),
+        GraphemePhoneme.from_components("哈喽", ["哈", "喽"], "hɑloʊ", ["hɑ", "loʊ"]),
+    ]
+    aligner = LocalAlignment(engine="numpy")
+    monkeypatch.setattr(aligner, "align", None)
+
+    results = local_align_sentence(sentence, queries, aligner)
+
+    expected = local_align_sentence(sentence, queries, LocalAlignment())
+    assert [query for query, _ in results] == queries
+    for (_, hits), (_, expected_hits) in zip(results, expected):
+        assert [(pytest.approx(s), gp) for s, gp in hits] == expected_hits
+
+
+def test_overlap_hits_many_returns_non_overlapping_hits_best_first():
+    sentence = "xxhɛloʊxxxxhɛlpoʊxxxhɛloʊx"
+
+    hits = overlap_hits_many(sentence, ["hɛloʊ"], max_hits=5, min_score=3.0)[0]
+
+    assert [(hit.score, hit.start) for hit in hits] == [(5.0, 20), (5.0, 2), (4.0, 11)]
+    assert hits[0] == overlap_align(sentence, "hɛloʊ")
+    assert hits[0].start > hits[1].start
+
+
+def test_overlap_hits_many_first_hit_matches_overlap_align_many():
+    rng = random.Random(3)
+    for _ in range(200):
+        sentence = "".join(rng.choice("abcd-") for _ in range(rng.randint(0, 20)))
+        queries = ["".join(rng.choice("abcd") for _ in range(rng.randint(0, 6)))]
+
+        single = overlap_align_many(sentence, queries)[0]
+        hits = overlap_hits_many(sentence, queries, max_hits=3)[0]
+
+        assert hits[:1] == ([] if single is None else [single])
+        spans = sorted((hit.start, hit.end) for hit in hits)
+        assert all(a[1] <= b[0] for a, b in zip(spans, spans[1:]))
+
+
+def test_local_alignment_reports_repeated_hotword():
+    sentence = GraphemePhoneme.from_components(
+        "hello you hello",
+        ["hello", "you", "hello"],
+        "hɛloʊjuhɛloʊ",
+        ["hɛloʊ", "ju", "hɛloʊ"],
+    )
+    query = GraphemePhoneme.from_components("hello", ["hello"], "hɛloʊ", ["hɛloʊ"])
+
+    aligner = LocalAlignment(engine="numpy", max_hits=3, min_score=4.0)
+    hits = aligner.align(sentence, query)
+
+    assert [score for score, _ in hits] == [5.0, 5.0]
+    assert [matched.grapheme_str for _, matched in hits] == ["hello", "hello"]
+    assert LocalAlignment(engine="numpy").align(sentence, query) == hits[:1]
+    with pytest.raises(ValueError):
+        LocalAlignment(max_hits=2)
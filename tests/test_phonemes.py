@@ -0,0 +1,52 @@
+import pickle
+
+from asr_error_correction import (
+    GraphemePhoneme,
+    LocalAlignment,
+    SymbolTable,
+    segment_phonemes,
+)
+from asr_error_correction.phonemes import SYMBOLS
+
+
+def test_segment_phonemes_keeps_multi_codepoint_segments_together():
+    assert segment_phonemes("tʂʰʊŋ˥˩") == ["tʂʰ", "ʊ", "ŋ", "˥˩"]
+    assert segment_phonemes("kʷaː ˈt͡ʃa") == ["kʷ", "aː", " ", "ˈ", "t͡ʃ", "a"]
+    assert segment_phonemes("ts", affricates=frozenset()) == ["t", "s"]
+
+
+def test_symbol_table_interns_segments_once():
+    table = SymbolTable(["a"])
+
+    codes = table.encode_ipa("pʰapʰ")
+
+    assert codes.typecode == "H"
+    assert list(codes) == [1, 0, 1]
+    assert table.decode(codes) == ["pʰ", "a", "pʰ"]
+    assert table.sizes().tolist() == [1, 2]
+    assert "pʰ" in table and len(table) == 2
+    assert pickle.loads(pickle.dumps(table)).symbols == table.symbols
+
+
+def test_grapheme_phoneme_exposes_segment_codes():
+    gp = GraphemePhoneme.from_components("吃 ts", ["吃", "ts"], "tʂʰɨts", ["tʂʰɨt", "s"])
+
+    # Segments never straddle a token boundary.
+    assert gp.phoneme_segments == ["tʂʰ", "ɨ", "t", "s"]
+    assert SYMBOLS.decode(gp.phoneme_codes) == gp.phoneme_segments
+    assert gp.phoneme_codes is gp.phoneme_codes
+    assert pickle.loads(pickle.dumps(gp)) == gp
+
+
+def test_segmented_alignment_agrees_between_engines():
+    sentence = GraphemePhoneme.from_components(
+        "我 吃 饭", ["我", "吃", "饭"], "wɔtʂʰɨfan", ["wɔ", "tʂʰɨ", "fan"]
+    )
+    query = GraphemePhoneme.from_components("迟", ["迟"], "tʂʰɨ", ["tʂʰɨ"])
+
+    lingpy_hits = LocalAlignment(segmented=True).align(sentence, query)
+    numpy_hits = LocalAlignment(engine="numpy", segmented=True).align(sentence, query)
+
+    assert lingpy_hits == numpy_hits
+    assert numpy_hits[0][0] == 2.0
+    assert numpy_hits[0][1].grapheme_str == "吃"
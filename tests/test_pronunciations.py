@@ -0,0 +1,74 @@
+import pickle
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from asr_error_correction import FrozenPronunciations, IPAConverter
+from asr_error_correction.pronunciations import write_frozen_pronunciations
+import asr_error_correction.conversion as conversion
+
+SRC_ROOT = Path(__file__).resolve().parents[1] / "src"
+
+ENGLISH = {"hello": "hɛˈloʊ", "world": "wərld", "n": "ɛn", "a": "ə", "s": "ɛs"}
+CHINESE = {"你": "ni˧˩˧", "好": "xɑʊ˧˩˧", "你好": "ni˧˥ xɑʊ˧˩˧", "世": "ʂɨ˥˩"}
+
+
+def _fail(*args):
+    raise AssertionError("live backend called")
+
+
+@pytest.fixture
+def frozen(tmp_path):
+    path = tmp_path / "pronunciations.bin"
+    write_frozen_pronunciations(path, ENGLISH.items(), CHINESE.items())
+    return FrozenPronunciations(path)
+
+
+def test_frozen_pronunciations_lookups(frozen):
+    assert len(frozen) == len(ENGLISH) + len(CHINESE)
+    assert frozen.english("Hello") == "hɛˈloʊ"
+    assert frozen.english("Qzx") == "qzx*"
+    assert frozen.english_many(["world", "a"]) == ["wərld", "ə"]
+    assert frozen.chinese("你好") == "ni˧˥ xɑʊ˧˩˧"
+    assert frozen.chinese("好你") == "xɑʊ˧˩˧ ni˧˩˧"
+    assert frozen.chinese("〇世") == "〇 ʂɨ˥˩"
+    assert pickle.loads(pickle.dumps(frozen)).english("world") == "wərld"
+
+
+def test_converter_uses_frozen_pronunciations_only(frozen, monkeypatch):
+    live = IPAConverter(cache_size=0)
+    monkeypatch.setattr(conversion, "eng_to_ipa_convert", frozen.english)
+    monkeypatch.setattr(
+        conversion, "eng_to_ipa_list", lambda words: [[frozen.english(w)] for w in words]
+    )
+    monkeypatch.setattr(conversion, "hanzi_to_ipa", frozen.chinese)
+    texts = ["你好 Hello world!", "NASA 世界", "好你 qzx"]
+    expected = [live.convert(text) for text in texts]
+    expected_gp = [live.convert_to_grapheme_phoneme(text) for text in texts]
+
+    for name in ("eng_to_ipa_convert", "eng_to_ipa_list", "hanzi_to_ipa"):
+        monkeypatch.setattr(conversion, name, _fail)
+    converter = IPAConverter(pronunciations=frozen)
+
+    assert [converter.convert(text) for text in texts] == expected
+    assert converter.convert_many(texts) == expected
+    assert converter.convert_to_grapheme_phoneme_many(texts) == expected_gp
+
+
+def test_import_does_not_load_backends():
+    code = (
+        "import sys, asr_error_correction;"
+        "print(sorted({'lingpy', 'dragonmapper', 'eng_to_ipa', 'panphon'}"
+        " & set(sys.modules)))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={"PYTHONPATH": str(SRC_ROOT)},
+    )
+
+    assert result.stdout.strip() == "[]"
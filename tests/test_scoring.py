@@ -0,0 +1,110 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from asr_error_correction import GraphemePhoneme, LocalAlignment
+from asr_error_correction.phonemes import SymbolTable
+from asr_error_correction.scoring import substitution_matrix, table_matrix
+import asr_error_correction.scoring as scoring
+
+
+@pytest.fixture(autouse=True)
+def clear_matrices():
+    # Matrices are memoized by inventory alone; start every test from disk.
+    scoring._matrices.clear()
+
+
+def _entry(tokens):
+    graphemes = [f"w{index}" for index in range(len(tokens))]
+    return GraphemePhoneme.from_components(
+        " ".join(graphemes), graphemes, "".join(tokens), tokens
+    )
+
+
+def test_substitution_matrix_scores_close_sounds_higher(tmp_path: Path):
+    symbols = ["s", "ʂ", "a", " ", "tʂʰ", "tɕ"]
+
+    matrix = substitution_matrix(symbols, tmp_path)
+
+    assert matrix.shape == (6, 6)
+    assert np.array_equal(np.diag(matrix), np.ones(6))
+    assert np.array_equal(matrix, matrix.T)
+    assert matrix[0, 1] > matrix[4, 5] > matrix[0, 2] == -1.0
+    # Symbols without features only match themselves.
+    assert matrix[3, 0] == -1.0
+    cached = list(tmp_path.glob("substitution-*.npy"))
+    assert len(cached) == 1
+    # The file holds the sorted inventory, whatever order it was asked in.
+    order = sorted(range(len(symbols)), key=symbols.__getitem__)
+    assert np.array_equal(np.load(cached[0]), matrix[np.ix_(order, order)])
+
+
+def test_feature_scoring_prefers_phonetically_close_query(tmp_path: Path):
+    sentence = _entry(["wɔ", "ʂɨ", "lɑʊ"])
+    close = _entry(["sɨ"])
+    far = _entry(["aɨ"])
+
+    weighted = LocalAlignment(engine="numpy", scoring="features", cache_dir=tmp_path)
+
+    assert weighted.align(sentence, close)[0][0] > weighted.align(sentence, far)[0][0]
+    assert weighted.align(sentence, close)[0][1].grapheme_str == "w1"
+
+
+def test_feature_scoring_agrees_between_engines(tmp_path: Path):
+    sentence = _entry(["tʂʰɨ", "fan", "lə"])
+    query = _entry(["tsʰɨ", "fa"])
+
+    lingpy_hits = LocalAlignment(scoring="features", cache_dir=tmp_path).align(
+        sentence, query
+    )
+    numpy_hits = LocalAlignment(
+        engine="numpy", scoring="features", cache_dir=tmp_path
+    ).align(sentence, query)
+
+    assert lingpy_hits[0][0] == pytest.approx(numpy_hits[0][0])
+    assert lingpy_hits[0][1] == numpy_hits[0][1]
+    with pytest.raises(ValueError):
+        LocalAlignment(scoring="unknown")
+
+
+def test_substitution_matrix_cache_is_shared_across_symbol_orders(tmp_path: Path):
+    symbols = ["s", "ʂ", "a", " ", "tɕ"]
+    reordered = ["tɕ", "a", "s", " ", "ʂ"]
+
+    matrix = substitution_matrix(symbols, tmp_path)
+    permuted = substitution_matrix(reordered, tmp_path)
+
+    assert len(list(tmp_path.glob("substitution-*.npy"))) == 1
+    order = [symbols.index(symbol) for symbol in reordered]
+    assert np.array_equal(permuted, matrix[np.ix_(order, order)])
+
+
+def test_table_matrix_grows_with_the_table(tmp_path: Path):
+    table = SymbolTable(["s", "ʂ", "a"])
+
+    first = table_matrix(table, tmp_path)
+    assert table_matrix(table, tmp_path) is first
+
+    table.intern(" ")
+    table.intern("tɕ")
+    grown = table_matrix(table, tmp_path)
+
+    assert np.array_equal(grown, scoring._compute(table.symbols))
+    assert len(list(tmp_path.glob("substitution-*.npy"))) == 2
+
+
+def test_grown_table_matrix_is_reused_from_disk(tmp_path: Path, monkeypatch):
+    table = SymbolTable(["s", "ʂ", "a"])
+    table_matrix(table, tmp_path)
+    table.intern("tɕ")
+    grown = table_matrix(table, tmp_path)
+
+    # A fresh process interning the same symbols finds the grown matrix.
+    scoring._matrices.clear()
+    monkeypatch.setattr(scoring, "_pairwise", None)
+    again = SymbolTable(["s", "ʂ", "a"])
+    table_matrix(again, tmp_path)
+    again.intern("tɕ")
+
+    assert np.array_equal(table_matrix(again, tmp_path), grown)
@@ -0,0 +1,164 @@
+import asyncio
+import socket
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+
+import pytest
+
+from asr_error_correction import (
+    IPAConverter,
+    IPALexicon,
+    LocalAlignment,
+    local_align_sentence,
+)
+from asr_error_correction.client import CorrectionClient, ServerError
+from asr_error_correction.memo import CachedAlignment
+from asr_error_correction.server import (
+    CorrectionServer,
+    _FRAME_HEADER,
+    _build_server,
+    _encode_frame,
+    _parse_args,
+)
+
+
+TRANSCRIPTS = ["say hello world", "help me", "你好 hello", "nothing here"]
+
+
+def _lexicon() -> IPALexicon:
+    lexicon = IPALexicon(IPAConverter())
+    lexicon.add_phrases(["hello", "world", "help", "你好"])
+    return lexicon
+
+
+@contextmanager
+def _running(server, address):
+    loop = asyncio.new_event_loop()
+    started: Future = Future()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        try:
+            started.set_result(loop.run_until_complete(server.start(address)))
+        except BaseException as error:
+            started.set_exception(error)
+            return
+        loop.run_forever()
+        loop.run_until_complete(server.aclose())
+        loop.close()
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    try:
+        yield started.result(timeout=10)
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=10)
+
+
+def test_client_results_match_local_conversion_and_alignment(tmp_path):
+    lexicon = _lexicon()
+    aligner = LocalAlignment(engine="numpy")
+    server = CorrectionServer(lexicon, aligner)
+    converter = IPAConverter()
+
+    with _running(server, str(tmp_path / "server.sock")) as address:
+        with CorrectionClient(address) as client:
+            assert client.convert_many(TRANSCRIPTS) == [
+                converter.convert(text) for text in TRANSCRIPTS
+            ]
+            assert client.convert_to_grapheme_phoneme("你好 hello") == (
+                converter.convert_to_grapheme_phoneme("你好 hello")
+            )
+            sentence, matches = client.align("say hello world")
+
+    expected_sentence = converter.convert_to_grapheme_phoneme("say hello world")
+    expected = [
+        (key, hits)
+        for key, (_, hits) in zip(
+            lexicon.entries,
+            local_align_sentence(
+                expected_sentence, list(lexicon.entries.values()), aligner
+            ),
+        )
+        if hits
+    ]
+    assert sentence == expected_sentence
+    assert matches == expected
+    assert [key for key, _ in matches] == ["hello", "world", "help"]
+    assert not (tmp_path / "server.sock").exists()
+
+
+def test_concurrent_requests_are_micro_batched():
+    server = CorrectionServer(_lexicon(), max_batch_size=16, max_latency=0.05)
+    texts = [f"hello {index}" for index in range(64)]
+
+    with _running(server, ("127.0.0.1", 0)) as address:
+        client = CorrectionClient(address, pool_size=2)
+        with ThreadPoolExecutor(4) as executor:
+            chunks = [texts[offset : offset + 16] for offset in range(0, 64, 16)]
+            results = list(executor.map(client.convert_many, chunks))
+        client.close()
+
+    assert [text for chunk in results for text in chunk] == texts
+    stats = server.stats()
+    assert stats.requests == 64
+    assert stats.batches <= 8
+    assert stats.mean_batch_size >= 8
+
+
+def test_malformed_requests_get_errors_without_dropping_the_connection(tmp_path):
+    server = CorrectionServer(_lexicon())
+
+    with _running(server, str(tmp_path / "server.sock")) as address:
+        with socket.socket(socket.AF_UNIX) as raw:
+            raw.connect(address)
+            raw.sendall(_encode_frame({"id": 7, "op": "shout", "text": "hi"}))
+            raw.sendall(_encode_frame({"id": 8, "op": "convert", "text": "Hi"}))
+            reader = raw.makefile("rb")
+            responses = []
+            for _ in range(2):
+                (size,) = _FRAME_HEADER.unpack(reader.read(_FRAME_HEADER.size))
+                responses.append(reader.read(size).decode("utf-8"))
+            reader.close()
+
+        with CorrectionClient(address) as client:
+            with pytest.raises(ServerError):
+                client._call("align", [None])
+            assert client.convert("Hi") == "hi"
+
+    assert sorted(responses) == sorted(
+        [
+            '{"id":7,"error":"ValueError: Unknown operation: \'shout\'"}',
+            '{"id":8,"result":"hi"}',
+        ]
+    )
+
+
+def test_command_line_server_caches_alignments_and_configures_converter(tmp_path):
+    lexicon_path = tmp_path / "lexicon.json"
+    _lexicon().save_to(lexicon_path)
+
+    server = _build_server(
+        _parse_args(
+            [
+                str(lexicon_path),
+                "--port",
+                "0",
+                "--cache-dir",
+                str(tmp_path / "cache"),
+                "--remove-punctuation",
+                "--token-cache-size",
+                "8",
+            ]
+        )
+    )
+
+    assert isinstance(server.aligner, CachedAlignment)
+    assert server.aligner.cache_dir == tmp_path / "cache"
+    assert server.aligner.aligner.engine == "numpy"
+    assert server.lexicon.converter.remove_punctuation
+    assert not server.lexicon.converter.remove_tone_marks
+    assert server.lexicon.converter.cache_info().maxsize == 8
+    assert list(server.lexicon.entries) == ["hello", "world", "help", "你好"]
@@ -0,0 +1,72 @@
+import pytest
+
+from asr_error_correction import (
+    IPAConverter,
+    IPALexicon,
+    LocalAlignment,
+    StreamingSession,
+    local_align_sentence,
+)
+import asr_error_correction.conversion as conversion
+
+PINYIN = {"我": "wo", "想": "ɕiaŋ", "订": "tiŋ", "一": "i", "张": "tʂaŋ", "票": "pʰiao"}
+
+
+@pytest.fixture(autouse=True)
+def patch_converters(patch_backends):
+    patch_backends(str.lower, lambda text: PINYIN.get(text, "x"))
+
+
+def _lexicon(converter: IPAConverter) -> IPALexicon:
+    lexicon = IPALexicon(converter)
+    lexicon.add_phrases(["订票", "hello world", "张", "我想", "help"])
+    return lexicon
+
+
+def test_streaming_session_matches_from_scratch_alignment():
+    converter = IPAConverter()
+    lexicon = _lexicon(converter)
+    session = StreamingSession(lexicon)
+    aligner = LocalAlignment(engine="numpy")
+    partials = [
+        "我想",
+        "我想订",
+        "我想订一张",
+        "我想订一张票 hel",
+        "我想订一张票 hello",
+        "我想订一张票 hello wor",
+        "我想订一张票 help",
+        "我想订一",
+        "我想订一张飘",
+        "",
+        "hello world",
+    ]
+
+    for text in partials:
+        results = session.update(text)
+        sentence = converter.convert_to_grapheme_phoneme(text)
+
+        assert session.sentence == sentence
+        assert results == local_align_sentence(
+            sentence, list(lexicon.entries.values()), aligner
+        )
+
+
+def test_streaming_session_only_looks_up_the_changed_suffix(monkeypatch):
+    calls = []
+
+    def fake_hanzi_to_ipa(text):
+        calls.append(text)
+        return PINYIN.get(text, "x")
+
+    monkeypatch.setattr(conversion, "hanzi_to_ipa", fake_hanzi_to_ipa)
+    converter = IPAConverter(cache_size=0)
+    session = StreamingSession(_lexicon(converter), queries=[])
+    calls.clear()
+
+    session.update("我想")
+    session.update("我想订")
+    session.update("我想订票")
+
+    assert calls == ["我", "想", "订", "票"]
+    assert session.update("我想订票") == []
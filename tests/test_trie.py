@@ -0,0 +1,88 @@
+import random
+
+import pytest
+
+from asr_error_correction import (
+    GraphemePhoneme,
+    IPAConverter,
+    IPALexicon,
+    LocalAlignment,
+    local_align_sentence,
+)
+from asr_error_correction.trie import PhonemeTrie
+
+
+def _entry(phonemes: str) -> GraphemePhoneme:
+    tokens = [phonemes] if phonemes else []
+    return GraphemePhoneme.from_components(phonemes, tokens, phonemes, tokens)
+
+
+def _random_entries(seed: int, count: int):
+    rng = random.Random(seed)
+    return {
+        f"entry{number}": _entry(
+            "".join(rng.choice("abcdɑ") for _ in range(rng.randint(0, 7)))
+        )
+        for number in range(count)
+    }
+
+
+def test_trie_matches_batched_alignment():
+    entries = _random_entries(seed=3, count=400)
+    sentence = _entry("".join(random.Random(4).choice("abcdɑ") for _ in range(30)))
+    trie = PhonemeTrie(entries)
+
+    expected = local_align_sentence(
+        sentence, list(entries.values()), LocalAlignment(engine="numpy")
+    )
+
+    assert trie.align(sentence) == expected
+    for (_, hits), score in zip(expected, trie.scores(sentence)):
+        if hits:
+            assert hits[0][0] == score
+
+
+@pytest.mark.parametrize("min_score", [1.0, 3.0, 5.0])
+def test_trie_prunes_entries_below_min_score(min_score):
+    entries = _random_entries(seed=5, count=400)
+    sentence = _entry("".join(random.Random(6).choice("abcdɑ") for _ in range(30)))
+    trie = PhonemeTrie(entries)
+
+    expected = [
+        (entry, hits)
+        for entry, hits in trie.align(sentence)
+        if hits and hits[0][0] >= min_score
+    ]
+
+    assert trie.align(sentence, min_score=min_score) == expected
+
+
+def test_lexicon_align_sentence_rebuilds_trie_after_changes():
+    lexicon = IPALexicon(IPAConverter())
+    lexicon.add_phrases(["hello", "help"])
+    sentence = lexicon.converter.convert_to_grapheme_phoneme("say hello world")
+
+    first = lexicon.align_sentence(sentence, min_score=4.0)
+    assert [entry.grapheme_str for entry, _ in first] == ["hello"]
+
+    lexicon.add_phrases(["world"])
+    second = lexicon.align_sentence(sentence, min_score=4.0)
+    assert [entry.grapheme_str for entry, _ in second] == ["hello", "world"]
+    assert second[1][1][0][1].grapheme_str == "world"
+
+
+def test_trie_spans_skip_alignment_markers():
+    rng = random.Random(8)
+    entries = {
+        f"entry{number}": _entry(
+            "".join(rng.choice("ab ɑ-") for _ in range(rng.randint(0, 6)))
+        )
+        for number in range(300)
+    }
+    sentence = _entry("".join(rng.choice("ab ɑ-") for _ in range(25)))
+
+    expected = local_align_sentence(
+        sentence, list(entries.values()), LocalAlignment(engine="numpy")
+    )
+
+    assert PhonemeTrie(entries).align(sentence) == expected